@@ -10,10 +10,15 @@ from datetime import datetime
 import fitz  # PyMuPDF for PDF link extraction
 from docx import Document
 import glob
+from llm_client import OllamaClient, number_complete, json_object_complete
+from skill_index import SkillIndex
 
 # Ollama API endpoint
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_URL = f"{OLLAMA_BASE_URL}/api/generate"
 MODEL_NAME = "mistral:latest"
+# Repeated prompts (e.g. re-parsed resumes) are answered from the shared on-disk cache
+ollama_client = OllamaClient(OLLAMA_BASE_URL)
 # Load spaCy model
 nlp = spacy.load("en_core_web_sm")
 matcher = Matcher(nlp.vocab)
@@ -302,7 +307,7 @@ def extract_name(resume_text):
 
     return "Name Not Found"
 
-def call_ollama_api(prompt, model_name=MODEL_NAME):
+def call_ollama_api(prompt, model_name=MODEL_NAME, use_cache=True, stop_when=None):
     """Call Ollama API for LLM inference"""
     payload = {
         "model": model_name,
@@ -316,10 +321,8 @@ def call_ollama_api(prompt, model_name=MODEL_NAME):
     
     try:
         print(f"[DEBUG] Calling Ollama API with model: {model_name}")
-        response = requests.post(OLLAMA_URL, json=payload, timeout=300)
-        response.raise_for_status()
-        result = response.json()
-        api_response = result.get("response", "")
+        api_response = ollama_client.generate(prompt, model=model_name, options=payload["options"],
+                                              timeout=300, use_cache=use_cache, stop_when=stop_when)
         print(f"[DEBUG] Ollama response: {api_response[:200]}...")
         return api_response
     except requests.exceptions.RequestException as e:
@@ -338,7 +341,7 @@ def extract_education(resume_text):
 Resume text:
 {resume_text[:2000]}"""
 
-    response = call_ollama_api(prompt)
+    response = call_ollama_api(prompt, stop_when=json_object_complete)
     if not response:
         print("[ERROR] No response from Ollama for education extraction")
         return None
@@ -377,7 +380,7 @@ Assign scores 0-100 based on evidence in the resume. No additional text.
 Resume text:
 {resume_text[:2000]}"""
 
-    response = call_ollama_api(prompt)
+    response = call_ollama_api(prompt, stop_when=json_object_complete)
     if not response:
         print("[ERROR] No response from Ollama for skills extraction")
         return None
@@ -421,7 +424,7 @@ Return only a number (like 2.5 or 0.0). No text, no explanation.
 Resume text:
 {processed_text[:2000]}"""
 
-    response = call_ollama_api(prompt)
+    response = call_ollama_api(prompt, stop_when=number_complete)
     if not response:
         print("[ERROR] No response from Ollama for experience extraction")
         return 0.0
@@ -540,6 +543,20 @@ def process_resume_directory(directory_path="./resumes", output_dir="./candidate
         print(f"{'='*50}")
     except Exception as e:
         print(f"Error saving results: {e}")
+    
+    # Keep the persistent skill index in step with newly parsed candidates, each skill with its
+    # synonym cluster, so S2's prefilter answers coverage with one index query
+    try:
+        try:
+            from S2 import DynamicSkillSynonymMapper
+            expand = DynamicSkillSynonymMapper(OLLAMA_BASE_URL).get_skill_variations_batch
+        except ImportError as e:
+            print(f"Indexing skills by spelling only, S2 not available: {e}")
+            expand = None
+        indexed = SkillIndex().index_candidates((r for r in all_results if "error" not in r), expand=expand)
+        print(f"Skill index updated for {indexed} candidate(s)")
+    except Exception as e:
+        print(f"Error updating skill index: {e}")
 
 def main():
     """Main function"""
@@ -548,7 +565,8 @@ def main():
     
     # Test Ollama connection first
     print("Testing Ollama connection...")
-    test_response = call_ollama_api("Hello, are you working?")
+    # A cached answer would report a stopped server as healthy
+    test_response = call_ollama_api("Hello, are you working?", use_cache=False)
     if test_response:
         print("Ollama connection successful")
     else:
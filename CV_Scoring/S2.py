@@ -1,12 +1,13 @@
 import json
 import numpy as np
-import torch
-from typing import Dict, List, Tuple, Any, Optional
+import sys
+from typing import Dict, List, Tuple, Any, Optional, Callable, Iterator
 import re
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import logging
 from dataclasses import dataclass, asdict
-from sentence_transformers import SentenceTransformer
+from contextlib import contextmanager
+from functools import lru_cache
 import uuid
 import os
 import time
@@ -14,15 +15,56 @@ from datetime import datetime
 import warnings
 import requests
 import glob
-from sklearn.metrics.pairwise import cosine_similarity
-import chromadb
-from chromadb.config import Settings
 import hashlib
+import threading
+import zlib
+import contextvars
+from concurrent.futures import Executor, as_completed
+from llm_client import OllamaClient, CircuitOpenError, number_complete, json_object_complete, add_event_listener
+from skill_index import SkillIndex, candidate_id, compact_skill
+from score_store import ScoreStore
+
+# torch, sentence_transformers and chromadb are imported lazily where they are
+# first needed so that importing S2 (e.g. from run_both.py) stays cheap.
 
 warnings.filterwarnings("ignore")
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# Embedding cache IDs hash the exact embedded text together with this model
+# identity; bump the version whenever the model or text pooling changes.
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_MODEL_VERSION = '1'
+EMBEDDING_ID_SCHEME = 'content-sha256-v1'
+
+# Capacity of each in-memory cache; the warm matcher lives across cycles, so none may grow unbounded
+MAPPER_CACHE_CAPACITY = 20000
+EMBEDDING_CACHE_CAPACITY = 10000
+
+# Batched synonym generation sizes each prompt with a rough 4-characters-per-token
+# estimate so the prompt and its JSON answer fit the model's context window.
+SKILL_BATCH_TOKEN_BUDGET = 2048
+SKILL_BATCH_OUTPUT_TOKENS_PER_SKILL = 60
+
+# Candidate files are JSON (a list, {"candidates": [...]} or one candidate) or JSONL, read in chunks of this many characters
+CANDIDATE_FILE_PATTERNS = ("*.json", "*.jsonl")
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Keep the model (and its prompt-prefix KV cache) loaded between consecutive calls
+OLLAMA_KEEP_ALIVE = "10m"
+
+# Fuzzy skill-variant matching: 64 MinHash permutations in 16 LSH bands of 4 rows put the
+# bucket-collision threshold near a 3-gram Jaccard of (1/16)^(1/4) = 0.5
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+FUZZY_MIN_JACCARD = 0.5
+# Pairs where neither variation contains the other (which scores 0.6) map Jaccard 0.5..1 linearly
+# onto similarity 0.4..0.8. Skill scores count similarities above 0.5 (Jaccard above 0.625) and
+# important-skill coverage needs > 0.6, so close misspellings with a Jaccard above 0.75
+# ("objectorientedprogramming"/"objectorientatedprogramming": 0.85 -> 0.68) cover the skill.
+FUZZY_MIN_SIMILARITY = 0.4
+FUZZY_MAX_SIMILARITY = 0.8
+
 @dataclass
 class MatchingResult:
     candidate_name: str
@@ -34,20 +76,530 @@ class MatchingResult:
     education_score: float
     ai_enhanced_score: float
     detailed_breakdown: Dict[str, Any]
+    # True when an LLM fallback was used for this pair; such scores should be recomputed later
+    degraded: bool = False
+    candidate_id: str = ""
+    # Per-component wall time and LLM/cache/ChromaDB counters, only when the matcher profiles
+    profile: Optional[Dict[str, Any]] = None
     
     def to_dict(self):
+        if isinstance(self.detailed_breakdown, LazyBreakdown):
+            self.detailed_breakdown.materialize()
         return asdict(self)
 
+class LazyBreakdown(dict):
+    """detailed_breakdown whose expensive entries are only computed when first read"""
+
+    def __init__(self, *args, factories: Optional[Dict[str, Callable[[], Any]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._factories = dict(factories or {})
+        # Position of every entry, so a full materialize() keeps the key order of an eager breakdown
+        self._order = list(dict.keys(self))
+
+    @classmethod
+    def build(cls, entries: Dict[str, Any], factories: Dict[str, Callable[[], Any]]) -> 'LazyBreakdown':
+        breakdown = cls({k: v for k, v in entries.items() if k not in factories}, factories=factories)
+        breakdown._order = list(entries)
+        return breakdown
+
+    @property
+    def pending(self) -> List[str]:
+        return list(self._factories)
+
+    def __missing__(self, key):
+        factory = self._factories.pop(key, None)
+        if factory is None:
+            raise KeyError(key)
+        value = factory()
+        dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self._factories:
+            return self[key]
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        return key in self._factories or dict.__contains__(self, key)
+
+    def materialize(self) -> 'LazyBreakdown':
+        if not self._factories:
+            return self
+        for key in list(self._factories):
+            self[key]
+        entries = dict.copy(self)
+        dict.clear(self)
+        dict.update(self, {key: entries.pop(key) for key in self._order if key in entries})
+        dict.update(self, entries)
+        return self
+
+    def __iter__(self):
+        return dict.__iter__(self.materialize())
+
+    def __len__(self):
+        return dict.__len__(self) + len(self._factories)
+
+    def keys(self):
+        return dict.keys(self.materialize())
+
+    def items(self):
+        return dict.items(self.materialize())
+
+    def values(self):
+        return dict.values(self.materialize())
+
+    def copy(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return repr(self.copy())
+
+def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine similarity of two 1D vectors (0.0 if either is all zeros)"""
+    a = np.asarray(a, dtype=np.float64).ravel()
+    b = np.asarray(b, dtype=np.float64).ravel()
+    denominator = np.linalg.norm(a) * np.linalg.norm(b)
+    if denominator == 0:
+        return 0.0
+    return float(np.dot(a, b) / denominator)
+
+def release_gpu_memory():
+    """Free cached CUDA memory, only if torch has already been loaded"""
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+class BoundedLRUCache:
+    """Thread-safe dict-like LRU cache with a fixed capacity, optional TTL and hit/miss stats"""
+    _MISSING = object()
+
+    def __init__(self, capacity: int, ttl_seconds: Optional[float] = None, name: Optional[str] = None):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        # Named caches report their hits and misses to the active ScoringProfile
+        self.name = name
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+    def _lookup(self, key):
+        """Return the live value (refreshing its recency) or _MISSING; caller holds the lock"""
+        entry = self._data.get(key, self._MISSING)
+        if entry is self._MISSING:
+            return self._MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            self.stats['expired'] += 1
+            return self._MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is self._MISSING:
+                self.stats['misses'] += 1
+                if self.name: ScoringProfile.count(f"cache.{self.name}.misses")
+                return default
+            self.stats['hits'] += 1
+            if self.name: ScoringProfile.count(f"cache.{self.name}.hits")
+            return value
+
+    def __getitem__(self, key):
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return self._lookup(key) is not self._MISSING
+
+    def __setitem__(self, key, value):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def update(self, items):
+        for key, value in (items.items() if hasattr(items, 'items') else items):
+            self[key] = value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def add(self, key):
+        """Set-style membership marker"""
+        self[key] = True
+
+    def discard(self, key):
+        self.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {**self.stats, 'size': len(self._data), 'capacity': self.capacity,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0}
+
+class MinHashLSHIndex:
+    """Character 3-gram MinHash signatures in LSH buckets over a bounded skill-variant vocabulary"""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, bands: int = MINHASH_BANDS,
+                 min_jaccard: float = FUZZY_MIN_JACCARD, capacity: int = MAPPER_CACHE_CAPACITY, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        # Universal hashing mod 2^64 (numpy uint64 arithmetic wraps); odd multipliers keep it a bijection
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.min_jaccard = min_jaccard
+        self.capacity = capacity
+        # Least recently used first, evicted beyond capacity
+        self._grams = OrderedDict()
+        self._signatures = {}
+        self._buckets = [defaultdict(set) for _ in range(bands)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def shingles(term: str) -> frozenset:
+        return frozenset(term[i:i + 3] for i in range(len(term) - 2)) if len(term) >= 3 else frozenset([term])
+
+    def _signature(self, grams: frozenset) -> np.ndarray:
+        hashes = np.array([zlib.crc32(gram.encode('utf-8')) for gram in grams], dtype=np.uint64)
+        return (np.outer(hashes, self._a) + self._b).min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    @staticmethod
+    @lru_cache(maxsize=MAPPER_CACHE_CAPACITY)
+    def _key(term: str) -> str:
+        return compact_skill(term)
+
+    def _sketch(self, term: str) -> Tuple[str, frozenset, Optional[np.ndarray]]:
+        """Compacted key, 3-grams and signature of a term, from the vocabulary if indexed (never inserted)"""
+        key = self._key(term)
+        with self._lock:
+            if key in self._grams:
+                self._grams.move_to_end(key)
+                return key, self._grams[key], self._signatures[key]
+        if len(key) < 3:
+            return key, frozenset(), None
+        grams = self.shingles(key)
+        return key, grams, self._signature(grams)
+
+    def add(self, term: str) -> str:
+        """Add one vocabulary variant (compacted), evicting the least recently used beyond capacity; returns its key"""
+        key, grams, signature = self._sketch(term)
+        if signature is None:
+            return key
+        with self._lock:
+            if key in self._grams:
+                return key
+            self._grams[key] = grams
+            self._signatures[key] = signature
+            for band, band_key in enumerate(self._band_keys(signature)):
+                self._buckets[band][band_key].add(key)
+            while len(self._grams) > self.capacity:
+                self._evict(next(iter(self._grams)))
+        return key
+
+    def _evict(self, key: str):
+        """Drop a key from the vocabulary and its buckets; caller holds the lock"""
+        del self._grams[key]
+        for band, band_key in enumerate(self._band_keys(self._signatures.pop(key))):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def update(self, terms) -> None:
+        for term in terms:
+            self.add(term)
+
+    def neighbours(self, term: str) -> Dict[str, float]:
+        """Vocabulary variants sharing an LSH bucket with term, with their exact 3-gram Jaccard >= min_jaccard"""
+        key, grams, signature = self._sketch(term)
+        if signature is None:
+            return {}
+        with self._lock:
+            candidates = set()
+            for band, band_key in enumerate(self._band_keys(signature)):
+                candidates |= self._buckets[band].get(band_key, set())
+            candidates.discard(key)
+            candidate_grams = {other: self._grams[other] for other in candidates}
+        matches = {}
+        for other, other_grams in candidate_grams.items():
+            jaccard = len(grams & other_grams) / len(grams | other_grams)
+            if jaccard >= self.min_jaccard:
+                matches[other] = jaccard
+        return matches
+
+    def best_similarity(self, terms1, terms2) -> float:
+        """Highest 3-gram Jaccard (>= min_jaccard) between any variant of one skill and any variant of the other"""
+        sketches1 = [sketch for sketch in map(self._sketch, set(terms1)) if sketch[2] is not None]
+        sketches2 = [sketch for sketch in map(self._sketch, set(terms2)) if sketch[2] is not None]
+        if not sketches1 or not sketches2:
+            return 0.0
+        # LSH candidates pairwise: a pair is compared exactly when all rows of some band agree
+        bands1 = np.stack([sketch[2] for sketch in sketches1]).reshape(len(sketches1), 1, self.bands, self.rows)
+        bands2 = np.stack([sketch[2] for sketch in sketches2]).reshape(1, len(sketches2), self.bands, self.rows)
+        colliding = (bands1 == bands2).all(axis=3).any(axis=2)
+        best = 0.0
+        for i, j in zip(*np.nonzero(colliding)):
+            (key1, grams1, _), (key2, grams2, _) = sketches1[i], sketches2[j]
+            if key1 == key2:
+                continue
+            jaccard = len(grams1 & grams2) / len(grams1 | grams2)
+            if jaccard >= self.min_jaccard and jaccard > best:
+                best = jaccard
+        return best
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+class ScoringProfile:
+    """Wall time per scoring component plus LLM, cache and ChromaDB counters for one pair (or one job prefetch)"""
+    _local = threading.local()
+
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.counters = defaultdict(int)
+
+    @classmethod
+    def current(cls) -> Optional['ScoringProfile']:
+        return getattr(cls._local, 'profile', None)
+
+    @classmethod
+    def count(cls, name: str, amount: int = 1):
+        """Add to a counter of the profile active on this thread, if any"""
+        profile = getattr(cls._local, 'profile', None)
+        if profile is not None:
+            profile.counters[name] += amount
+
+    @classmethod
+    @contextmanager
+    def activate(cls, profile: Optional['ScoringProfile']):
+        previous = cls.current()
+        cls._local.profile = profile
+        try:
+            yield profile
+        finally:
+            cls._local.profile = previous
+
+    def measure(self, name: str, method: Callable, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return profile_summary(self.timings, self.counters)
+
+
+# Real Ollama requests, prompt-cache hits, coalesced waits and breaker rejections from llm_client
+add_event_listener(ScoringProfile.count)
+
+
+def profile_summary(timings: Dict[str, float], counters: Dict[str, int], pairs: int = None) -> Dict[str, Any]:
+    """Structured view of profile counters keyed 'llm.requests', 'cache.<name>.hits', 'chromadb.reads'"""
+    summary = {
+        'wall_ms': {name: round(seconds * 1000, 3) for name, seconds in sorted(timings.items())},
+        'llm_requests': counters.get('llm.requests', 0),
+        'llm_prompt_cache_hits': counters.get('llm.prompt_cache_hits', 0),
+        'llm_coalesced': counters.get('llm.coalesced', 0),
+        'llm_rejected': counters.get('llm.rejected', 0),
+        'llm_fallbacks': counters.get('llm.fallbacks', 0),
+        'prefilter_dropped': counters.get('prefilter.dropped', 0),
+        'cache': {},
+        'chromadb_round_trips': {}
+    }
+    for key, value in sorted(counters.items()):
+        kind, _, rest = key.partition('.')
+        if kind == 'cache':
+            cache_name, _, result = rest.rpartition('.')
+            summary['cache'].setdefault(cache_name, {'hits': 0, 'misses': 0})[result] = value
+        elif kind == 'chromadb':
+            summary['chromadb_round_trips'][rest] = value
+    if pairs:
+        summary['mean_ms_per_pair'] = {name: round(seconds * 1000 / pairs, 3) for name, seconds in sorted(timings.items())}
+    return summary
+
+class ProfileAggregate:
+    """Thread-safe running totals of ScoringProfiles, exported as JSON and Prometheus text"""
+
+    def __init__(self):
+        self.pairs = 0
+        self.jobs = 0
+        self.timings = defaultdict(float)
+        self.counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, profile: ScoringProfile, pairs: int = 0, jobs: int = 0):
+        with self._lock:
+            self.pairs += pairs
+            self.jobs += jobs
+            for name, seconds in profile.timings.items():
+                self.timings[name] += seconds
+            for name, value in profile.counters.items():
+                self.counters[name] += value
+
+    def snapshot(self) -> 'ProfileAggregate':
+        copy = ProfileAggregate()
+        with self._lock:
+            copy.pairs, copy.jobs = self.pairs, self.jobs
+            copy.timings.update(self.timings)
+            copy.counters.update(self.counters)
+        return copy
+
+    def since(self, earlier: 'ProfileAggregate') -> 'ProfileAggregate':
+        """Totals accumulated after an earlier snapshot(), e.g. for a single run"""
+        delta = self.snapshot()
+        delta.pairs -= earlier.pairs
+        delta.jobs -= earlier.jobs
+        for name, seconds in earlier.timings.items():
+            delta.timings[name] -= seconds
+        for name, value in earlier.counters.items():
+            delta.counters[name] -= value
+        return delta
+
+    def to_dict(self) -> Dict[str, Any]:
+        snapshot = self.snapshot()
+        return {'pairs': snapshot.pairs, 'jobs': snapshot.jobs,
+                **profile_summary(snapshot.timings, snapshot.counters, snapshot.pairs)}
+
+    def to_prometheus(self, prefix: str = "s2") -> str:
+        """Counters in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        families = defaultdict(list)
+        families[('pairs_scored_total', 'Candidate-job pairs scored')].append(('', snapshot.pairs))
+        families[('jobs_scored_total', 'Jobs prefetched and scored')].append(('', snapshot.jobs))
+        for name, seconds in sorted(snapshot.timings.items()):
+            families[('component_seconds_total', 'Wall time per scoring component')].append((f'component="{name}"', round(seconds, 6)))
+        for key, value in sorted(snapshot.counters.items()):
+            kind, _, rest = key.partition('.')
+            if kind == 'llm':
+                families[(f'llm_{rest}_total', f"LLM {rest.replace('_', ' ')} while scoring")].append(('', value))
+            elif kind == 'cache':
+                cache_name, _, result = rest.rpartition('.')
+                families[('cache_lookups_total', 'In-memory cache lookups by result')].append(
+                    (f'cache="{cache_name}",result="{result}"', value))
+            elif kind == 'chromadb':
+                families[('chromadb_round_trips_total', 'ChromaDB calls by operation')].append((f'operation="{rest}"', value))
+            elif kind == 'prefilter':
+                families[(f'prefilter_{rest}_total', f'Candidates {rest} by the skill index prefilter')].append(('', value))
+        
+        lines = []
+        for (name, help_text), samples in families.items():
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for labels, value in samples:
+                lines.append(f"{prefix}_{name}{{{labels}}} {value}" if labels else f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+class _FeatureRecord:
+    """Immutable __slots__ record built once per candidate or job"""
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            value = fields[name]
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+class CandidateFeatures(_FeatureRecord):
+    """Pre-normalized candidate fields consumed by the scoring functions"""
+    __slots__ = (
+        'raw', 'name', 'technical_skills', 'technical_levels', 'soft_skills', 'soft_levels',
+        'all_skills', 'all_levels', 'career_field', 'years', 'education_degree',
+        'education_field', 'education_level', 'certification_count', 'profile_text'
+    )
+
+class JobFeatures(_FeatureRecord):
+    """Pre-normalized job fields consumed by the scoring functions"""
+    __slots__ = (
+        'raw', 'title', 'title_lower', 'level', 'technical_skills', 'technical_levels',
+        'soft_skills', 'soft_levels', 'important_skills', 'career_field', 'experience_years',
+        'education_requirement', 'education_level', 'description_text'
+    )
+
+class CandidateTable:
+    """Columnar view of a candidate pool for the vectorized experience and education scores"""
+
+    def __init__(self, candidates: List[CandidateFeatures], progression_bonus: Callable[[str], int]):
+        self.size = len(candidates)
+        years = [candidate.years for candidate in candidates]
+        self.has_years = np.array([y is not None for y in years], dtype=bool)
+        self.years = np.array([y if y is not None else 0.0 for y in years], dtype=np.float64)
+        self.education_level = np.array([candidate.education_level for candidate in candidates], dtype=np.int64)
+        self.progression_bonus = np.array([progression_bonus(candidate.education_degree) for candidate in candidates], dtype=np.float64)
+        self.certification_count = np.array([candidate.certification_count for candidate in candidates], dtype=np.int64)
+        # Education fields as codes into self.fields, so field relevance is assessed once per distinct field
+        self.fields, field_codes = np.unique(np.array([candidate.education_field for candidate in candidates], dtype=object)
+                                             if candidates else np.array([], dtype=object), return_inverse=True)
+        self.field_code = field_codes.astype(np.int64)
+
+
+# WriteBatch collecting ChromaDB writes for the scoring call running in this context (None: write through)
+_write_batch = contextvars.ContextVar('chromadb_write_batch', default=None)
+
+
+class WriteBatch:
+    """ChromaDB records buffered by one score_candidates() call, shared by its worker threads"""
+
+    def __init__(self):
+        self._records = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def add(self, collection_name: str, records: Dict[str, Dict]):
+        with self._lock:
+            self._records[collection_name].update(records)
+
+    def drain(self) -> Dict[str, Dict[str, Dict]]:
+        with self._lock:
+            records, self._records = self._records, defaultdict(dict)
+        return records
+
+
 class ChromaDBManager:
-    def __init__(self, persist_directory: str = "./chromadb"):
+    def __init__(self, persist_directory: str = "./chromadb",
+                 embedding_model_id: str = f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_MODEL_VERSION}"):
         self.persist_directory = persist_directory
+        self.embedding_model_id = embedding_model_id
         self.client = None
         self.collections = {}
+        self._cleanup_thread = None
         self.initialize_chromadb()
     
     def initialize_chromadb(self):
         """Initialize ChromaDB client and collections"""
         try:
+            import chromadb
+            from chromadb.config import Settings
+            
             os.makedirs(self.persist_directory, exist_ok=True)
             self.client = chromadb.PersistentClient(
                 path=self.persist_directory,
@@ -72,110 +624,204 @@ class ChromaDBManager:
             'cultural_assessments': 'Cultural fit assessments cache'
         }
         
+        embedding_collections = ('candidates', 'jobs')
+        
         for name, description in collection_configs.items():
             try:
+                metadata = {"description": description, "timestamp_scheme": "epoch"}
+                if name in embedding_collections:
+                    metadata["id_scheme"] = EMBEDDING_ID_SCHEME
+                    self._migrate_embedding_collection(name)
                 collection = self.client.get_or_create_collection(
                     name=name,
-                    metadata={"description": description}
+                    metadata=metadata
                 )
+                if (collection.metadata or {}).get("timestamp_scheme") != "epoch":
+                    self._backfill_epoch_timestamps(collection)
                 self.collections[name] = collection
             except Exception as e:
                 logger.error(f"Failed to create collection {name}: {e}")
     
-    def store_candidate_embedding(self, candidate: Dict, embedding: np.ndarray, career_field: str):
-        """Store candidate profile embedding"""
-        if not self.client or 'candidates' not in self.collections:
+    def _migrate_embedding_collection(self, name: str):
+        """Drop embedding collections keyed by the legacy name/title scheme so they rebuild lazily"""
+        try:
+            existing = self.client.get_collection(name=name)
+        except Exception:
             return
         
-        try:
-            candidate_id = self._generate_id(candidate.get('name', ''), 'candidate')
-            metadata = {
-                'name': candidate.get('name', 'Unknown'),
-                'years_experience': str(candidate.get('years_of_experience', 0)),
-                'career_field': career_field,
-                'education_degree': candidate.get('education', {}).get('degree', ''),
-                'timestamp': datetime.now().isoformat()
-            }
+        if (existing.metadata or {}).get("id_scheme") != EMBEDDING_ID_SCHEME:
+            logger.info(f"Rebuilding ChromaDB collection {name}: {existing.count()} entries used legacy IDs")
+            self.client.delete_collection(name=name)
+    
+    def _backfill_epoch_timestamps(self, collection, page_size: int = 500):
+        """One-time conversion of legacy ISO 'timestamp' metadata to numeric 'timestamp_epoch'"""
+        offset = 0
+        converted = 0
+        while True:
+            page = collection.get(include=['metadatas'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
             
-            # Ensure embedding is 1D
-            if embedding.ndim > 1:
-                embedding = embedding.flatten()
+            ids, metadatas = [], []
+            for record_id, metadata in zip(page['ids'], page['metadatas']):
+                metadata = dict(metadata or {})
+                if 'timestamp_epoch' in metadata:
+                    continue
+                try:
+                    metadata['timestamp_epoch'] = datetime.fromisoformat(str(metadata['timestamp'])).timestamp()
+                except (KeyError, ValueError):
+                    metadata['timestamp_epoch'] = time.time()
+                ids.append(record_id)
+                metadatas.append(metadata)
             
-            self.collections['candidates'].upsert(
-                ids=[candidate_id],
-                embeddings=[embedding.tolist()],
-                metadatas=[metadata],
-                documents=[self._create_candidate_text(candidate)]
-            )
-        except Exception as e:
-            logger.error(f"Failed to store candidate embedding: {e}")
+            if ids:
+                collection.update(ids=ids, metadatas=metadatas)
+                converted += len(ids)
+            offset += len(page['ids'])
+        
+        collection.modify(metadata={**(collection.metadata or {}), "timestamp_scheme": "epoch"})
+        logger.info(f"Converted {converted} timestamps to epoch in {collection.name}")
+    
+    def _get_by_ids(self, collection_name: str, ids: List[str], include: List[str]) -> Dict[str, Dict]:
+        """Fetch many records in a single call, keyed by ID"""
+        if not self.client or collection_name not in self.collections or not ids:
+            return {}
+        
+        unique_ids = list(dict.fromkeys(ids))
+        records = {}
+        for chunk in self._chunks(unique_ids):
+            ScoringProfile.count("chromadb.reads")
+            results = self.collections[collection_name].get(ids=chunk, include=include)
+            for i, record_id in enumerate(results['ids']):
+                records[record_id] = {field: results[field][i] for field in include if results.get(field) is not None}
+        return records
     
-    def store_job_embedding(self, job: Dict, embedding: np.ndarray, career_field: str):
-        """Store job description embedding"""
-        if not self.client or 'jobs' not in self.collections:
+    def _chunks(self, items: List) -> List[List]:
+        """Split a bulk request to respect the client's maximum batch size"""
+        try:
+            batch_size = self.client.get_max_batch_size()
+        except Exception:
+            batch_size = 5000
+        return [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+    
+    def _upsert(self, collection_name: str, records: Dict[str, Dict]):
+        """Upsert many records in a single call, or add them to the active WriteBatch until flush()"""
+        if not self.client or collection_name not in self.collections or not records:
+            return
+        
+        batch = _write_batch.get()
+        if batch is not None:
+            batch.add(collection_name, records)
             return
         
+        for ids in self._chunks(list(records.keys())):
+            kwargs = {'ids': ids}
+            for field in ('embeddings', 'metadatas', 'documents'):
+                if field in records[ids[0]]:
+                    kwargs[field] = [records[record_id][field] for record_id in ids]
+            ScoringProfile.count("chromadb.writes")
+            self.collections[collection_name].upsert(**kwargs)
+    
+    @contextmanager
+    def buffering(self, batch: Optional[WriteBatch]):
+        """Route writes made inside the block on this thread to batch (None writes through)"""
+        token = _write_batch.set(batch)
         try:
-            job_id = self._generate_id(job.get('title', ''), 'job')
-            metadata = {
-                'title': job.get('title', 'Unknown'),
-                'level': job.get('level', 'entry'),
-                'experience_required': str(job.get('experience', 0)),
-                'career_field': career_field,
-                'location': job.get('location', ''),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            # Ensure embedding is 1D
-            if embedding.ndim > 1:
-                embedding = embedding.flatten()
-            
-            self.collections['jobs'].upsert(
-                ids=[job_id],
-                embeddings=[embedding.tolist()],
-                metadatas=[metadata],
-                documents=[self._create_job_text(job)]
-            )
+            yield batch
+        finally:
+            _write_batch.reset(token)
+    
+    def flush(self, batch: WriteBatch):
+        """Write a batch's records, one upsert per collection"""
+        with self.buffering(None):
+            for collection_name, records in batch.drain().items():
+                try:
+                    self._upsert(collection_name, records)
+                except Exception as e:
+                    logger.error(f"Failed to flush {len(records)} records to {collection_name}: {e}")
+    
+    def embedding_id(self, text: str) -> str:
+        """Content fingerprint of the exact embedded text and the model that embedded it"""
+        return hashlib.sha256(f"{self.embedding_model_id}\n{text}".encode('utf-8')).hexdigest()
+    
+    def _embedding_record(self, embedding: np.ndarray, metadata: Dict, document: str) -> Dict:
+        # Ensure embedding is 1D
+        if embedding.ndim > 1:
+            embedding = embedding.flatten()
+        metadata['embedding_model'] = self.embedding_model_id
+        return {'embeddings': embedding.tolist(), 'metadatas': metadata, 'documents': document}
+    
+    def store_candidate_embedding(self, candidate: Dict, embedding: np.ndarray, career_field: str, text: str):
+        """Store candidate profile embedding under the fingerprint of its embedded text"""
+        self.store_candidate_embeddings([(candidate, embedding, career_field, text)])
+    
+    def store_candidate_embeddings(self, items: List[Tuple[Dict, np.ndarray, str, str]]):
+        """Store many candidate embeddings in one upsert"""
+        try:
+            records = {}
+            for candidate, embedding, career_field, text in items:
+                metadata = {
+                    'name': candidate.get('name', 'Unknown'),
+                    'years_experience': str(candidate.get('years_of_experience', 0)),
+                    'career_field': career_field,
+                    'education_degree': candidate.get('education', {}).get('degree', ''),
+                    'timestamp_epoch': time.time()
+                }
+                records[self.embedding_id(text)] = self._embedding_record(
+                    embedding, metadata, self._create_candidate_text(candidate)
+                )
+            self._upsert('candidates', records)
         except Exception as e:
-            logger.error(f"Failed to store job embedding: {e}")
+            logger.error(f"Failed to store candidate embedding: {e}")
     
-    def get_candidate_embedding(self, candidate: Dict) -> Optional[np.ndarray]:
-        """Retrieve candidate embedding if exists"""
-        if not self.client or 'candidates' not in self.collections:
-            return None
-        
+    def store_job_embedding(self, job: Dict, embedding: np.ndarray, career_field: str, text: str):
+        """Store job description embedding under the fingerprint of its embedded text"""
+        self.store_job_embeddings([(job, embedding, career_field, text)])
+    
+    def store_job_embeddings(self, items: List[Tuple[Dict, np.ndarray, str, str]]):
+        """Store many job embeddings in one upsert"""
         try:
-            candidate_id = self._generate_id(candidate.get('name', ''), 'candidate')
-            results = self.collections['candidates'].get(
-                ids=[candidate_id],
-                include=['embeddings']
-            )
-            
-            if results['embeddings'] is not None and len(results['embeddings']) > 0 and results['embeddings'][0] is not None:
-                return np.array(results['embeddings'][0])
+            records = {}
+            for job, embedding, career_field, text in items:
+                metadata = {
+                    'title': job.get('title', 'Unknown'),
+                    'level': job.get('level', 'entry'),
+                    'experience_required': str(job.get('experience', 0)),
+                    'career_field': career_field,
+                    'location': job.get('location', ''),
+                    'timestamp_epoch': time.time()
+                }
+                records[self.embedding_id(text)] = self._embedding_record(
+                    embedding, metadata, self._create_job_text(job)
+                )
+            self._upsert('jobs', records)
         except Exception as e:
-            logger.error(f"Failed to retrieve candidate embedding: {e}")
-        
-        return None
+            logger.error(f"Failed to store job embedding: {e}")
     
-    def get_job_embedding(self, job: Dict) -> Optional[np.ndarray]:
-        """Retrieve job embedding if exists"""
-        if not self.client or 'jobs' not in self.collections:
-            return None
-        
+    def get_candidate_embedding(self, text: str) -> Optional[np.ndarray]:
+        """Retrieve the embedding of a candidate profile text if it exists"""
+        return self.get_candidate_embeddings([text]).get(self.embedding_id(text))
+    
+    def get_candidate_embeddings(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Retrieve cached embeddings for many candidate profile texts, keyed by embedding ID"""
+        return self._get_embeddings('candidates', texts)
+    
+    def get_job_embedding(self, text: str) -> Optional[np.ndarray]:
+        """Retrieve the embedding of a job description text if it exists"""
+        return self.get_job_embeddings([text]).get(self.embedding_id(text))
+    
+    def get_job_embeddings(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Retrieve cached embeddings for many job description texts, keyed by embedding ID"""
+        return self._get_embeddings('jobs', texts)
+    
+    def _get_embeddings(self, collection_name: str, texts: List[str]) -> Dict[str, np.ndarray]:
         try:
-            job_id = self._generate_id(job.get('title', ''), 'job')
-            results = self.collections['jobs'].get(
-                ids=[job_id],
-                include=['embeddings']
-            )
-            
-            if results['embeddings'] is not None and len(results['embeddings']) > 0 and results['embeddings'][0] is not None:
-                return np.array(results['embeddings'][0])
+            records = self._get_by_ids(collection_name, [self.embedding_id(text) for text in texts], ['embeddings'])
+            return {record_id: np.array(record['embeddings']) for record_id, record in records.items()
+                    if record.get('embeddings') is not None}
         except Exception as e:
-            logger.error(f"Failed to retrieve job embedding: {e}")
-        
-        return None
+            logger.error(f"Failed to retrieve embeddings from {collection_name}: {e}")
+            return {}
     
     def find_similar_candidates(self, job_embedding: np.ndarray, career_field: str = None, top_k: int = 10) -> List[Dict]:
         """Find similar candidates using vector similarity"""
@@ -187,9 +833,10 @@ class ChromaDBManager:
             if job_embedding.ndim > 1:
                 job_embedding = job_embedding.flatten()
             
-            where_clause = {}
+            # Only compare against vectors produced by the same embedding model
+            where_clause = {"embedding_model": self.embedding_model_id}
             if career_field:
-                where_clause = {"career_field": career_field}
+                where_clause = {"$and": [where_clause, {"career_field": career_field}]}
             
             # Check if collection is empty
             collection_count = self.collections['candidates'].count()
@@ -199,10 +846,11 @@ class ChromaDBManager:
             # Limit top_k to available candidates
             actual_top_k = min(top_k, collection_count)
             
+            ScoringProfile.count("chromadb.queries")
             results = self.collections['candidates'].query(
                 query_embeddings=[job_embedding.tolist()],
                 n_results=actual_top_k,
-                where=where_clause if where_clause else None,
+                where=where_clause,
                 include=['metadatas', 'distances']
             )
             
@@ -223,89 +871,102 @@ class ChromaDBManager:
             logger.error(f"Failed to find similar candidates: {e}")
             return []
     
-    def store_skill_variations(self, skill: str, career_field: str, variations: List[str]):
+    def _skill_id(self, skill: str, career_field: str, feedback_version: str) -> str:
+        # The feedback version is part of the ID: entries made under older feedback are simply
+        # never read again and age out through cleanup_old_entries()
+        return self._generate_id(f"{skill}_{career_field}_{feedback_version}", 'skill')
+    
+    def store_skill_variations(self, skill: str, career_field: str, variations: List[str], feedback_version: str = ""):
         """Store skill variations in ChromaDB"""
-        if not self.client or 'skills' not in self.collections:
-            return
-        
+        self.store_skill_variations_batch({skill: variations}, career_field, feedback_version)
+    
+    def store_skill_variations_batch(self, variations_by_skill: Dict[str, List[str]], career_field: str,
+                                     feedback_version: str = ""):
+        """Store variations for many skills in one upsert"""
         try:
-            skill_id = self._generate_id(f"{skill}_{career_field}", 'skill')
-            metadata = {
-                'original_skill': skill,
-                'career_field': career_field,
-                'variations_count': str(len(variations)),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            self.collections['skills'].upsert(
-                ids=[skill_id],
-                metadatas=[metadata],
-                documents=[json.dumps({'skill': skill, 'variations': variations})]
-            )
+            records = {}
+            for skill, variations in variations_by_skill.items():
+                metadata = {
+                    'original_skill': skill,
+                    'career_field': career_field,
+                    'variations_count': str(len(variations)),
+                    'feedback_version': feedback_version,
+                    'timestamp_epoch': time.time()
+                }
+                records[self._skill_id(skill, career_field, feedback_version)] = {
+                    'metadatas': metadata,
+                    'documents': json.dumps({'skill': skill, 'variations': variations})
+                }
+            self._upsert('skills', records)
         except Exception as e:
             logger.error(f"Failed to store skill variations: {e}")
     
-    def get_skill_variations(self, skill: str, career_field: str) -> Optional[List[str]]:
+    def get_skill_variations(self, skill: str, career_field: str, feedback_version: str = "") -> Optional[List[str]]:
         """Retrieve skill variations from ChromaDB"""
-        if not self.client or 'skills' not in self.collections:
-            return None
-        
+        return self.get_skill_variations_batch([skill], career_field, feedback_version).get(skill)
+    
+    def get_skill_variations_batch(self, skills: List[str], career_field: str, feedback_version: str = "") -> Dict[str, List[str]]:
+        """Retrieve cached variations for many skills, keyed by skill"""
         try:
-            skill_id = self._generate_id(f"{skill}_{career_field}", 'skill')
-            results = self.collections['skills'].get(
-                ids=[skill_id],
-                include=['documents']
-            )
-            
-            if results['documents'] is not None and len(results['documents']) > 0 and results['documents'][0] is not None:
-                skill_data = json.loads(results['documents'][0])
-                return skill_data.get('variations', [])
+            ids_by_skill = {skill: self._skill_id(skill, career_field, feedback_version) for skill in skills}
+            records = self._get_by_ids('skills', list(ids_by_skill.values()), ['documents'])
+            variations = {}
+            for skill, skill_id in ids_by_skill.items():
+                document = records.get(skill_id, {}).get('documents')
+                if document is not None:
+                    variations[skill] = json.loads(document).get('variations', [])
+            return variations
         except Exception as e:
             logger.error(f"Failed to retrieve skill variations: {e}")
-        
-        return None
+            return {}
+    
+    def _cultural_id(self, candidate_name: str, job_title: str, feedback_version: str) -> str:
+        return self._generate_id(f"{candidate_name}_{job_title}_{feedback_version}", 'cultural')
     
-    def store_cultural_assessment(self, candidate_name: str, job_title: str, score: float, career_field: str):
+    def store_cultural_assessment(self, candidate_name: str, job_title: str, score: float, career_field: str,
+                                  feedback_version: str = ""):
         """Store cultural assessment result"""
-        if not self.client or 'cultural_assessments' not in self.collections:
-            return
-        
+        self.store_cultural_assessments([(candidate_name, job_title, score, career_field)], feedback_version)
+    
+    def store_cultural_assessments(self, items: List[Tuple[str, str, float, str]], feedback_version: str = ""):
+        """Store many cultural assessment results in one upsert"""
         try:
-            assessment_id = self._generate_id(f"{candidate_name}_{job_title}", 'cultural')
-            metadata = {
-                'candidate_name': candidate_name,
-                'job_title': job_title,
-                'score': str(score),
-                'career_field': career_field,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            self.collections['cultural_assessments'].upsert(
-                ids=[assessment_id],
-                metadatas=[metadata],
-                documents=[f"Cultural fit assessment for {candidate_name} and {job_title}"]
-            )
+            records = {}
+            for candidate_name, job_title, score, career_field in items:
+                metadata = {
+                    'candidate_name': candidate_name,
+                    'job_title': job_title,
+                    'score': str(score),
+                    'career_field': career_field,
+                    'feedback_version': feedback_version,
+                    'timestamp_epoch': time.time()
+                }
+                records[self._cultural_id(candidate_name, job_title, feedback_version)] = {
+                    'metadatas': metadata,
+                    'documents': f"Cultural fit assessment for {candidate_name} and {job_title}"
+                }
+            self._upsert('cultural_assessments', records)
         except Exception as e:
             logger.error(f"Failed to store cultural assessment: {e}")
     
-    def get_cultural_assessment(self, candidate_name: str, job_title: str) -> Optional[float]:
+    def get_cultural_assessment(self, candidate_name: str, job_title: str, feedback_version: str = "") -> Optional[float]:
         """Retrieve cultural assessment if exists"""
-        if not self.client or 'cultural_assessments' not in self.collections:
-            return None
-        
+        return self.get_cultural_assessments([(candidate_name, job_title)], feedback_version).get((candidate_name, job_title))
+    
+    def get_cultural_assessments(self, pairs: List[Tuple[str, str]], feedback_version: str = "") -> Dict[Tuple[str, str], float]:
+        """Retrieve cached cultural assessments for many (candidate, job) pairs"""
         try:
-            assessment_id = self._generate_id(f"{candidate_name}_{job_title}", 'cultural')
-            results = self.collections['cultural_assessments'].get(
-                ids=[assessment_id],
-                include=['metadatas']
-            )
-            
-            if results['metadatas'] is not None and len(results['metadatas']) > 0 and results['metadatas'][0] is not None:
-                return float(results['metadatas'][0]['score'])
+            ids_by_pair = {pair: self._cultural_id(*pair, feedback_version) for pair in pairs}
+            records = self._get_by_ids('cultural_assessments', list(ids_by_pair.values()), ['metadatas'])
+            scores = {}
+            for pair, assessment_id in ids_by_pair.items():
+                metadata = records.get(assessment_id, {}).get('metadatas')
+                if metadata is not None:
+                    scores[pair] = float(metadata['score'])
+            return scores
         except Exception as e:
-            logger.error(f"Failed to retrieve cultural assessment: {e}")
-        
-        return None
+            logger.error(f"Failed to retrieve cultural assessments: {e}")
+            return {}
     
     def _generate_id(self, identifier: str, prefix: str) -> str:
         """Generate consistent ID for ChromaDB"""
@@ -338,56 +999,136 @@ class ChromaDBManager:
         ]
         return '. '.join(parts)
     
-    def cleanup_old_entries(self, days_old: int = 30):
-        """Clean up old entries from ChromaDB"""
+    def cleanup_old_entries(self, days_old: int = 30, page_size: int = 500):
+        """Delete entries older than days_old using a server-side filter, one page at a time"""
         if not self.client:
             return
         
+        cutoff = time.time() - (days_old * 24 * 60 * 60)
+        for collection_name, collection in self.collections.items():
+            try:
+                removed = 0
+                while True:
+                    expired = collection.get(
+                        where={"timestamp_epoch": {"$lt": cutoff}},
+                        limit=page_size,
+                        include=[]
+                    )
+                    if not expired['ids']:
+                        break
+                    collection.delete(ids=expired['ids'])
+                    removed += len(expired['ids'])
+                
+                if removed:
+                    logger.info(f"Cleaned up {removed} old entries from {collection_name}")
+            except Exception as e:
+                logger.error(f"Failed to cleanup collection {collection_name}: {e}")
+        
+        self._write_last_cleanup(time.time())
+    
+    def _last_cleanup_path(self) -> str:
+        return os.path.join(self.persist_directory, "last_cleanup")
+    
+    def _read_last_cleanup(self) -> float:
         try:
-            cutoff_date = datetime.now().timestamp() - (days_old * 24 * 60 * 60)
-            cutoff_iso = datetime.fromtimestamp(cutoff_date).isoformat()
-            
-            for collection_name, collection in self.collections.items():
+            with open(self._last_cleanup_path(), 'r', encoding='utf-8') as f:
+                return float(f.read().strip())
+        except (OSError, ValueError):
+            return 0.0
+    
+    def _write_last_cleanup(self, timestamp: float):
+        try:
+            with open(self._last_cleanup_path(), 'w', encoding='utf-8') as f:
+                f.write(str(timestamp))
+        except OSError as e:
+            logger.error(f"Failed to record cleanup time: {e}")
+    
+    def cleanup_if_due(self, days_old: int = 30, interval_seconds: float = 24 * 60 * 60) -> bool:
+        """Run cleanup only if the last run (recorded on disk) is older than interval_seconds"""
+        if time.time() - self._read_last_cleanup() < interval_seconds:
+            return False
+        self.cleanup_old_entries(days_old)
+        return True
+    
+    def start_cleanup_schedule(self, days_old: int = 30, interval_seconds: float = 24 * 60 * 60):
+        """Run TTL cleanup in a background thread on its own schedule instead of inline"""
+        if not self.client or (self._cleanup_thread and self._cleanup_thread.is_alive()):
+            return
+        
+        def run():
+            while True:
                 try:
-                    # Get all items with timestamps older than cutoff
-                    all_items = collection.get(include=['metadatas'])
-                    old_ids = []
-                    
-                    if all_items['ids'] is not None and len(all_items['ids']) > 0:
-                        for i, metadata in enumerate(all_items['metadatas']):
-                            if metadata and metadata.get('timestamp', '') < cutoff_iso:
-                                old_ids.append(all_items['ids'][i])
-                    
-                    # Delete old items
-                    if old_ids:
-                        collection.delete(ids=old_ids)
-                        logger.info(f"Cleaned up {len(old_ids)} old entries from {collection_name}")
-                        
+                    self.cleanup_if_due(days_old, interval_seconds)
                 except Exception as e:
-                    logger.error(f"Failed to cleanup collection {collection_name}: {e}")
-        except Exception as e:
-            logger.error(f"Failed to cleanup old entries: {e}")
+                    logger.error(f"Scheduled ChromaDB cleanup failed: {e}")
+                wait = max(60.0, self._read_last_cleanup() + interval_seconds - time.time())
+                time.sleep(wait)
+        
+        self._cleanup_thread = threading.Thread(target=run, name="chromadb-cleanup", daemon=True)
+        self._cleanup_thread.start()
 
 class FeedbackManager:
     def __init__(self, feedback_dir: str = "./feedback"):
         self.feedback_dir = feedback_dir
         self.feedback_cache = {'general': []}
+        # Per-file (mtime, size) and parsed lines, so refresh() only re-reads files that changed
+        self._file_state = {}
+        self._file_feedback = {}
+        self.version = ""
         self.load_feedback()
     
     def load_feedback(self):
+        """Re-read every feedback file"""
+        self._file_state = {}
+        self._file_feedback = {}
+        self.refresh()
+    
+    def refresh(self) -> bool:
+        """Re-read only feedback files whose mtime or size changed; returns True if the feedback changed"""
         os.makedirs(self.feedback_dir, exist_ok=True)
+        changed = False
+        current_files = set()
         for file_path in glob.glob(f"{self.feedback_dir}/*.json"):
+            current_files.add(file_path)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    feedback_data = json.load(f)
-                if isinstance(feedback_data, dict) and 'feedback' in feedback_data:
-                    feedback_list = feedback_data['feedback']
-                    if isinstance(feedback_list, list):
-                        for feedback_text in feedback_list:
-                            if isinstance(feedback_text, str) and feedback_text.strip():
-                                self.feedback_cache['general'].append(feedback_text.strip())
-            except Exception as e:
-                logger.error(f"Failed to load feedback from {file_path}: {e}")
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            state = (stat.st_mtime_ns, stat.st_size)
+            if self._file_state.get(file_path) == state:
+                continue
+            self._file_state[file_path] = state
+            self._file_feedback[file_path] = self._read_feedback_file(file_path)
+            changed = True
+        
+        for file_path in set(self._file_feedback) - current_files:
+            del self._file_feedback[file_path]
+            self._file_state.pop(file_path, None)
+            changed = True
+        
+        if changed or not self.version:
+            self.feedback_cache = {'general': [line for path in sorted(self._file_feedback) for line in self._file_feedback[path]]}
+            self.version = self._compute_version()
+        return changed
+    
+    def _read_feedback_file(self, file_path: str) -> List[str]:
+        lines = []
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                feedback_data = json.load(f)
+            if isinstance(feedback_data, dict) and 'feedback' in feedback_data:
+                feedback_list = feedback_data['feedback']
+                if isinstance(feedback_list, list):
+                    for feedback_text in feedback_list:
+                        if isinstance(feedback_text, str) and feedback_text.strip():
+                            lines.append(feedback_text.strip())
+        except Exception as e:
+            logger.error(f"Failed to load feedback from {file_path}: {e}")
+        return lines
+    
+    def _compute_version(self) -> str:
+        """Hash of the feedback text actually injected into prompts"""
+        return hashlib.sha256(self.format_feedback_for_prompt().encode('utf-8')).hexdigest()[:16]
     
     def get_feedback_for_category(self, category: str) -> List[str]:
         return self.feedback_cache.get('general', [])[-5:]
@@ -404,42 +1145,200 @@ Previous Feedback and Learning Points:
 Please consider these insights when providing your assessment.
 """
 
+# Prompt templates. Everything shared by consecutive calls (instructions, feedback, job context)
+# comes first and per-call data last, so Ollama can reuse the KV cache of the common prefix.
+
+def skill_variations_prompt_prefix(career_field: str, feedback_text: str) -> str:
+    return f"""Generate synonyms and variations for a skill in {career_field} careers.
+Include: Common abbreviations and acronyms, Related technologies, tools, or concepts, Different ways this skill might be written on resumes
+Limit to maximum 10 most relevant variations
+Respond with only the variations, comma-separated.
+{feedback_text}
+Career Field: {career_field}
+"""
+
+def skill_variations_prompt(skill: str, career_field: str, feedback_text: str) -> str:
+    return skill_variations_prompt_prefix(career_field, feedback_text) + f"""Skill: {skill}
+Variations (comma-separated):"""
+
+def skill_variations_batch_prompt_prefix(career_field: str, feedback_text: str) -> str:
+    return f"""Generate synonyms and variations for each of the following skills in {career_field} careers.
+Include: Common abbreviations and acronyms, Related technologies, tools, or concepts, Different ways each skill might be written on resumes
+Limit to maximum 10 most relevant variations per skill
+Respond with only a JSON object that maps every skill, written exactly as given, to a list of its variations.
+{feedback_text}
+Career Field: {career_field}
+"""
+
+def skill_variations_batch_prompt(skills: List[str], career_field: str, feedback_text: str) -> str:
+    return skill_variations_batch_prompt_prefix(career_field, feedback_text) + f"""Skills: {json.dumps(skills)}
+JSON:"""
+
+def cultural_fit_prompt_prefix(job: Dict, career_field: str, feedback_text: str) -> str:
+    job_soft = job.get('required_skills', {}).get('soft_skills', {})
+    return f"""Assess the cultural fit between a candidate and this job position in {career_field}.
+Rate cultural fit from 0.0 to 1.0 considering: Communication style match, Leadership potential vs requirements, Team collaboration abilities, Work environment fit, Career stage appropriateness
+Respond with only the numerical score (e.g., 0.82).
+{feedback_text}
+Job: {job.get('title', 'Unknown')}
+Job Level: {job.get('level', 'entry')}
+Required Soft Skills: {list(job_soft.keys())}
+Job Location: {job.get('location', 'Unknown')}
+Work Type: {job.get('location_type', 'Unknown')}
+"""
+
+def cultural_fit_prompt(candidate: Dict, job: Dict, career_field: str, feedback_text: str) -> str:
+    candidate_soft = candidate.get('skills', {}).get('soft_skills', {})
+    return cultural_fit_prompt_prefix(job, career_field, feedback_text) + f"""Candidate: {candidate.get('name', 'Unknown')}
+Candidate Soft Skills: {list(candidate_soft.keys())}
+Experience Level: {candidate.get('years_of_experience', 0)} years
+Cultural fit score:"""
+
+# Career-field keyword rules, in priority order: the first rule with a term contained in the
+# (lowercased) text wins. S2_CAREER_FIELD_RULES may name a JSON file with the same shape
+# ({"job_title": [["data science", ["data", ...]], ...], ...}); tables it defines replace these.
+CAREER_FIELD_RULES = {
+    "job_title": [
+        ("data science", ['data', 'scientist', 'analyst', 'ml', 'ai']),
+        ("software development", ['developer', 'engineer', 'programmer', 'software']),
+        ("marketing", ['marketing', 'brand', 'digital', 'social media']),
+        ("design", ['designer', 'ui', 'ux', 'graphic', 'creative']),
+        ("finance", ['finance', 'accounting', 'financial', 'analyst']),
+        ("human resources", ['hr', 'human resources', 'recruitment', 'talent']),
+        ("sales", ['sales', 'business development', 'account']),
+        ("project management", ['project manager', 'product manager', 'scrum']),
+        ("devops", ['devops', 'infrastructure', 'cloud', 'system admin']),
+        ("cybersecurity", ['security', 'cyber', 'information security']),
+        ("business analytics", ['business', 'analytics', 'intelligence', 'strategy']),
+        ("civil engineering", ['civil engineer', 'structural', 'construction'])
+    ],
+    "candidate_degree": [
+        ("business analytics", ['data science', 'data analytics', 'business analytics']),
+        ("software development", ['computer science', 'software', 'programming']),
+        ("design", ['design', 'art', 'graphics']),
+        ("marketing", ['marketing', 'business administration']),
+        ("finance", ['finance', 'accounting']),
+        ("civil engineering", ['civil engineering']),
+        ("engineering", ['engineering'])
+    ],
+    "candidate_skills": [
+        ("business analytics", ['data science', 'data visualization', 'business intelligence', 'tableau', 'power bi']),
+        ("software development", ['python', 'programming', 'software development', 'java', 'javascript']),
+        ("design", ['design', 'ui', 'ux', 'canva', 'photoshop', 'illustrator']),
+        ("marketing", ['marketing', 'business planning', 'social media']),
+        ("business analytics", ['excel', 'word', 'powerpoint', 'office']),
+        ("civil engineering", ['autocad', 'structural design', 'construction'])
+    ]
+}
+
+
+class CareerFieldClassifier:
+    """Ordered keyword rule tables, each compiled into one regex and memoized per classified text"""
+    
+    def __init__(self, rules: Dict[str, List] = None, cache_capacity: int = MAPPER_CACHE_CAPACITY):
+        self.fields = {}
+        self.patterns = {}
+        for table, table_rules in (rules or CAREER_FIELD_RULES).items():
+            self.fields[table] = [field for field, _ in table_rules]
+            # Group r<i> is rule i; the zero-width lookahead tries every position without consuming
+            # text, so overlapping terms are all seen and the lowest rule index found wins
+            alternatives = [f"(?P<r{i}>{'|'.join(re.escape(term.lower()) for term in terms)})"
+                            for i, (_, terms) in enumerate(table_rules) if terms]
+            self.patterns[table] = re.compile(f"(?=(?:{'|'.join(alternatives)}))") if alternatives else None
+        self.cache = BoundedLRUCache(cache_capacity, name='career_field_cache')
+    
+    @classmethod
+    def from_config(cls, path: str = None) -> 'CareerFieldClassifier':
+        path = path or os.environ.get('S2_CAREER_FIELD_RULES')
+        rules = dict(CAREER_FIELD_RULES)
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    rules.update({table: [(field, list(terms)) for field, terms in table_rules]
+                                  for table, table_rules in json.load(f).items()})
+            except Exception as e:
+                logger.error(f"Error loading career field rules from {path}, using the built-in rules: {e}")
+                rules = CAREER_FIELD_RULES
+        return cls(rules)
+    
+    def classify(self, table: str, text: str) -> Optional[str]:
+        """Field of the first rule of the table with a term in text, or None"""
+        key = (table, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached or None
+        
+        best = None
+        pattern = self.patterns.get(table)
+        if pattern is not None:
+            for match in pattern.finditer(text):
+                index = int(match.lastgroup[1:])
+                if best is None or index < best:
+                    best = index
+                    if best == 0:
+                        break
+        field = self.fields[table][best] if best is not None else None
+        self.cache[key] = field or ""
+        return field
+
+
 class DynamicSkillSynonymMapper:
-    def __init__(self, ollama_url: str = "http://localhost:11434", feedback_manager=None, chromadb_manager=None):
+    def __init__(self, ollama_url: str = "http://localhost:11434", feedback_manager=None, chromadb_manager=None,
+                 cache_capacity: int = MAPPER_CACHE_CAPACITY, cache_ttl_seconds: Optional[float] = None):
         self.ollama_url = ollama_url
-        self.synonym_cache = {}
-        self.relevancy_cache = {}
+        self.llm_client = OllamaClient(ollama_url)
+        self.synonym_cache = BoundedLRUCache(cache_capacity, cache_ttl_seconds, name='synonym_cache')
+        self.relevancy_cache = BoundedLRUCache(cache_capacity, cache_ttl_seconds, name='relevancy_cache')
+        # Pair similarities keyed symmetrically, so (A, B) and (B, A) share one entry
+        self.similarity_cache = BoundedLRUCache(cache_capacity * 4, cache_ttl_seconds, name='similarity_cache')
         self.feedback_manager = feedback_manager
         self.chromadb_manager = chromadb_manager
-        
-    def _call_ollama_api(self, prompt: str, model: str = "mistral", timeout: int = 400, max_retries: int = 3) -> str:
+        # Cache keys already looked up in ChromaDB by prefetch() and known to be absent
+        self.chromadb_misses = BoundedLRUCache(cache_capacity, cache_ttl_seconds, name='chromadb_misses')
+        # Per-thread count of deterministic fallbacks, used to tag degraded scores
+        self._local = threading.local()
+        # Skill variants expanded so far (bounded), whose signatures fuzzy matching in _compare_skill_variations() reuses
+        self.fuzzy_index = MinHashLSHIndex(capacity=cache_capacity)
+        self.career_fields = CareerFieldClassifier.from_config()
+    
+    @property
+    def fallback_count(self) -> int:
+        return getattr(self._local, 'fallbacks', 0)
+    
+    def _note_fallback(self):
+        # Fallback results are never cached, so they are recomputed once Ollama is back
+        self._local.fallbacks = self.fallback_count + 1
+        ScoringProfile.count("llm.fallbacks")
+        
+    @property
+    def feedback_version(self) -> str:
+        """Version of the feedback injected into prompts; part of every LLM-derived cache key"""
+        return self.feedback_manager.version if self.feedback_manager else ""
+    
+    def _skill_key(self, skill: str, career_field: str) -> str:
+        return f"{skill.lower()}_{career_field.lower()}_{self.feedback_version}"
+    
+    def _cultural_key(self, candidate_name: str, job_title: str) -> str:
+        return f"cultural_{candidate_name}_{job_title}_{self.feedback_version}"
+    
+    def _call_ollama_api(self, prompt: str, model: str = "mistral", timeout: int = 400, max_retries: int = 3,
+                         num_predict: int = 200, stop_when=None) -> str:
         """Call Ollama API with retry logic and better error handling"""
+        options = {"temperature": 0.1, "top_p": 0.9, "num_predict": num_predict}
         for attempt in range(max_retries):
             try:
-                response = requests.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        "model": model, 
-                        "prompt": prompt, 
-                        "stream": False, 
-                        "options": {
-                            "temperature": 0.1, 
-                            "top_p": 0.9, 
-                            "num_predict": 200
-                        }
-                    },
-                    timeout=timeout
-                )
-                
-                if response.status_code == 200:
-                    result = response.json().get("response", "").strip()
-                    if result:  # Only return if we got a valid response
-                        return result
-                    else:
-                        logger.warning(f"Empty response from Ollama on attempt {attempt + 1}")
+                result = self.llm_client.generate(prompt, model=model, options=options, timeout=timeout,
+                                                  keep_alive=OLLAMA_KEEP_ALIVE, stop_when=stop_when).strip()
+                if result:  # Only return if we got a valid response
+                    return result
                 else:
-                    logger.warning(f"Ollama API returned status {response.status_code} on attempt {attempt + 1}")
+                    logger.warning(f"Empty response from Ollama on attempt {attempt + 1}")
                     
+            except CircuitOpenError:
+                # Ollama is known to be down or too slow: fall back immediately, no retries
+                return ""
+            except requests.exceptions.HTTPError as e:
+                logger.warning(f"Ollama API returned status {e.response.status_code if e.response is not None else 'unknown'} on attempt {attempt + 1}")
             except requests.exceptions.ConnectionError:
                 logger.error(f"Cannot connect to Ollama server at {self.ollama_url} on attempt {attempt + 1}")
             except requests.exceptions.Timeout:
@@ -447,6 +1346,8 @@ class DynamicSkillSynonymMapper:
             except Exception as e:
                 logger.error(f"Ollama API call failed on attempt {attempt + 1}: {e}")
             
+            if self.llm_client.breaker.is_open:
+                return ""
             if attempt < max_retries - 1:
                 time.sleep(2 ** attempt)  # Exponential backoff
         
@@ -456,49 +1357,18 @@ class DynamicSkillSynonymMapper:
     
     def get_career_field_from_job(self, job_description: Dict) -> str:
         title = job_description.get('title', '').lower()
-        all_skills = []
-        required_skills = job_description.get('required_skills', {})
-        if 'technical_skills' in required_skills:
-            all_skills.extend(list(required_skills['technical_skills'].keys()))
-        if 'soft_skills' in required_skills:
-            all_skills.extend(list(required_skills['soft_skills'].keys()))
-        
-        if any(term in title for term in ['data', 'scientist', 'analyst', 'ml', 'ai']): return "data science"
-        elif any(term in title for term in ['developer', 'engineer', 'programmer', 'software']): return "software development"
-        elif any(term in title for term in ['marketing', 'brand', 'digital', 'social media']): return "marketing"
-        elif any(term in title for term in ['designer', 'ui', 'ux', 'graphic', 'creative']): return "design"
-        elif any(term in title for term in ['finance', 'accounting', 'financial', 'analyst']): return "finance"
-        elif any(term in title for term in ['hr', 'human resources', 'recruitment', 'talent']): return "human resources"
-        elif any(term in title for term in ['sales', 'business development', 'account']): return "sales"
-        elif any(term in title for term in ['project manager', 'product manager', 'scrum']): return "project management"
-        elif any(term in title for term in ['devops', 'infrastructure', 'cloud', 'system admin']): return "devops"
-        elif any(term in title for term in ['security', 'cyber', 'information security']): return "cybersecurity"
-        elif any(term in title for term in ['business', 'analytics', 'intelligence', 'strategy']): return "business analytics"
-        elif any(term in title for term in ['civil engineer', 'structural', 'construction']): return "civil engineering"
-        return "general"
+        return self.career_fields.classify("job_title", title) or "general"
     
     def get_career_field_from_candidate(self, candidate: Dict) -> str:
         education = candidate.get('education', {})
         degree = education.get('degree', '').lower()
-        
-        if any(term in degree for term in ['data science', 'data analytics', 'business analytics']): return "business analytics"
-        elif any(term in degree for term in ['computer science', 'software', 'programming']): return "software development"
-        elif any(term in degree for term in ['design', 'art', 'graphics']): return "design"
-        elif any(term in degree for term in ['marketing', 'business administration']): return "marketing"
-        elif any(term in degree for term in ['finance', 'accounting']): return "finance"
-        elif any(term in degree for term in ['civil engineering']): return "civil engineering"
-        elif any(term in degree for term in ['engineering']): return "engineering"
+        field = self.career_fields.classify("candidate_degree", degree)
+        if field:
+            return field
         
         all_skills = self._get_all_candidate_skills_for_analysis(candidate)
         skill_names = ' '.join(all_skills.keys()).lower()
-        
-        if any(term in skill_names for term in ['data science', 'data visualization', 'business intelligence', 'tableau', 'power bi']): return "business analytics"
-        elif any(term in skill_names for term in ['python', 'programming', 'software development', 'java', 'javascript']): return "software development"
-        elif any(term in skill_names for term in ['design', 'ui', 'ux', 'canva', 'photoshop', 'illustrator']): return "design"
-        elif any(term in skill_names for term in ['marketing', 'business planning', 'social media']): return "marketing"
-        elif any(term in skill_names for term in ['excel', 'word', 'powerpoint', 'office']): return "business analytics"
-        elif any(term in skill_names for term in ['autocad', 'structural design', 'construction']): return "civil engineering"
-        return "general"
+        return self.career_fields.classify("candidate_skills", skill_names) or "general"
     
     def _get_all_candidate_skills_for_analysis(self, candidate: Dict) -> Dict[str, int]:
         skills = candidate.get('skills', {})
@@ -517,47 +1387,159 @@ class DynamicSkillSynonymMapper:
         return all_skills
     
     def get_skill_variations(self, skill: str, career_field: str = "general") -> List[str]:
-        cache_key = f"{skill.lower()}_{career_field.lower()}"
-        if cache_key in self.synonym_cache:
-            return self.synonym_cache[cache_key]
+        cache_key = self._skill_key(skill, career_field)
+        cached = self.synonym_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Check ChromaDB first
-        if self.chromadb_manager:
-            cached_variations = self.chromadb_manager.get_skill_variations(skill, career_field)
+        if self.chromadb_manager and cache_key not in self.chromadb_misses:
+            cached_variations = self.chromadb_manager.get_skill_variations(skill, career_field, self.feedback_version)
             if cached_variations:
                 self.synonym_cache[cache_key] = cached_variations
                 return cached_variations
         
         feedback_text = self.feedback_manager.format_feedback_for_prompt() if self.feedback_manager else ""
-        prompt = f"""Generate synonyms and variations for the skill "{skill}" in {career_field} careers.
-Include: Common abbreviations and acronyms, Related technologies, tools, or concepts, Different ways this skill might be written on resumes
-Limit to maximum 10 most relevant variations
-{feedback_text}
-Skill: {skill}
-Career Field: {career_field}
-Variations (comma-separated):"""
+        prompt = skill_variations_prompt(skill, career_field, feedback_text)
 
         response = self._call_ollama_api(prompt)
         if not response:
-            # Basic fallback variations
-            basic_variations = [
-                skill.lower(), 
-                skill.lower().replace(" ", ""), 
-                skill.lower().replace(" ", "-"), 
-                skill.lower().replace(" ", "_")
-            ]
-            self.synonym_cache[cache_key] = basic_variations
-            return basic_variations
+            self._note_fallback()
+            return self._basic_variations(skill)
         
         variations = self._parse_variations_response(response, skill)
         self.synonym_cache[cache_key] = variations
         
-        # Store in ChromaDB for future use
-        if self.chromadb_manager:
-            self.chromadb_manager.store_skill_variations(skill, career_field, variations)
+        # Store in ChromaDB for future use
+        if self.chromadb_manager:
+            self.chromadb_manager.store_skill_variations(skill, career_field, variations, self.feedback_version)
+            self.chromadb_misses.discard(cache_key)
+        
+        return variations
+    
+    def _basic_variations(self, skill: str) -> List[str]:
+        """Spelling variants used when the LLM is unavailable"""
+        return [
+            skill.lower(),
+            skill.lower().replace(" ", ""),
+            skill.lower().replace(" ", "-"),
+            skill.lower().replace(" ", "_")
+        ]
+    
+    def get_skill_variations_batch(self, skills: List[str], career_field: str = "general") -> Dict[str, List[str]]:
+        """Expand many skills at once: memory, then one ChromaDB read, then one LLM prompt per token-budget chunk"""
+        skill_keys = {}
+        for skill in skills:
+            skill_keys.setdefault(self._skill_key(skill, career_field), skill)
+        
+        missing = {key: skill for key, skill in skill_keys.items() if key not in self.synonym_cache}
+        if self.chromadb_manager:
+            lookup = [skill for key, skill in missing.items() if key not in self.chromadb_misses]
+            found_variations = self.chromadb_manager.get_skill_variations_batch(lookup, career_field, self.feedback_version)
+            for skill in lookup:
+                key = self._skill_key(skill, career_field)
+                if found_variations.get(skill):
+                    self.synonym_cache[key] = found_variations[skill]
+                    del missing[key]
+                else:
+                    self.chromadb_misses.add(key)
+        
+        generated = {}
+        for chunk in self._chunk_skills_by_token_budget(list(missing.values())):
+            generated.update(self._generate_variations_batch(chunk, career_field))
+        
+        if generated and self.chromadb_manager:
+            self.chromadb_manager.store_skill_variations_batch(generated, career_field, self.feedback_version)
+            for skill in generated:
+                self.chromadb_misses.discard(self._skill_key(skill, career_field))
         
+        variations = {skill: self.synonym_cache[key] for key, skill in skill_keys.items() if key in self.synonym_cache}
+        # Build the fuzzy index over the whole vocabulary up front rather than pair by pair while scoring
+        self.fuzzy_index.update(variant for skill_variations in variations.values() for variant in skill_variations)
         return variations
     
+    def _chunk_skills_by_token_budget(self, skills: List[str], token_budget: int = SKILL_BATCH_TOKEN_BUDGET) -> List[List[str]]:
+        # Fixed instructions take roughly 150 tokens; each skill costs its name plus its share of the answer
+        chunks, current, used = [], [], 150
+        for skill in skills:
+            cost = len(skill) // 4 + 4 + SKILL_BATCH_OUTPUT_TOKENS_PER_SKILL
+            if current and used + cost > token_budget:
+                chunks.append(current)
+                current, used = [], 150
+            current.append(skill)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _generate_variations_batch(self, skills: List[str], career_field: str) -> Dict[str, List[str]]:
+        """Ask for all skills in one prompt; returns the LLM-generated variations to persist"""
+        if len(skills) == 1:
+            # The single-skill path caches and stores its own result
+            self.get_skill_variations(skills[0], career_field)
+            return {}
+        
+        feedback_text = self.feedback_manager.format_feedback_for_prompt() if self.feedback_manager else ""
+        prompt = skill_variations_batch_prompt(skills, career_field, feedback_text)
+        
+        response = self._call_ollama_api(
+            prompt, num_predict=SKILL_BATCH_OUTPUT_TOKENS_PER_SKILL * len(skills) + 50, stop_when=json_object_complete
+        )
+        if not response:
+            # Left uncached: scoring falls back per skill and tags the affected pairs as degraded
+            self._note_fallback()
+            return {}
+        
+        parsed = self._parse_variations_map(response)
+        generated = {}
+        for skill in skills:
+            values = parsed.get(skill.lower())
+            if not isinstance(values, list):
+                # Only skills the model left out or garbled are retried one at a time
+                self.get_skill_variations(skill, career_field)
+                continue
+            variations = self._parse_variations_response(
+                ', '.join(str(v).replace(',', ' ') for v in values), skill
+            )
+            self.synonym_cache[self._skill_key(skill, career_field)] = variations
+            generated[skill] = variations
+        return generated
+    
+    def _parse_variations_map(self, response: str) -> Dict[str, Any]:
+        """Extract the skill -> variations JSON object, keyed by lowercased skill"""
+        start, end = response.find('{'), response.rfind('}')
+        if start == -1 or end <= start:
+            logger.warning("Batch skill variations response contained no JSON object")
+            return {}
+        try:
+            parsed = json.loads(response[start:end + 1])
+        except json.JSONDecodeError as e:
+            logger.warning(f"Could not parse batch skill variations response: {e}")
+            return {}
+        if not isinstance(parsed, dict):
+            return {}
+        return {str(key).strip().lower(): value for key, value in parsed.items()}
+    
+    def prefetch(self, skills: List[str], pairs: List[Tuple[str, str]], career_field: str):
+        """Expand all skills in bulk and load cached cultural assessments in one call"""
+        self.get_skill_variations_batch(skills, career_field)
+        if not self.chromadb_manager:
+            return
+        
+        pair_keys = {pair: self._cultural_key(*pair) for pair in dict.fromkeys(pairs)}
+        missing_pairs = [pair for pair, key in pair_keys.items() if key not in self.relevancy_cache]
+        found_scores = self.chromadb_manager.get_cultural_assessments(missing_pairs, self.feedback_version)
+        for pair in missing_pairs:
+            if pair in found_scores:
+                self.relevancy_cache[pair_keys[pair]] = found_scores[pair]
+            else:
+                self.chromadb_misses.add(pair_keys[pair])
+    
+    def prefetch_cultural_fit(self, candidates: List[Dict], job: Dict, career_field: str):
+        """Assess every uncached candidate for one job back to back so consecutive prompts share the job prefix"""
+        for candidate in candidates:
+            self.ai_assess_cultural_fit(candidate, job, career_field)
+    
     def _parse_variations_response(self, response: str, original_skill: str) -> List[str]:
         variations = [original_skill.lower()]
         response = response.replace("Variations:", "").strip()
@@ -572,6 +1554,18 @@ Variations (comma-separated):"""
         return variations[:10]
     
     def calculate_skill_similarity(self, skill1: str, skill2: str, career_field: str = "general") -> float:
+        pair_key = (*sorted((skill1.lower(), skill2.lower())), career_field.lower(), self.feedback_version)
+        cached = self.similarity_cache.get(pair_key)
+        if cached is not None:
+            return cached
+        
+        fallbacks_before = self.fallback_count
+        similarity = self._compare_skill_variations(skill1, skill2, career_field)
+        if self.fallback_count == fallbacks_before:
+            self.similarity_cache[pair_key] = similarity
+        return similarity
+    
+    def _compare_skill_variations(self, skill1: str, skill2: str, career_field: str) -> float:
         variations1 = set(self.get_skill_variations(skill1, career_field))
         variations2 = set(self.get_skill_variations(skill2, career_field))
         
@@ -579,46 +1573,57 @@ Variations (comma-separated):"""
         
         intersection = variations1.intersection(variations2)
         if intersection: return 0.95
+        # "Node.js", "Node JS" and "nodejs" are the same variation once punctuation and spacing are ignored
+        compact1 = {compact_skill(v) for v in variations1}
+        compact2 = {compact_skill(v) for v in variations2}
+        if compact1 & compact2: return 0.95
         
+        # One variation containing the other ("sql" in "postgresql", "python" in "python programming")
         for v1 in variations1:
             for v2 in variations2:
                 if len(v1) > 2 and len(v2) > 2:
                     if v1 in v2 or v2 in v1: return 0.6
-        return 0.0
+        for c1 in compact1:
+            for c2 in compact2:
+                if len(c1) > 2 and len(c2) > 2:
+                    if c1 in c2 or c2 in c1: return 0.6
+        
+        # Otherwise graded by 3-gram Jaccard of the closest variants found through the LSH buckets
+        jaccard = self.fuzzy_index.best_similarity(variations1, variations2)
+        if not jaccard:
+            return 0.0
+        scale = (jaccard - FUZZY_MIN_JACCARD) / (1.0 - FUZZY_MIN_JACCARD)
+        return round(FUZZY_MIN_SIMILARITY + (FUZZY_MAX_SIMILARITY - FUZZY_MIN_SIMILARITY) * scale, 2)
+    
+    def cache_stats(self) -> Dict[str, Dict]:
+        return {
+            'synonym_cache': self.synonym_cache.get_stats(),
+            'relevancy_cache': self.relevancy_cache.get_stats(),
+            'similarity_cache': self.similarity_cache.get_stats(),
+            'chromadb_misses': self.chromadb_misses.get_stats()
+        }
     
     def ai_assess_cultural_fit(self, candidate: Dict, job: Dict, career_field: str) -> float:
         candidate_name = candidate.get('name', 'unknown')
         job_title = job.get('title', 'unknown')
         
-        # Check ChromaDB first
-        if self.chromadb_manager:
-            cached_score = self.chromadb_manager.get_cultural_assessment(candidate_name, job_title)
+        cache_key = self._cultural_key(candidate_name, job_title)
+        cached_score = self.relevancy_cache.get(cache_key)
+        if cached_score is not None:
+            return cached_score
+        
+        # Check ChromaDB before asking the LLM
+        if self.chromadb_manager and cache_key not in self.chromadb_misses:
+            cached_score = self.chromadb_manager.get_cultural_assessment(candidate_name, job_title, self.feedback_version)
             if cached_score is not None:
+                self.relevancy_cache[cache_key] = cached_score
                 return cached_score
         
-        cache_key = f"cultural_{candidate_name}_{job_title}"
-        if cache_key in self.relevancy_cache:
-            return self.relevancy_cache[cache_key]
-        
-        candidate_soft = candidate.get('skills', {}).get('soft_skills', {})
-        job_soft = job.get('required_skills', {}).get('soft_skills', {})
         feedback_text = self.feedback_manager.format_feedback_for_prompt() if self.feedback_manager else ""
+        prompt = cultural_fit_prompt(candidate, job, career_field, feedback_text)
         
-        prompt = f"""Assess the cultural fit between this candidate and job position in {career_field}.
-Job: {job.get('title', 'Unknown')}
-Job Level: {job.get('level', 'entry')}
-Required Soft Skills: {list(job_soft.keys())}
-Job Location: {job.get('location', 'Unknown')}
-Work Type: {job.get('location_type', 'Unknown')}
-Candidate: {candidate.get('name', 'Unknown')}
-Candidate Soft Skills: {list(candidate_soft.keys())}
-Experience Level: {candidate.get('years_of_experience', 0)} years
-{feedback_text}
-Rate cultural fit from 0.0 to 1.0 considering: Communication style match, Leadership potential vs requirements, Team collaboration abilities, Work environment fit, Career stage appropriateness
-Respond with only the numerical score (e.g., 0.82).
-Cultural fit score:"""
-        
-        response = self._call_ollama_api(prompt)
+        # Only the first number is used, so stop generating as soon as it is complete
+        response = self._call_ollama_api(prompt, stop_when=number_complete)
         try:
             score_match = re.search(r'(\d+\.?\d*)', response)
             if score_match:
@@ -629,12 +1634,14 @@ Cultural fit score:"""
                 
                 # Store in ChromaDB for future use
                 if self.chromadb_manager:
-                    self.chromadb_manager.store_cultural_assessment(candidate_name, job_title, score, career_field)
+                    self.chromadb_manager.store_cultural_assessment(candidate_name, job_title, score, career_field, self.feedback_version)
+                    self.chromadb_misses.discard(cache_key)
                 
                 return score
         except Exception as e:
             logger.error(f"Error parsing cultural fit score: {e}")
         
+        self._note_fallback()
         return self._basic_cultural_fit_calculation(candidate, job)
     
     def _basic_cultural_fit_calculation(self, candidate: Dict, job: Dict) -> float:
@@ -643,32 +1650,145 @@ Cultural fit score:"""
         if not job_soft: return 0.75
         return len(candidate_soft.intersection(job_soft)) / len(job_soft)
 
+class TorchEmbeddingBackend:
+    """Full-precision sentence-transformers model, on GPU when available"""
+    name = 'torch'
+    
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+        self.model = None
+        self.device = None
+    
+    def load(self):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if self.device == "cuda": 
+            torch.cuda.empty_cache()
+        
+        self.model = SentenceTransformer(self.model_name)
+        if self.device == "cuda": 
+            self.model = self.model.to('cuda')
+    
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(list(texts)))
+
+class OnnxInt8EmbeddingBackend:
+    """int8-quantized ONNX Runtime export of the same model for CPU-only hosts.
+    
+    Reproduces the sentence-transformers pipeline (tokenize, transformer,
+    attention-masked mean pooling, L2 normalization) without importing torch.
+    Files are read from S2_ONNX_MODEL_DIR when set, otherwise from the
+    Hugging Face hub copy of the model.
+    """
+    name = 'onnx-int8'
+    
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, model_dir: str = None,
+                 model_file: str = "onnx/model_quint8_avx2.onnx", max_length: int = 256):
+        self.model_name = model_name
+        self.model_dir = model_dir or os.environ.get('S2_ONNX_MODEL_DIR')
+        self.model_file = os.environ.get('S2_ONNX_MODEL_FILE', model_file)
+        self.max_length = max_length
+        self.session = None
+        self.tokenizer = None
+        self.input_names = ()
+        self.device = "cpu"
+    
+    def _resolve(self, filename: str) -> str:
+        if self.model_dir:
+            return os.path.join(self.model_dir, filename)
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(repo_id=f"sentence-transformers/{self.model_name}", filename=filename)
+    
+    def load(self):
+        import onnxruntime
+        from tokenizers import Tokenizer
+        
+        self.tokenizer = Tokenizer.from_file(self._resolve("tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_length)
+        self.tokenizer.enable_padding()
+        
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            self._resolve(self.model_file), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = tuple(model_input.name for model_input in self.session.get_inputs())
+    
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        batches = []
+        texts = list(texts)
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {'input_ids': input_ids, 'attention_mask': attention_mask,
+                     'token_type_ids': np.zeros_like(input_ids)}
+            token_embeddings = self.session.run(None, {name: feeds[name] for name in self.input_names})[0]
+            
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled / norms)
+        
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate(batches)
+
+EMBEDDING_BACKENDS = {
+    TorchEmbeddingBackend.name: TorchEmbeddingBackend,
+    OnnxInt8EmbeddingBackend.name: OnnxInt8EmbeddingBackend
+}
+
 class ModelManager:
-    def __init__(self):
+    def __init__(self, backend: str = None):
+        self.backend_name = backend or os.environ.get('S2_EMBEDDING_BACKEND', TorchEmbeddingBackend.name)
+        if self.backend_name not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{self.backend_name}', expected one of {sorted(EMBEDDING_BACKENDS)}")
+        
         self.embedding_model = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model_id = f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_MODEL_VERSION}"
+        if self.backend_name != TorchEmbeddingBackend.name:
+            # Quantized vectors differ slightly, so they get their own cache entries
+            self.model_id += f"+{self.backend_name}"
+        self.device = None
         
     def load_models(self):
         """Load only the embedding model"""
-        if self.device == "cuda": 
-            torch.cuda.empty_cache()
+        if self.embedding_model is not None:
+            return
         
         try:
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-            if self.device == "cuda": 
-                self.embedding_model = self.embedding_model.to('cuda')
-            logger.info(f"Embedding model loaded successfully on {self.device}")
+            backend = EMBEDDING_BACKENDS[self.backend_name]()
+            backend.load()
+            self.device = backend.device
+            self.embedding_model = backend
+            logger.info(f"Embedding model loaded successfully with {self.backend_name} backend on {self.device}")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             self.embedding_model = None
 
 class SmartRecruitMatcher:
-    def __init__(self, ollama_url: str = "http://localhost:11434", feedback_dir: str = "./feedback", chromadb_dir: str = "./chromadb"):
-        self.model_manager = ModelManager()
+    def __init__(self, ollama_url: str = "http://localhost:11434", feedback_dir: str = "./feedback", chromadb_dir: str = "./chromadb",
+                 embedding_backend: str = None, eager_breakdown: bool = False, profiling: bool = None,
+                 min_important_coverage: float = None, skill_index_path: str = None):
+        self.model_manager = ModelManager(embedding_backend)
         self.skill_mapper = None
+        # When False, per-skill match details are only computed for results that are actually read (e.g. the top-N)
+        self.eager_breakdown = eager_breakdown
+        # Opt-in cost accounting per pair (MatchingResult.profile) and in total since start-up
+        self.profiling = profiling if profiling is not None else os.environ.get('S2_PROFILE', '').lower() in ('1', 'true', 'yes')
+        self.profile_totals = ProfileAggregate()
+        # Candidates covering less than this fraction of a job's important skills are not scored (0 disables)
+        self.min_important_coverage = (min_important_coverage if min_important_coverage is not None
+                                       else float(os.environ.get('S2_MIN_IMPORTANT_COVERAGE', 0)))
+        self.skill_index = SkillIndex(skill_index_path)
         self.ollama_url = ollama_url
         self.feedback_manager = FeedbackManager(feedback_dir)
-        self.chromadb_manager = ChromaDBManager(chromadb_dir)
+        self.chromadb_manager = ChromaDBManager(chromadb_dir, embedding_model_id=self.model_manager.model_id)
+        # Embeddings keyed by ChromaDB embedding ID, filled in bulk by prefetch_for_job()
+        self.embedding_cache = BoundedLRUCache(EMBEDDING_CACHE_CAPACITY, name='embedding_cache')
         
     def initialize(self):
         """Initialize the matcher with simplified model loading"""
@@ -757,40 +1877,131 @@ class SmartRecruitMatcher:
                     soft_skills[skill] = 50  # Default level
         return soft_skills
     
-    def calculate_technical_score(self, candidate: Dict, job: Dict, career_field: str) -> float:
-        candidate_tech = self._get_candidate_technical_skills(candidate)
-        job_tech = self._get_job_technical_skills(job)
-        if not job_tech: return 50.0
+    def compile_candidate(self, candidate: Dict) -> CandidateFeatures:
+        """Normalize a candidate once so scoring never re-walks the raw dict"""
+        if isinstance(candidate, CandidateFeatures):
+            return candidate
+        
+        technical = self._get_candidate_technical_skills(candidate)
+        soft = self._get_candidate_soft_skills(candidate)
+        all_skills = {**technical, **soft}
+        education = candidate.get('education', {})
+        
+        try:
+            years = float(candidate.get('years_of_experience', 0))
+        except (ValueError, TypeError):
+            years = None
+        
+        certifications = education.get('certifications', [])
+        if isinstance(certifications, str): certifications = [certifications]
+        degree = education.get('degree', '').lower()
+        
+        return CandidateFeatures(
+            raw=candidate,
+            name=candidate.get('name', 'Unknown'),
+            technical_skills=tuple(technical.keys()),
+            technical_levels=np.array(list(technical.values()), dtype=np.int64),
+            soft_skills=tuple(soft.keys()),
+            soft_levels=np.array(list(soft.values()), dtype=np.int64),
+            all_skills=tuple(all_skills.keys()),
+            all_levels=np.array(list(all_skills.values()), dtype=np.int64),
+            career_field=self.skill_mapper.get_career_field_from_candidate(candidate),
+            years=years,
+            education_degree=degree,
+            education_field=education.get('field', '').lower(),
+            education_level=self._education_level(degree),
+            certification_count=len(certifications) if certifications else 0,
+            profile_text=self._create_candidate_profile_text(candidate)
+        )
+    
+    def compile_job(self, job: Dict) -> JobFeatures:
+        """Normalize a job once so scoring never re-walks the raw dict"""
+        if isinstance(job, JobFeatures):
+            return job
+        
+        technical = self._get_job_technical_skills(job)
+        soft = self._get_job_soft_skills(job)
         
+        try:
+            experience_years = float(job.get('experience', 0))
+        except (ValueError, TypeError):
+            experience_years = None
+        
+        education_requirement = job.get('education_level', '')
+        title = job.get('title', '')
+        
+        return JobFeatures(
+            raw=job,
+            title=job.get('title', 'Unknown'),
+            title_lower=title.lower(),
+            level=job.get('level', 'entry').lower(),
+            technical_skills=tuple(technical.keys()),
+            technical_levels=np.array(list(technical.values()), dtype=np.int64),
+            soft_skills=tuple(soft.keys()),
+            soft_levels=np.array(list(soft.values()), dtype=np.int64),
+            important_skills=tuple(job.get('important_skills', [])),
+            career_field=self.skill_mapper.get_career_field_from_job(job),
+            experience_years=experience_years,
+            education_requirement=education_requirement,
+            education_level=self._education_level(education_requirement.lower()),
+            description_text=self._create_job_description_text(job)
+        )
+    
+    def compile_candidates(self, candidates: List[Dict]) -> List[CandidateFeatures]:
+        """Compile a candidate pool, skipping records that cannot be normalized"""
+        compiled = []
+        for candidate in candidates:
+            try:
+                compiled.append(self.compile_candidate(candidate))
+            except Exception as e:
+                name = candidate.name if isinstance(candidate, CandidateFeatures) else candidate.get('name', 'Unknown')
+                logger.error(f"Error compiling candidate {name}: {e}")
+        return compiled
+    
+    def _best_skill_matches(self, required: Tuple[str, ...], candidate_skills: Tuple[str, ...], career_field: str) -> np.ndarray:
+        """Similarity matrix of shape (len(required), len(candidate_skills))"""
+        similarities = np.zeros((len(required), len(candidate_skills)))
+        for i, req_skill in enumerate(required):
+            for j, cand_skill in enumerate(candidate_skills):
+                similarities[i, j] = self.skill_mapper.calculate_skill_similarity(req_skill, cand_skill, career_field)
+        return similarities
+    
+    def _weighted_skill_score(self, required: Tuple[str, ...], required_levels: np.ndarray, candidate_skills: Tuple[str, ...],
+                              candidate_levels: np.ndarray, career_field: str, max_confidence: float) -> float:
+        similarities = self._best_skill_matches(required, candidate_skills, career_field)
         total_score = 0
         total_weight = 0
         
-        for req_skill, req_level in job_tech.items():
-            req_level = int(req_level)
+        for i, req_level in enumerate(required_levels.tolist()):
             best_match_score = 0
-            
-            for cand_skill, cand_level in candidate_tech.items():
-                cand_level = int(cand_level)
-                similarity = self.skill_mapper.calculate_skill_similarity(req_skill, cand_skill, career_field)
-                if similarity > 0.5:
-                    level_confidence = min(1.2, cand_level / max(req_level, 1))  # Avoid division by zero
-                    match_score = similarity * level_confidence * 100
-                    best_match_score = max(best_match_score, match_score)
+            if candidate_skills:
+                level_confidence = np.minimum(max_confidence, candidate_levels / max(req_level, 1))  # Avoid division by zero
+                match_scores = np.where(similarities[i] > 0.5, similarities[i] * level_confidence * 100, 0)
+                best_match_score = float(match_scores.max())
             
             total_score += best_match_score * req_level
             total_weight += req_level
         
-        return min(100.0, (total_score / total_weight) if total_weight > 0 else 0)
+        return (total_score / total_weight) if total_weight > 0 else 0
     
-    def calculate_experience_score(self, candidate: Dict, job: Dict) -> float:
-        try:
-            candidate_years = float(candidate.get('years_of_experience', 0))
-            required_years = float(job.get('experience', 0))
-        except (ValueError, TypeError):
+    def calculate_technical_score(self, candidate: CandidateFeatures, job: JobFeatures, career_field: str) -> float:
+        candidate = self.compile_candidate(candidate)
+        job = self.compile_job(job)
+        if not job.technical_skills: return 50.0
+        
+        score = self._weighted_skill_score(job.technical_skills, job.technical_levels, candidate.technical_skills,
+                                           candidate.technical_levels, career_field, 1.2)
+        return min(100.0, score)
+    
+    def calculate_experience_score(self, candidate: CandidateFeatures, job: JobFeatures) -> float:
+        candidate = self.compile_candidate(candidate)
+        job = self.compile_job(job)
+        if candidate.years is None or job.experience_years is None:
             candidate_years = 0
             required_years = 0
-            
-        job_level = job.get('level', 'entry').lower()
+        else:
+            candidate_years = candidate.years
+            required_years = job.experience_years
         
         if required_years == 0:
             years_score = 40
@@ -801,105 +2012,122 @@ class SmartRecruitMatcher:
             else:
                 years_score = years_ratio * 30
         
-        level_score = self._calculate_level_appropriateness(candidate_years, job_level)
+        level_score = self._calculate_level_appropriateness(candidate_years, job.level)
         progression_score = self._assess_career_progression(candidate, job)
         
         return min(100.0, years_score + level_score + progression_score)
     
+    LEVEL_RANGES = {
+        'entry': (0, 2), 'junior': (1, 3), 'intermediate': (3, 6),
+        'senior': (5, 10), 'lead': (8, 15), 'expert': (10, 20)
+    }
+    
     def _calculate_level_appropriateness(self, years: float, level: str) -> float:
-        level_ranges = {
-            'entry': (0, 2), 'junior': (1, 3), 'intermediate': (3, 6),
-            'senior': (5, 10), 'lead': (8, 15), 'expert': (10, 20)
-        }
-        min_years, max_years = level_ranges.get(level, (0, 5))
+        min_years, max_years = self.LEVEL_RANGES.get(level, (0, 5))
         
         if min_years <= years <= max_years: return 35
         elif years < min_years: return max(0, 35 - (min_years - years) * 10)
         else: return max(20, 35 - (years - max_years) * 2)
     
-    def _assess_career_progression(self, candidate: Dict, job: Dict) -> float:
-        try:
-            years = float(candidate.get('years_of_experience', 0))
-        except (ValueError, TypeError):
-            years = 0
-            
-        education = candidate.get('education', {})
-        degree = education.get('degree', '').lower()
-        
-        education_score = 0
-        if any(term in degree for term in ['master', 'mba', 'phd']): education_score = 10
-        elif any(term in degree for term in ['bachelor', 'degree']): education_score = 5
-        
-        return education_score + min(15, years * 2)
+    def _assess_career_progression(self, candidate: CandidateFeatures, job: JobFeatures) -> float:
+        years = candidate.years if candidate.years is not None else 0
+        return self._progression_bonus(candidate.education_degree) + min(15, years * 2)
     
-    def calculate_cultural_score(self, candidate: Dict, job: Dict, career_field: str) -> float:
-        candidate_soft = self._get_candidate_soft_skills(candidate)
-        job_soft = self._get_job_soft_skills(job)
-        if not job_soft: return 75.0
+    def _progression_bonus(self, degree: str) -> int:
+        if any(term in degree for term in ['master', 'mba', 'phd']): return 10
+        elif any(term in degree for term in ['bachelor', 'degree']): return 5
+        return 0
+    
+    def candidate_table(self, candidates: List[CandidateFeatures]) -> CandidateTable:
+        return CandidateTable(candidates, self._progression_bonus)
+    
+    def experience_scores(self, table: CandidateTable, job: JobFeatures) -> np.ndarray:
+        """calculate_experience_score() for every candidate of the table at once (fmin/fmax mirror Python's min/max on NaN)"""
+        job = self.compile_job(job)
+        if job.experience_years is None:
+            years = required = np.zeros(table.size)
+        else:
+            years = table.years
+            required = np.where(table.has_years, float(job.experience_years), 0.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = years / np.where(required == 0, 1.0, required)
+        years_score = np.where(required == 0, 40.0,
+                               np.where(ratio >= 1.0, np.fmin(40, 30 + (ratio - 1.0) * 10), ratio * 30))
+        
+        min_years, max_years = self.LEVEL_RANGES.get(job.level, (0, 5))
+        with np.errstate(invalid='ignore'):
+            level_score = np.where((min_years <= years) & (years <= max_years), 35.0,
+                                   np.where(years < min_years, np.fmax(0, 35 - (min_years - years) * 10),
+                                            np.fmax(20, 35 - (years - max_years) * 2)))
+        progression_score = table.progression_bonus + np.fmin(15, table.years * 2)
+        return np.fmin(100.0, years_score + level_score + progression_score)
+    
+    def education_scores(self, table: CandidateTable, job: JobFeatures) -> np.ndarray:
+        """calculate_education_score() for every candidate of the table at once"""
+        job = self.compile_job(job)
+        required = job.education_level
+        levels = table.education_level
+        if required == 0:
+            education_score = np.full(table.size, 80.0)
+        else:
+            education_score = np.where(levels >= required, 100.0,
+                                       np.where(levels == required - 1, 70.0,
+                                                np.maximum(30, 100 - (required - levels) * 25)).astype(np.float64))
+        field_relevance = np.array([self._assess_field_relevance(field, job) for field in table.fields], dtype=np.float64)
+        field_score = field_relevance[table.field_code] if table.size else np.zeros(0)
+        counts = table.certification_count
+        cert_score = np.where(counts == 0, 50.0, np.minimum(100, counts * 20 + 50)).astype(np.float64)
+        return np.fmin(100.0, education_score * 0.6 + field_score * 0.3 + cert_score * 0.1)
+    
+    def calculate_cultural_score(self, candidate: CandidateFeatures, job: JobFeatures, career_field: str) -> float:
+        candidate = self.compile_candidate(candidate)
+        job = self.compile_job(job)
+        if not job.soft_skills: return 75.0
         
-        soft_skills_score = self._calculate_soft_skills_match(candidate_soft, job_soft, career_field)
-        cultural_fit_score = self.skill_mapper.ai_assess_cultural_fit(candidate, job, career_field) * 100
+        soft_skills_score = self._calculate_soft_skills_match(candidate, job, career_field)
+        cultural_fit_score = self.skill_mapper.ai_assess_cultural_fit(candidate.raw, job.raw, career_field) * 100
         return soft_skills_score * 0.6 + cultural_fit_score * 0.4
     
-    def _calculate_soft_skills_match(self, candidate_soft: Dict, job_soft: Dict, career_field: str) -> float:
-        total_score = 0
-        total_weight = 0
-        
-        for req_skill, req_level in job_soft.items():
-            req_level = int(req_level)
-            best_match_score = 0
-            
-            for cand_skill, cand_level in candidate_soft.items():
-                cand_level = int(cand_level)
-                similarity = self.skill_mapper.calculate_skill_similarity(req_skill, cand_skill, career_field)
-                if similarity > 0.5:
-                    level_confidence = min(1.0, cand_level / max(req_level, 1))  # Avoid division by zero
-                    match_score = similarity * level_confidence * 100
-                    best_match_score = max(best_match_score, match_score)
-            
-            total_score += best_match_score * req_level
-            total_weight += req_level
-        
-        return (total_score / total_weight) if total_weight > 0 else 0
+    def _calculate_soft_skills_match(self, candidate: CandidateFeatures, job: JobFeatures, career_field: str) -> float:
+        return self._weighted_skill_score(job.soft_skills, job.soft_levels, candidate.soft_skills,
+                                          candidate.soft_levels, career_field, 1.0)
     
-    def calculate_education_score(self, candidate: Dict, job: Dict) -> float:
-        candidate_education = candidate.get('education', {})
-        job_education_req = job.get('education_level', '')
-        candidate_degree = candidate_education.get('degree', '').lower()
-        candidate_field = candidate_education.get('field', '').lower()
+    def calculate_education_score(self, candidate: CandidateFeatures, job: JobFeatures) -> float:
+        candidate = self.compile_candidate(candidate)
+        job = self.compile_job(job)
         
-        education_score = self._match_education_level(candidate_degree, job_education_req)
-        field_score = self._assess_field_relevance(candidate_field, job)
-        cert_score = self._assess_certifications(candidate_education, job)
+        education_score = self._score_education_levels(candidate.education_level, job.education_level)
+        field_score = self._assess_field_relevance(candidate.education_field, job)
+        cert_score = self._assess_certifications(candidate.certification_count)
         
         return min(100.0, education_score * 0.6 + field_score * 0.3 + cert_score * 0.1)
     
+    EDUCATION_HIERARCHY = {
+        'phd': 5, 'doctorate': 5, 'master': 4, 'mba': 4, 'ms': 4,
+        'bachelor': 3, 'degree': 3, 'associate': 2, 'diploma': 2,
+        'certificate': 1, 'high school': 1
+    }
+    
+    def _education_level(self, text: str) -> int:
+        level = 0
+        for edu_type, edu_level in self.EDUCATION_HIERARCHY.items():
+            if edu_type in text:
+                level = max(level, edu_level)
+        return level
+    
     def _match_education_level(self, candidate_degree: str, job_requirement: str) -> float:
-        education_hierarchy = {
-            'phd': 5, 'doctorate': 5, 'master': 4, 'mba': 4, 'ms': 4,
-            'bachelor': 3, 'degree': 3, 'associate': 2, 'diploma': 2,
-            'certificate': 1, 'high school': 1
-        }
-        
-        candidate_level = 0
-        for edu_type, level in education_hierarchy.items():
-            if edu_type in candidate_degree:
-                candidate_level = max(candidate_level, level)
-        
-        required_level = 0
-        job_req_lower = job_requirement.lower()
-        for edu_type, level in education_hierarchy.items():
-            if edu_type in job_req_lower:
-                required_level = max(required_level, level)
-        
+        return self._score_education_levels(self._education_level(candidate_degree), self._education_level(job_requirement.lower()))
+    
+    def _score_education_levels(self, candidate_level: int, required_level: int) -> float:
         if required_level == 0: return 80
         if candidate_level >= required_level: return 100
         elif candidate_level == required_level - 1: return 70
         else: return max(30, 100 - (required_level - candidate_level) * 25)
     
-    def _assess_field_relevance(self, candidate_field: str, job: Dict) -> float:
-        job_title = job.get('title', '').lower()
-        career_field = self.skill_mapper.get_career_field_from_job(job)
+    def _assess_field_relevance(self, candidate_field: str, job: JobFeatures) -> float:
+        job_title = job.title_lower
+        career_field = job.career_field
         
         if candidate_field in job_title or job_title in candidate_field: return 100
         
@@ -916,47 +2144,95 @@ class SmartRecruitMatcher:
             if field in candidate_field: return 80
         return 50
     
-    def _assess_certifications(self, education: Dict, job: Dict) -> float:
-        certifications = education.get('certifications', [])
-        if isinstance(certifications, str): certifications = [certifications]
-        if not certifications: return 50
-        return min(100, len(certifications) * 20 + 50)
+    def _assess_certifications(self, certification_count: int) -> float:
+        if not certification_count: return 50
+        return min(100, certification_count * 20 + 50)
     
-    def calculate_ai_enhanced_score(self, candidate: Dict, job: Dict) -> float:
+    def calculate_ai_enhanced_score(self, candidate: CandidateFeatures, job: JobFeatures) -> float:
+        candidate = self.compile_candidate(candidate)
+        job = self.compile_job(job)
         if not self.model_manager.embedding_model:
             return self._fallback_semantic_score(candidate, job)
         
         try:
-            # Check if embeddings are cached in ChromaDB
-            candidate_embedding = self.chromadb_manager.get_candidate_embedding(candidate) if self.chromadb_manager else None
-            job_embedding = self.chromadb_manager.get_job_embedding(job) if self.chromadb_manager else None
-            
-            # Generate embeddings if not cached
-            if candidate_embedding is None:
-                candidate_text = self._create_candidate_profile_text(candidate)
-                candidate_embedding = self.model_manager.embedding_model.encode([candidate_text])[0]
-                
-                # Store in ChromaDB for future use
-                if self.chromadb_manager:
-                    career_field = self.skill_mapper.get_career_field_from_candidate(candidate)
-                    self.chromadb_manager.store_candidate_embedding(candidate, candidate_embedding, career_field)
-            
-            if job_embedding is None:
-                job_text = self._create_job_description_text(job)
-                job_embedding = self.model_manager.embedding_model.encode([job_text])[0]
-                
-                # Store in ChromaDB for future use
-                if self.chromadb_manager:
-                    career_field = self.skill_mapper.get_career_field_from_job(job)
-                    self.chromadb_manager.store_job_embedding(job, job_embedding, career_field)
+            candidate_embedding = self._get_candidate_embedding(candidate)
+            job_embedding = self._get_job_embedding(job)
             
             # Calculate similarity
-            similarity = cosine_similarity([candidate_embedding], [job_embedding])[0][0]
+            similarity = cosine_similarity(candidate_embedding, job_embedding)
             return float(similarity * 100)
         except Exception as e:
             logger.error(f"Error in AI enhanced score calculation: {e}")
             return self._fallback_semantic_score(candidate, job)
     
+    def _get_candidate_embedding(self, candidate: CandidateFeatures) -> np.ndarray:
+        embedding_id = self.chromadb_manager.embedding_id(candidate.profile_text)
+        embedding = self.embedding_cache.get(embedding_id)
+        if embedding is None:
+            # Check if embedding is cached in ChromaDB
+            embedding = self.chromadb_manager.get_candidate_embedding(candidate.profile_text)
+            if embedding is None:
+                embedding = self.model_manager.embedding_model.encode([candidate.profile_text])[0]
+                # Store in ChromaDB for future use
+                self.chromadb_manager.store_candidate_embedding(candidate.raw, embedding, candidate.career_field, candidate.profile_text)
+            self.embedding_cache[embedding_id] = embedding
+        return embedding
+    
+    def _get_job_embedding(self, job: JobFeatures) -> np.ndarray:
+        embedding_id = self.chromadb_manager.embedding_id(job.description_text)
+        embedding = self.embedding_cache.get(embedding_id)
+        if embedding is None:
+            # Check if embedding is cached in ChromaDB
+            embedding = self.chromadb_manager.get_job_embedding(job.description_text)
+            if embedding is None:
+                embedding = self.model_manager.embedding_model.encode([job.description_text])[0]
+                # Store in ChromaDB for future use
+                self.chromadb_manager.store_job_embedding(job.raw, embedding, job.career_field, job.description_text)
+            self.embedding_cache[embedding_id] = embedding
+        return embedding
+    
+    def prefetch_for_job(self, job: JobFeatures, candidates: List[CandidateFeatures]):
+        """Bulk-load embeddings and cached assessments for a whole batch before scoring"""
+        try:
+            # Pick up feedback added since the last job; entries made under older feedback then
+            # miss their versioned keys and are regenerated below
+            if self.feedback_manager.refresh():
+                logger.info(f"Feedback changed, cache version is now {self.feedback_manager.version}")
+            
+            if self.model_manager.embedding_model:
+                self._prefetch_embeddings(job, candidates)
+            
+            # Priority order for (re)generation: important skills, then required skills, then candidate skills
+            skills = list(job.important_skills + job.technical_skills + job.soft_skills)
+            for candidate in candidates:
+                skills.extend(candidate.all_skills)
+            pairs = [(candidate.raw.get('name', 'unknown'), job.raw.get('title', 'unknown')) for candidate in candidates]
+            self.skill_mapper.prefetch(skills, pairs, job.career_field)
+            
+            # calculate_cultural_score() only asks the LLM when the job lists soft skills
+            if job.soft_skills:
+                self.skill_mapper.prefetch_cultural_fit([candidate.raw for candidate in candidates], job.raw, job.career_field)
+        except Exception as e:
+            logger.error(f"Failed to prefetch cached data for job {job.title}: {e}")
+    
+    def _prefetch_embeddings(self, job: JobFeatures, candidates: List[CandidateFeatures]):
+        missing_candidates = {}
+        for candidate in candidates:
+            embedding_id = self.chromadb_manager.embedding_id(candidate.profile_text)
+            if embedding_id not in self.embedding_cache:
+                missing_candidates[embedding_id] = candidate
+        
+        self.embedding_cache.update(self.chromadb_manager.get_candidate_embeddings([c.profile_text for c in missing_candidates.values()]))
+        to_encode = {embedding_id: c for embedding_id, c in missing_candidates.items() if embedding_id not in self.embedding_cache}
+        if to_encode:
+            embeddings = self.model_manager.embedding_model.encode([c.profile_text for c in to_encode.values()])
+            self.embedding_cache.update(zip(to_encode.keys(), embeddings))
+            self.chromadb_manager.store_candidate_embeddings([
+                (c.raw, e, c.career_field, c.profile_text) for c, e in zip(to_encode.values(), embeddings)
+            ])
+        
+        self._get_job_embedding(job)
+    
     def _create_candidate_profile_text(self, candidate: Dict) -> str:
         parts = [f"Candidate: {candidate.get('name', 'Unknown')}", f"Experience: {candidate.get('years_of_experience', 0)} years"]
         
@@ -999,9 +2275,9 @@ class SmartRecruitMatcher:
         
         return '. '.join(parts)
     
-    def _fallback_semantic_score(self, candidate: Dict, job: Dict) -> float:
-        candidate_text = self._create_candidate_profile_text(candidate).lower()
-        job_text = self._create_job_description_text(job).lower()
+    def _fallback_semantic_score(self, candidate: CandidateFeatures, job: JobFeatures) -> float:
+        candidate_text = candidate.profile_text.lower()
+        job_text = job.description_text.lower()
         job_keywords = set(re.findall(r'\b\w{3,}\b', job_text))
         candidate_keywords = set(re.findall(r'\b\w{3,}\b', candidate_text))
         common_keywords = job_keywords.intersection(candidate_keywords)
@@ -1009,82 +2285,90 @@ class SmartRecruitMatcher:
         if not total_keywords: return 50.0
         return min(100.0, (len(common_keywords) / len(total_keywords)) * 200)
     
-    def calculate_matching_score(self, candidate: Dict, job: Dict) -> MatchingResult:
-        job_career_field = self.skill_mapper.get_career_field_from_job(job)
-        candidate_career_field = self.skill_mapper.get_career_field_from_candidate(candidate)
-        
-        technical_score = self.calculate_technical_score(candidate, job, job_career_field)
-        experience_score = self.calculate_experience_score(candidate, job)
-        cultural_score = self.calculate_cultural_score(candidate, job, job_career_field)
-        education_score = self.calculate_education_score(candidate, job)
-        ai_enhanced_score = self.calculate_ai_enhanced_score(candidate, job)
+    def calculate_matching_score(self, candidate: CandidateFeatures, job: JobFeatures,
+                                 experience_score: Optional[float] = None, education_score: Optional[float] = None) -> MatchingResult:
+        """Score one pair; experience/education scores already computed for the whole job (see job_scores) are used as given"""
+        candidate = self.compile_candidate(candidate)
+        job = self.compile_job(job)
+        job_career_field = job.career_field
+        candidate_career_field = candidate.career_field
+        fallbacks_before = self.skill_mapper.fallback_count
+        
+        profile = ScoringProfile() if self.profiling else None
+        with ScoringProfile.activate(profile):
+            technical_score = self._component(profile, 'technical', self.calculate_technical_score, candidate, job, job_career_field)
+            if experience_score is None:
+                experience_score = self._component(profile, 'experience', self.calculate_experience_score, candidate, job)
+            cultural_score = self._component(profile, 'cultural', self.calculate_cultural_score, candidate, job, job_career_field)
+            if education_score is None:
+                education_score = self._component(profile, 'education', self.calculate_education_score, candidate, job)
+            ai_enhanced_score = self._component(profile, 'ai_enhanced', self.calculate_ai_enhanced_score, candidate, job)
+        if profile is not None:
+            self.profile_totals.add(profile, pairs=1)
         
         overall_score = (technical_score * 0.30 + cultural_score * 0.20 + experience_score * 0.25 + 
                         education_score * 0.10 + ai_enhanced_score * 0.15)
         
+        education = candidate.raw.get('education', {})
+        degraded = self.skill_mapper.fallback_count > fallbacks_before
+        skill_details = {
+            "technical_skill_matches": lambda: self._get_technical_skill_matches(candidate, job, job_career_field),
+            "soft_skill_matches": lambda: self._get_soft_skill_matches(candidate, job, job_career_field),
+            "important_skill_coverage": lambda: self._get_important_skill_coverage(candidate, job, job_career_field)
+        }
+        breakdown = {
+            "career_field_match": job_career_field == candidate_career_field,
+            "job_career_field": job_career_field,
+            "candidate_career_field": candidate_career_field,
+            "years_of_experience": candidate.raw.get('years_of_experience', 0),
+            "job_experience_requirement": job.raw.get('experience', 0),
+            "job_level": job.raw.get('level', 'unknown'),
+            "education_match": {
+                "candidate_degree": education.get('degree', 'Unknown'),
+                "job_requirement": job.raw.get('education_level', 'Not specified'),
+                "field_relevance": education.get('field', 'Unknown')
+            },
+            **{key: None for key in skill_details},
+            "feedback_enhanced": bool(self.feedback_manager.feedback_cache.get('general')),
+            "chromadb_enhanced": self.chromadb_manager.client is not None,
+            "ollama_enhanced": not degraded,
+            "degraded_mode": degraded,
+            "scoring_weights": {"technical": "30%", "cultural": "20%", "experience": "25%", "education": "10%", "ai_enhanced": "15%"}
+        }
+        if self.eager_breakdown:
+            breakdown.update({key: factory() for key, factory in skill_details.items()})
+        else:
+            breakdown = LazyBreakdown.build(breakdown, skill_details)
         return MatchingResult(
-            candidate_name=candidate.get('name', 'Unknown'),
-            job_title=job.get('title', 'Unknown'),
+            candidate_name=candidate.name,
+            job_title=job.title,
             overall_score=round(overall_score, 1),
             technical_score=round(technical_score, 1),
             experience_score=round(experience_score, 1),
             cultural_score=round(cultural_score, 1),
             education_score=round(education_score, 1),
             ai_enhanced_score=round(ai_enhanced_score, 1),
-            detailed_breakdown={
-                "career_field_match": job_career_field == candidate_career_field,
-                "job_career_field": job_career_field,
-                "candidate_career_field": candidate_career_field,
-                "years_of_experience": candidate.get('years_of_experience', 0),
-                "job_experience_requirement": job.get('experience', 0),
-                "job_level": job.get('level', 'unknown'),
-                "education_match": {
-                    "candidate_degree": candidate.get('education', {}).get('degree', 'Unknown'),
-                    "job_requirement": job.get('education_level', 'Not specified'),
-                    "field_relevance": candidate.get('education', {}).get('field', 'Unknown')
-                },
-                "technical_skill_matches": self._get_technical_skill_matches(candidate, job, job_career_field),
-                "soft_skill_matches": self._get_soft_skill_matches(candidate, job, job_career_field),
-                "important_skill_coverage": self._get_important_skill_coverage(candidate, job, job_career_field),
-                "feedback_enhanced": bool(self.feedback_manager.feedback_cache.get('general')),
-                "chromadb_enhanced": self.chromadb_manager.client is not None,
-                "ollama_enhanced": True,  # Since we're using Ollama exclusively
-                "scoring_weights": {"technical": "30%", "cultural": "20%", "experience": "25%", "education": "10%", "ai_enhanced": "15%"}
-            }
+            detailed_breakdown=breakdown,
+            degraded=degraded,
+            candidate_id=candidate_id(candidate.raw),
+            profile=profile.to_dict() if profile is not None else None
         )
     
-    def _get_technical_skill_matches(self, candidate: Dict, job: Dict, career_field: str) -> Dict:
-        candidate_tech = self._get_candidate_technical_skills(candidate)
-        job_tech = self._get_job_technical_skills(job)
-        matches = {}
-        
-        for req_skill, req_level in job_tech.items():
-            best_match = {"candidate_skill": None, "similarity": 0, "candidate_level": 0, "required_level": req_level, "confidence": 0}
-            
-            for cand_skill, cand_level in candidate_tech.items():
-                similarity = self.skill_mapper.calculate_skill_similarity(req_skill, cand_skill, career_field)
-                if similarity > best_match["similarity"]:
-                    level_conf = min(1.2, int(cand_level) / max(int(req_level), 1))  # Avoid division by zero
-                    confidence = similarity * level_conf
-                    best_match.update({
-                        "candidate_skill": cand_skill, "similarity": round(similarity, 2),
-                        "candidate_level": cand_level, "confidence": round(confidence, 2)
-                    })
-            matches[req_skill] = best_match
-        return matches
+    def _component(self, profile: Optional[ScoringProfile], name: str, method: Callable, *args):
+        return method(*args) if profile is None else profile.measure(name, method, *args)
     
-    def _get_soft_skill_matches(self, candidate: Dict, job: Dict, career_field: str) -> Dict:
-        candidate_soft = self._get_candidate_soft_skills(candidate)
-        job_soft = self._get_job_soft_skills(job)
+    def _skill_match_details(self, required: Tuple[str, ...], required_levels: np.ndarray, candidate_skills: Tuple[str, ...],
+                             candidate_levels: np.ndarray, career_field: str, max_confidence: float) -> Dict:
+        similarities = self._best_skill_matches(required, candidate_skills, career_field)
         matches = {}
         
-        for req_skill, req_level in job_soft.items():
+        for i, (req_skill, req_level) in enumerate(zip(required, required_levels.tolist())):
             best_match = {"candidate_skill": None, "similarity": 0, "candidate_level": 0, "required_level": req_level, "confidence": 0}
             
-            for cand_skill, cand_level in candidate_soft.items():
-                similarity = self.skill_mapper.calculate_skill_similarity(req_skill, cand_skill, career_field)
+            for j, (cand_skill, cand_level) in enumerate(zip(candidate_skills, candidate_levels.tolist())):
+                similarity = float(similarities[i, j])
                 if similarity > best_match["similarity"]:
-                    level_conf = min(1.0, int(cand_level) / max(int(req_level), 1))  # Avoid division by zero
+                    level_conf = min(max_confidence, cand_level / max(req_level, 1))  # Avoid division by zero
                     confidence = similarity * level_conf
                     best_match.update({
                         "candidate_skill": cand_skill, "similarity": round(similarity, 2),
@@ -1093,18 +2377,23 @@ class SmartRecruitMatcher:
             matches[req_skill] = best_match
         return matches
     
-    def _get_important_skill_coverage(self, candidate: Dict, job: Dict, career_field: str) -> List:
-        important_skills = job.get('important_skills', [])
-        candidate_tech = self._get_candidate_technical_skills(candidate)
-        candidate_soft = self._get_candidate_soft_skills(candidate)
-        all_candidate_skills = {**candidate_tech, **candidate_soft}
+    def _get_technical_skill_matches(self, candidate: CandidateFeatures, job: JobFeatures, career_field: str) -> Dict:
+        return self._skill_match_details(job.technical_skills, job.technical_levels, candidate.technical_skills,
+                                         candidate.technical_levels, career_field, 1.2)
+    
+    def _get_soft_skill_matches(self, candidate: CandidateFeatures, job: JobFeatures, career_field: str) -> Dict:
+        return self._skill_match_details(job.soft_skills, job.soft_levels, candidate.soft_skills,
+                                         candidate.soft_levels, career_field, 1.0)
+    
+    def _get_important_skill_coverage(self, candidate: CandidateFeatures, job: JobFeatures, career_field: str) -> List:
+        similarities = self._best_skill_matches(job.important_skills, candidate.all_skills, career_field)
         coverage = []
         
-        for imp_skill in important_skills:
+        for i, imp_skill in enumerate(job.important_skills):
             best_match = {"important_skill": imp_skill, "candidate_skill": None, "similarity": 0, "candidate_level": 0, "covered": False}
             
-            for cand_skill, cand_level in all_candidate_skills.items():
-                similarity = self.skill_mapper.calculate_skill_similarity(imp_skill, cand_skill, career_field)
+            for j, (cand_skill, cand_level) in enumerate(zip(candidate.all_skills, candidate.all_levels.tolist())):
+                similarity = float(similarities[i, j])
                 if similarity > best_match["similarity"]:
                     best_match.update({
                         "candidate_skill": cand_skill, "similarity": round(similarity, 2),
@@ -1113,17 +2402,107 @@ class SmartRecruitMatcher:
             coverage.append(best_match)
         return coverage
     
-    def find_top_candidates_for_job(self, job: Dict, candidates: List[Dict], top_n: int = 5) -> List[MatchingResult]:
-        results = []
-        for candidate in candidates:
-            try:
-                result = self.calculate_matching_score(candidate, job)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Error calculating score for candidate {candidate.get('name', 'Unknown')}: {e}")
-                continue
-        results.sort(key=lambda x: x.overall_score, reverse=True)
-        return results[:top_n]
+    def score_candidates(self, job: Dict, candidates: List[Dict], executor: Optional[Executor] = None) -> Iterator[MatchingResult]:
+        """Score candidates against one job, yielding each result as soon as it is ready (in input order without an executor)"""
+        job = self.compile_job(job)
+        candidates = self.compile_candidates(candidates)
+        job_profile = ScoringProfile() if self.profiling else None
+        # Per call, so concurrent requests never flush or stop buffering each other's writes
+        batch = WriteBatch()
+        try:
+            with ScoringProfile.activate(job_profile), self.chromadb_manager.buffering(batch):
+                candidates = self._component(job_profile, 'prefilter', self.prefilter_candidates, job, candidates)
+                self._component(job_profile, 'prefetch', self.prefetch_for_job, job, candidates)
+                experience, education = self._component(job_profile, 'columnar', self.job_scores, job, candidates)
+            if executor is None:
+                pending = (self._score_or_none(candidate, job, experience[i], education[i], batch)
+                           for i, candidate in enumerate(candidates))
+            else:
+                pending = (future.result() for future in as_completed(
+                    [executor.submit(self._score_or_none, candidate, job, experience[i], education[i], batch)
+                     for i, candidate in enumerate(candidates)]))
+            for result in pending:
+                if result is not None:
+                    yield result
+        finally:
+            with ScoringProfile.activate(job_profile):
+                self._component(job_profile, 'flush', self.chromadb_manager.flush, batch)
+            if job_profile is not None:
+                self.profile_totals.add(job_profile, jobs=1)
+    
+    def prefilter_candidates(self, job: JobFeatures, candidates: List[CandidateFeatures]) -> List[CandidateFeatures]:
+        """
+        Drop candidates covering too few of the job's important skills (see min_important_coverage), using one
+        skill index query. The index is kept up to date, with each skill's synonym cluster, as S1 parses
+        candidates; candidates it does not hold yet are scored rather than dropped.
+        """
+        if not self.min_important_coverage or not job.important_skills or not candidates:
+            return candidates
+        try:
+            variations = self.skill_mapper.get_skill_variations_batch(list(job.important_skills), job.career_field)
+            clusters = {skill: variations.get(skill, []) for skill in job.important_skills}
+            ids = [candidate_id(candidate.raw) for candidate in candidates]
+            indexed = self.skill_index.indexed_candidates(ids)
+            covered = self.skill_index.covered_skills(clusters, indexed)
+        except Exception as e:
+            logger.error(f"Skill index prefilter failed for {job.title}, scoring every candidate: {e}")
+            return candidates
+        
+        needed = self.min_important_coverage * len(clusters)
+        dropped = {cid for cid in indexed if len(covered.get(cid, [])) < needed}
+        kept = [candidate for candidate, cid in zip(candidates, ids) if cid not in dropped]
+        ScoringProfile.count("prefilter.dropped", len(dropped))
+        logger.info(f"Skill index prefilter kept {len(kept)}/{len(candidates)} candidates for {job.title} "
+                    f"({len(set(ids) - indexed)} not indexed yet); dropped: {sorted(dropped)}")
+        return kept
+    
+    def job_scores(self, job: JobFeatures, candidates: List[CandidateFeatures]) -> Tuple[List[Optional[float]], List[Optional[float]]]:
+        """Experience and education scores for all of a job's candidates in one vectorized pass (None: score per pair)"""
+        try:
+            table = self.candidate_table(candidates)
+            return self.experience_scores(table, job).tolist(), self.education_scores(table, job).tolist()
+        except Exception as e:
+            logger.error(f"Columnar scoring failed for {job.title}, scoring per candidate: {e}")
+            return [None] * len(candidates), [None] * len(candidates)
+    
+    def _score_or_none(self, candidate: CandidateFeatures, job: JobFeatures, experience_score: Optional[float] = None,
+                       education_score: Optional[float] = None, batch: Optional[WriteBatch] = None) -> Optional[MatchingResult]:
+        try:
+            # Set per call rather than across the caller's yields, and on whichever worker thread runs it
+            with self.chromadb_manager.buffering(batch):
+                return self.calculate_matching_score(candidate, job, experience_score, education_score)
+        except Exception as e:
+            logger.error(f"Error calculating score for candidate {candidate.name}: {e}")
+            return None
+    
+    def find_top_candidates_for_job(self, job: Dict, candidates: List[Dict], top_n: int = 5,
+                                    executor: Optional[Executor] = None) -> List[MatchingResult]:
+        job = self.compile_job(job)
+        results = list(self.score_candidates(job, candidates, executor))
+        degraded_count = sum(1 for result in results if result.degraded)
+        if degraded_count:
+            logger.warning(f"{degraded_count}/{len(results)} scores for {job.title} used LLM fallbacks and are tagged degraded")
+        return self.rank_results(results, top_n)
+    
+    def rank_results(self, results: List[MatchingResult], top_n: Optional[int] = 5) -> List[MatchingResult]:
+        """Best results first; only the returned ones get their detailed breakdown computed"""
+        results = sorted(results, key=lambda x: x.overall_score, reverse=True)
+        top_results = results[:top_n] if top_n else results
+        for result in top_results:
+            if isinstance(result.detailed_breakdown, LazyBreakdown):
+                result.detailed_breakdown.materialize()
+        return top_results
+    
+    def prewarm_job(self, job: Dict) -> JobFeatures:
+        """Store the job-side artifacts (embedding, skill expansions) in ChromaDB ahead of scoring"""
+        job = self.compile_job(job)
+        if self.model_manager.embedding_model:
+            self._get_job_embedding(job)
+        
+        self.feedback_manager.refresh()
+        skills = job.important_skills + job.technical_skills + job.soft_skills
+        self.skill_mapper.get_skill_variations_batch(list(skills), job.career_field)
+        return job
     
     def find_similar_candidates_using_chromadb(self, job: Dict, top_k: int = 10) -> List[Dict]:
         """Use ChromaDB to find similar candidates efficiently"""
@@ -1131,18 +2510,13 @@ class SmartRecruitMatcher:
             return []
         
         try:
+            job = self.compile_job(job)
             # Get or create job embedding
-            job_embedding = self.chromadb_manager.get_job_embedding(job)
-            if job_embedding is None:
-                job_text = self._create_job_description_text(job)
-                job_embedding = self.model_manager.embedding_model.encode([job_text])[0]
-                career_field = self.skill_mapper.get_career_field_from_job(job)
-                self.chromadb_manager.store_job_embedding(job, job_embedding, career_field)
+            job_embedding = self._get_job_embedding(job)
             
             # Find similar candidates
-            career_field = self.skill_mapper.get_career_field_from_job(job)
             similar_candidates = self.chromadb_manager.find_similar_candidates(
-                job_embedding, career_field, top_k
+                job_embedding, job.career_field, top_k
             )
             
             return similar_candidates
@@ -1157,85 +2531,37 @@ def load_json_data():
     os.makedirs("./feedback", exist_ok=True)
 
     candidates = []
-    jobs = []
-    job_ids_used_by_candidates = set()
-    job_ids_found_in_filesystem = set()
+    # job_id -> number of candidates that applied to it; only these JD files are opened
+    candidates_by_job_id = {}
 
-    print("🔍 Scanning ./candidates/*.json")
-    for file_path in glob.glob("./candidates/*.json"):
-        print(f"📄 Reading candidate file: {file_path}")
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                file_content = json.load(f)
-                print(f"✅ Parsed content: {file_content}")
-
-                def process_candidate(candidate_data):
-                    if validate_candidate_data(candidate_data):
-                        filename = candidate_data.get("file", "")
-                        job_id = filename.split("_")[0]
-                        if job_id.isdigit():
-                            candidate_data["job_id"] = job_id 
-                            job_ids_used_by_candidates.add(job_id)
-                        candidates.append(candidate_data)
-                    else:
-                        print(f"⚠️ Invalid candidate skipped: {candidate_data}")
-
-                if isinstance(file_content, list):
-                    for candidate_data in file_content:
-                        process_candidate(candidate_data)
-                elif isinstance(file_content, dict):
-                    if 'candidates' in file_content and isinstance(file_content['candidates'], list):
-                        for candidate_data in file_content['candidates']:
-                            process_candidate(candidate_data)
-                    else:
-                        process_candidate(file_content)
+    print("🔍 Streaming candidates from ./candidates")
+    for candidate_data in iter_candidates("./candidates"):
+        candidates.append(candidate_data)
+        if "job_id" in candidate_data:
+            candidates_by_job_id[candidate_data["job_id"]] = candidates_by_job_id.get(candidate_data["job_id"], 0) + 1
 
+    jobs = []
+    missing_job_ids = []
+    for job_id in sorted(candidates_by_job_id):
+        file_path = f"./jd/{job_id}.json"
+        if not os.path.isfile(file_path):
+            missing_job_ids.append(job_id)
+            continue
+        try:
+            loaded = load_jobs_from_file(file_path)
+            print(f"✅ JD {job_id}: {len(loaded)} job(s) for {candidates_by_job_id[job_id]} candidate(s)")
+            jobs.extend(loaded)
         except Exception as e:
-            print(f"❌ Error loading candidate file {file_path}: {e}")
+            print(f"❌ Error loading job file {file_path}: {e}")
+            missing_job_ids.append(job_id)
 
-    print("🔍 Scanning ./jd/*.json")
-    for file_path in glob.glob("./jd/*.json"):
-        file_name = os.path.basename(file_path)
-        job_id = os.path.splitext(file_name)[0]
-        print(f"🔍 Checking JD file: {file_name} with job_id: {job_id}")
-
-        if job_id in job_ids_used_by_candidates:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    file_content = json.load(f)
-                    print(f"✅ JD file loaded: {file_content}")
-
-                    def process_job(job_data):
-                        if validate_job_data(job_data):
-                            jobs.append(job_data)
-                        else:
-                            print(f"❌ Invalid job data skipped: {job_data}")
-
-                    if isinstance(file_content, list):
-                        for job_data in file_content:
-                            process_job(job_data)
-                    elif isinstance(file_content, dict):
-                        if 'jobs' in file_content and isinstance(file_content['jobs'], list):
-                            for job_data in file_content['jobs']:
-                                process_job(job_data)
-                        else:
-                            process_job(file_content)
-
-                job_ids_found_in_filesystem.add(job_id)
-
-            except Exception as e:
-                print(f"❌ Error loading job file {file_path}: {e}")
-        else:
-            print(f"⏭️ Skipping JD {file_name} — no matching candidate filename jobId")
-
-    missing_job_ids = job_ids_used_by_candidates - job_ids_found_in_filesystem
     if missing_job_ids:
-        error_message = f"❌ Missing job files for job_id(s): {', '.join(sorted(missing_job_ids))}"
+        error_message = f"❌ Missing job files for job_id(s): {', '.join(missing_job_ids)}"
         print(error_message)
         raise FileNotFoundError(error_message)
 
     print(f"✅ Collected candidates: {len(candidates)}")
-    print(f"✅ Collected jobs: {len(jobs)} → {jobs}")
+    print(f"✅ Collected jobs: {len(jobs)}")
     return candidates, jobs
 
 
@@ -1297,74 +2623,317 @@ def validate_job_data(job: Dict) -> bool:
 
     return True
 
-def save_scores(job_results: Dict, timestamp: str , candidates: list):
-    os.makedirs("./scores", exist_ok=True)
-    
-    print("=== Full job_results ===")
-    for job_title, results in job_results.items():
-        print(f"\nJob Title: {job_title}")
-        for i, result in enumerate(results, start=1):
-            print(f"  Candidate {i}: {result.__dict__ if hasattr(result, '__dict__') else result}")
-    
+class _JSONStream:
+    """Incremental reader over a text file for iter_json_records()"""
+    _INCOMPLETE = object()
+    _NUMBER_TAIL = re.compile(r"[0-9.eE+-]+\Z")
 
-    for job_title, results in job_results.items():
+    def __init__(self, f):
+        self.f = f
+        self.buffer, self.pos, self.eof = "", 0, False
+        self.decoder = json.JSONDecoder()
+
+    def _read_more(self):
+        # Reads grow with the pending text, so a value spanning many reads is decoded O(log n) times, not once per read
+        chunk = self.f.read(max(STREAM_CHUNK_SIZE, len(self.buffer) - self.pos))
+        self.buffer, self.pos, self.eof = self.buffer[self.pos:] + chunk, 0, not chunk
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        """Next non-whitespace character, left unconsumed ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._read_more()
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if not char or char not in expected:
+            raise self._error(f"Expecting one of {expected!r}")
+        self.pos += 1
+        return char
+
+    def value(self, whole_in_buffer: bool = False) -> Any:
+        """Decode the next value, reading on until it is complete (or, with whole_in_buffer, return _INCOMPLETE if it is long)"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                if whole_in_buffer and len(self.buffer) - self.pos >= STREAM_CHUNK_SIZE:
+                    return self._INCOMPLETE
+                self._read_more()
+                continue
+            if not self.eof and (end == len(self.buffer) or (isinstance(value, (int, float)) and
+                                                             self._NUMBER_TAIL.match(self.buffer, end))):
+                # A number at the buffer end may be cut short ("12" of "123", "1" of "1.5")
+                self._read_more()
+                continue
+            self.pos = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        self.take('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.take(',]') == ']':
+                return
+
+    def object_records(self, wrapper_key: Optional[str]) -> Iterator[Any]:
+        """One top-level object: the items of its wrapper_key list if it has one, else the object itself"""
+        value = self.value(whole_in_buffer=True)
+        if value is not self._INCOMPLETE:
+            if wrapper_key and isinstance(value, dict) and isinstance(value.get(wrapper_key), list):
+                yield from value[wrapper_key]
+            else:
+                yield value
+            return
+        
+        # Too long to hold at once: walk its members so a wrapper's list is streamed item by item
+        members, wrapped = {}, False
+        self.take('{')
+        if self.peek() == '}':
+            self.pos += 1
+        else:
+            while True:
+                key = self.value()
+                self.take(':')
+                if key == wrapper_key and self.peek() == '[':
+                    yield from self.array_items()
+                    wrapped = True
+                else:
+                    members[key] = self.value()
+                if self.take(',}') == '}':
+                    break
+        if not wrapped:
+            yield members
+
+
+def iter_json_records(file_path: str, wrapper_key: str = None) -> Iterator[Any]:
+    """
+    Records of a JSON array, of JSONL (or any whitespace-separated JSON values) or of a single object,
+    decoded one at a time from fixed-size reads. An object holding a wrapper_key list yields its items.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        stream = _JSONStream(f)
+        while True:
+            char = stream.peek()
+            if not char:
+                return
+            if char == '[':
+                yield from stream.array_items()
+            elif char == '{':
+                yield from stream.object_records(wrapper_key)
+            else:
+                yield stream.value()
+
+
+def iter_candidates(candidate_dir: str = "./candidates") -> Iterator[Dict]:
+    """Valid candidates from candidate_dir/*.json and *.jsonl, streamed and tagged with the job_id of their resume file"""
+    files = sorted(path for pattern in CANDIDATE_FILE_PATTERNS for path in glob.glob(os.path.join(candidate_dir, pattern)))
+    for file_path in files:
+        valid = invalid = 0
+        try:
+            for candidate in iter_json_records(file_path, wrapper_key='candidates'):
+                if not validate_candidate_data(candidate):
+                    invalid += 1
+                    continue
+                job_id = str(candidate.get("file", "")).split("_")[0]
+                if job_id.isdigit():
+                    candidate["job_id"] = job_id
+                valid += 1
+                yield candidate
+        except Exception as e:
+            logger.error(f"Error loading candidate file {file_path} after {valid} candidate(s): {e}")
+        logger.info(f"{file_path}: {valid} candidate(s), {invalid} invalid skipped")
+
+
+def load_candidate_index(candidate_dir: str = "./candidates") -> Dict[str, Dict]:
+    """Map candidate_id() to every valid candidate in candidate_dir"""
+    return {candidate_id(candidate): candidate for candidate in iter_candidates(candidate_dir)}
+
+def load_jobs_from_file(job_file: str) -> List[Dict]:
+    """Valid jobs from a ./jd/{jobId}.json file, which holds a list, a {"jobs": [...]} object or a single job"""
+    with open(job_file, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+    if isinstance(content, dict):
+        content = content['jobs'] if isinstance(content.get('jobs'), list) else [content]
+    return [job for job in content if validate_job_data(job)]
+
+class ScoreSink:
+    """Writes ranked results per job to the append-only ScoreStore and, optionally, the ./scores/{job}_{timestamp}.json export"""
+
+    def __init__(self, candidates: List, timestamp: str, store: Optional[ScoreStore] = None,
+                 export_json: Optional[bool] = None, score_dir: str = "./scores"):
+        self.timestamp = timestamp
+        self.store = store if store is not None else ScoreStore()
+        self.export_json = (export_json if export_json is not None
+                            else os.environ.get('S2_SCORE_JSON_EXPORT', '1').lower() not in ('0', 'false', 'no'))
+        self.score_dir = score_dir
+        # Built once per run: results carry the same stable candidate_id() the candidates are keyed by here
+        self.candidates_by_id = {}
+        for candidate in candidates:
+            raw = candidate.raw if isinstance(candidate, CandidateFeatures) else candidate
+            if isinstance(raw, dict):
+                self.candidates_by_id.setdefault(candidate_id(raw), raw)
+
+    def result_row(self, result: MatchingResult) -> Dict:
+        candidate = self.candidates_by_id.get(result.candidate_id, {})
+        row = {
+            "candidate_name": result.candidate_name,
+            "candidate_id": result.candidate_id,
+            "media_id": candidate.get("media_id", None),
+            "job_id": candidate.get("job_id", None),
+            "overall_score": result.overall_score,
+            "component_scores": {
+                "technical_score": result.technical_score,
+                "experience_score": result.experience_score,
+                "cultural_score": result.cultural_score,
+                "education_score": result.education_score,
+                "ai_enhanced_score": result.ai_enhanced_score
+            },
+            "feedback_enhanced": result.detailed_breakdown.get("feedback_enhanced", False),
+            "chromadb_enhanced": result.detailed_breakdown.get("chromadb_enhanced", False),
+            "ollama_enhanced": result.detailed_breakdown.get("ollama_enhanced", False),
+            "degraded": result.degraded
+        }
+        if result.profile:
+            row["profile"] = result.profile
+        return row
+
+    def write_job(self, job_title: str, results: List[MatchingResult]):
+        rows = [self.result_row(result) for result in results if isinstance(result, MatchingResult)]
+        self.store.append(self.timestamp, job_title, rows)
+        if self.export_json:
+            self.export_job(job_title, rows)
+        logger.info(f"Saved {len(rows)} result(s) for {job_title}")
+
+    def export_job(self, job_title: str, rows: List[Dict]):
         safe_job_title = re.sub(r'[^\w\s-]', '', job_title).strip()
         safe_job_title = re.sub(r'[-\s]+', '_', safe_job_title)
-        filename = f"./scores/{safe_job_title}_{timestamp}.json"
-        
-        simplified_results = []
-        for result in results:
-            if isinstance(result, MatchingResult):
-                matched_candidate = next((c for c in candidates if c.get("name") == result.candidate_name), {})
-                media_id = matched_candidate.get("media_id", None)
-                job_id = matched_candidate.get("job_id",None)
-
-                simplified_results.append({
-                    "candidate_name": result.candidate_name,
-                    "media_id": media_id,
-                    "job_id": job_id,
-                    "overall_score": result.overall_score,
-                    "component_scores": {
-                        "technical_score": result.technical_score,
-                        "experience_score": result.experience_score,
-                        "cultural_score": result.cultural_score,
-                        "education_score": result.education_score,
-                        "ai_enhanced_score": result.ai_enhanced_score
-                    },
-                    "feedback_enhanced": result.detailed_breakdown.get("feedback_enhanced", False),
-                    "chromadb_enhanced": result.detailed_breakdown.get("chromadb_enhanced", False),
-                    "ollama_enhanced": result.detailed_breakdown.get("ollama_enhanced", False)
-                })
+        filename = os.path.join(self.score_dir, f"{safe_job_title}_{self.timestamp}.json")
         
         job_score_data = {
             "job_title": job_title,
-            "timestamp": timestamp,
-            "feedback_enhanced": any(r.get("feedback_enhanced", False) for r in simplified_results),
-            "chromadb_enhanced": any(r.get("chromadb_enhanced", False) for r in simplified_results),
-            "ollama_enhanced": any(r.get("ollama_enhanced", False) for r in simplified_results),
-            "top_5_candidates": simplified_results[:5]
+            "timestamp": self.timestamp,
+            "feedback_enhanced": any(r.get("feedback_enhanced", False) for r in rows),
+            "chromadb_enhanced": any(r.get("chromadb_enhanced", False) for r in rows),
+            "ollama_enhanced": any(r.get("ollama_enhanced", False) for r in rows),
+            "degraded": any(r.get("degraded", False) for r in rows),
+            "top_5_candidates": rows[:5]
         }
         
         try:
+            os.makedirs(self.score_dir, exist_ok=True)
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(job_score_data, f, indent=2, ensure_ascii=False)
         except Exception as e:
             logger.error(f"Error saving scores to {filename}: {e}")
 
-def main():
-    matcher = SmartRecruitMatcher(
-        ollama_url="http://localhost:11434", 
-        feedback_dir="./feedback", 
-        chromadb_dir="./chromadb"
-    )
+def save_scores(job_results: Dict, timestamp: str , candidates: list, sink: Optional[ScoreSink] = None):
+    sink = sink or ScoreSink(candidates, timestamp)
+    for job_title, results in job_results.items():
+        sink.write_job(job_title, results)
+    print(f"💾 Saved results for {len(job_results)} job(s)")
+
+PROFILE_DIR = "./scores/profiles"
+
+def save_profile_report(run: ProfileAggregate, totals: ProfileAggregate, timestamp: str, profile_dir: str = PROFILE_DIR):
+    """Write the run's profile next to the score files and the process totals as Prometheus textfile metrics"""
+    try:
+        # A subdirectory, so watchers of ./scores/*.json never mistake it for a score file
+        os.makedirs(profile_dir, exist_ok=True)
+        with open(os.path.join(profile_dir, f"profile_{timestamp}.json"), 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": timestamp, **run.to_dict()}, f, indent=2)
+        metrics_path = os.path.join(profile_dir, "metrics.prom")
+        with open(f"{metrics_path}.tmp", 'w', encoding='utf-8') as f:
+            f.write(totals.to_prometheus("s2_batch"))
+        os.replace(f"{metrics_path}.tmp", metrics_path)
+    except Exception as e:
+        logger.error(f"Error saving scoring profile to {profile_dir}: {e}")
+
+_matcher = None
+_matcher_args = None
+_matcher_lock = threading.Lock()
+
+def get_matcher(ollama_url: str = "http://localhost:11434", feedback_dir: str = "./feedback",
+                chromadb_dir: str = "./chromadb", embedding_backend: str = None,
+                eager_breakdown: bool = False, profiling: bool = None,
+                min_important_coverage: float = None) -> SmartRecruitMatcher:
+    """Return the process-wide matcher, loading the model and ChromaDB client only once"""
+    global _matcher, _matcher_args
+    args = {
+        'ollama_url': ollama_url,
+        'feedback_dir': feedback_dir,
+        'chromadb_dir': chromadb_dir,
+        'embedding_backend': embedding_backend,
+        'eager_breakdown': eager_breakdown,
+        'profiling': profiling,
+        'min_important_coverage': min_important_coverage
+    }
+    with _matcher_lock:
+        if _matcher is not None:
+            if args != _matcher_args:
+                conflicts = {name: value for name, value in args.items() if value != _matcher_args[name]}
+                raise ValueError(f"Process-wide matcher already created with {_matcher_args}, cannot apply {conflicts}")
+            return _matcher
+        
+        start_time = time.time()
+        matcher = SmartRecruitMatcher(**args)
+        matcher.initialize()
+        logger.info(f"Matcher cold start took {time.time() - start_time:.2f} seconds")
+        if matcher.chromadb_manager.client is None:
+            # Usable for this call, but the next one retries the cold start instead of running without ChromaDB forever
+            logger.warning("Matcher initialized without a ChromaDB client; not keeping it")
+            return matcher
+        _matcher = matcher
+        _matcher_args = args
+        return _matcher
+
+def prewarm_job_file(job_file: str) -> int:
+    """Pre-warm every job in a ./jd/{jobId}.json file on the process-wide matcher; returns the number of jobs"""
+    start_time = time.time()
+    try:
+        jobs = load_jobs_from_file(job_file)
+        if not jobs:
+            logger.warning(f"No valid jobs to pre-warm in {job_file}")
+            return 0
+        
+        # Same matcher (and ChromaDB client) as the caller's scoring requests, never a second one
+        matcher = get_matcher()
+        for job in jobs:
+            matcher.prewarm_job(job)
+        logger.info(f"Pre-warmed {len(jobs)} job(s) from {job_file} in {time.time() - start_time:.2f} seconds")
+        return len(jobs)
+    except Exception as e:
+        logger.error(f"Failed to pre-warm {job_file}: {e}")
+        return 0
+
+def main(background_cleanup: bool = False):
+    """Score every candidate against every job; long-lived callers pass background_cleanup=True"""
     start_time = time.time()
     try: 
-        matcher.initialize()
+        matcher = get_matcher(
+            ollama_url="http://localhost:11434", 
+            feedback_dir="./feedback", 
+            chromadb_dir="./chromadb"
+        )
+        # The warm matcher outlives a single cycle, so pick up feedback added since the last one
+        matcher.feedback_manager.refresh()
     except Exception as e:
         logger.error(f"Failed to initialize matcher: {e}")
         return False
+    logger.info(f"Matcher ready in {time.time() - start_time:.2f} seconds")
     
-
     candidates, jobs= load_json_data()
 
     if not candidates or not jobs: 
@@ -1373,24 +2942,31 @@ def main():
 
     logger.info(f"Loaded {len(candidates)} candidates and {len(jobs)} jobs")
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    compiled_candidates = matcher.compile_candidates(candidates)
+    profile_before = matcher.profile_totals.snapshot()
     job_results = {}
     for i, job in enumerate(jobs, 1):
         try:
             logger.info(f"Processing job {i}/{len(jobs)}: {job.get('title', f'Job_{i}')}")
-            top_candidates = matcher.find_top_candidates_for_job(job, candidates, top_n=5)
+            top_candidates = matcher.find_top_candidates_for_job(job, compiled_candidates, top_n=5)
             job_results[job.get('title', f'Job_{i}')] = top_candidates
         except Exception as e:
             logger.error(f"Error processing job {job.get('title', f'Job_{i}')}: {e}")
             job_results[job.get('title', f'Job_{i}')] = []
     
     save_scores(job_results, timestamp, candidates)
+    if matcher.profiling:
+        save_profile_report(matcher.profile_totals.since(profile_before), matcher.profile_totals, timestamp)
     
-    # Optional: Clean up old ChromaDB entries periodically
-    try:
-        if matcher.chromadb_manager and matcher.chromadb_manager.client:
-            matcher.chromadb_manager.cleanup_old_entries(30)  # Clean entries older than 30 days
-    except Exception as e:
-        logger.error(f"Error during cleanup: {e}")
+    # Clean entries older than 30 days at most once a day. A standalone run exits right after this,
+    # which would kill a background thread before it recorded the cleanup, so it runs inline here
+    if background_cleanup:
+        matcher.chromadb_manager.start_cleanup_schedule(days_old=30)
+    else:
+        matcher.chromadb_manager.cleanup_if_due(days_old=30)
+    
+    logger.info(f"LLM prompt cache: {matcher.skill_mapper.llm_client.cache.get_stats()}")
+    logger.info(f"In-memory caches: {matcher.skill_mapper.cache_stats()}")
     
     end_time = time.time()
     logger.info(f"Matching process completed in {end_time - start_time:.2f} seconds")
@@ -1398,7 +2974,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-        candidate_files = glob.glob("./candidates/*.json")
+        candidate_files = [path for pattern in CANDIDATE_FILE_PATTERNS for path in glob.glob(f"./candidates/{pattern}")]
         job_files = glob.glob("./jd/*.json")
         
         if not candidate_files or not job_files:
@@ -1425,21 +3001,18 @@ if __name__ == "__main__":
                 print("Matching process failed")
                 
             # Clean up GPU memory if available
-            if torch.cuda.is_available(): 
-                torch.cuda.empty_cache()
+            release_gpu_memory()
                 
     except KeyboardInterrupt:
         print("\nProcess interrupted by user")
         try:
-            if torch.cuda.is_available(): 
-                torch.cuda.empty_cache()
+            release_gpu_memory()
         except: 
             pass
     except Exception as e:
         logger.error(f"Error in main execution: {e}")
         print(f"Fatal error: {e}")
         try:
-            if torch.cuda.is_available(): 
-                torch.cuda.empty_cache()
+            release_gpu_memory()
         except: 
             pass
\ No newline at end of file
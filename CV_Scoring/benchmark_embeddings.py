@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+
+# Compares the S2 embedding backends (see S2.EMBEDDING_BACKENDS) on CPU:
+# cold-load time, throughput, resident memory and cosine parity against torch.
+#
+#   python benchmark_embeddings.py --texts 2000
+#   S2_ONNX_MODEL_DIR=./models/all-MiniLM-L6-v2 python benchmark_embeddings.py
+#
+# Each backend is measured in its own subprocess so that import and model
+# memory of one backend does not leak into the numbers of the other.
+
+TECHNICAL_SKILLS = ["Python", "Django", "Git", "JavaScript", "React", "Node.js", "Docker", "Kubernetes",
+                    "AWS", "SQL", "Java", "Tableau", "Power BI", "Excel", "Photoshop", "AutoCAD"]
+SOFT_SKILLS = ["Communication", "Leadership", "Teamwork", "Creativity", "Strategic Thinking", "Problem Solving"]
+DEGREES = ["Bachelor of Computer Science", "Master in Data Science", "BS Software Engineering", "MBA", "Diploma in Design"]
+
+
+def generate_texts(count, seed=42):
+    """Synthetic texts in the same shape as SmartRecruitMatcher._create_candidate_profile_text"""
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        technical = ', '.join(f"{s}({rng.randint(1, 100)})" for s in rng.sample(TECHNICAL_SKILLS, rng.randint(1, 8)))
+        soft = ', '.join(f"{s}({rng.randint(1, 100)})" for s in rng.sample(SOFT_SKILLS, rng.randint(1, 4)))
+        texts.append('. '.join([
+            f"Candidate: Candidate {i}",
+            f"Experience: {rng.choice([0.5, 1, 2, 3.5, 5, 8, 12])} years",
+            f"Education: {rng.choice(DEGREES)}",
+            f"Technical Skills: {technical}",
+            f"Soft Skills: {soft}"
+        ]))
+    return texts
+
+
+def rss_mb():
+    import psutil
+    return psutil.Process(os.getpid()).memory_info().rss / (1024 * 1024)
+
+
+def run_worker(backend_name, text_count, output_path):
+    """Measure one backend in this process and save its embeddings for the parity check"""
+    from S2 import EMBEDDING_BACKENDS
+
+    texts = generate_texts(text_count)
+    rss_before = rss_mb()
+
+    start = time.perf_counter()
+    backend = EMBEDDING_BACKENDS[backend_name]()
+    backend.load()
+    backend.encode(texts[:1])
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = backend.encode(texts)
+    encode_seconds = time.perf_counter() - start
+
+    np.save(output_path, np.asarray(embeddings, dtype=np.float32))
+    print(json.dumps({
+        "backend": backend_name,
+        "cold_load_seconds": round(load_seconds, 3),
+        "texts": len(texts),
+        "encode_seconds": round(encode_seconds, 3),
+        "texts_per_second": round(len(texts) / encode_seconds, 1) if encode_seconds else None,
+        "rss_before_mb": round(rss_before, 1),
+        "rss_after_mb": round(rss_mb(), 1),
+        "model_footprint_mb": round(rss_mb() - rss_before, 1)
+    }))
+
+
+def cosine_deltas(reference, candidate):
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    deltas = 1.0 - np.sum(reference * candidate, axis=1)
+    return {
+        "mean": float(deltas.mean()),
+        "p95": float(np.percentile(deltas, 95)),
+        "max": float(deltas.max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark S2 embedding backends")
+    parser.add_argument("--texts", type=int, default=1000, help="number of synthetic profile texts to embed")
+    parser.add_argument("--backends", default="torch,onnx-int8", help="comma-separated backend names")
+    parser.add_argument("--output", default=None, help="optional path for the JSON report")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--embeddings-path", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.texts, args.embeddings_path)
+        return
+
+    report = {"texts": args.texts, "backends": {}, "parity_vs_torch": {}}
+    embeddings = {}
+    work_dir = tempfile.mkdtemp(prefix="embedding_bench_")
+
+    for backend_name in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        embeddings_path = os.path.join(work_dir, f"{backend_name}.npy")
+        print(f"⏱️ Benchmarking {backend_name} backend on {args.texts} texts...")
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", backend_name,
+             "--texts", str(args.texts), "--embeddings-path", embeddings_path],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if completed.returncode != 0:
+            print(f"❌ {backend_name} failed: {completed.stderr.strip().splitlines()[-1:] or completed.returncode}")
+            continue
+
+        stats = json.loads(completed.stdout.strip().splitlines()[-1])
+        report["backends"][backend_name] = stats
+        embeddings[backend_name] = np.load(embeddings_path)
+        print(f"✅ {backend_name}: load {stats['cold_load_seconds']}s, "
+              f"{stats['texts_per_second']} texts/s, +{stats['model_footprint_mb']} MB RSS")
+
+    if "torch" in embeddings:
+        for backend_name, vectors in embeddings.items():
+            if backend_name != "torch":
+                report["parity_vs_torch"][backend_name] = cosine_deltas(embeddings["torch"], vectors)
+                deltas = report["parity_vs_torch"][backend_name]
+                print(f"📐 {backend_name} vs torch cosine delta: mean {deltas['mean']:.5f}, "
+                      f"p95 {deltas['p95']:.5f}, max {deltas['max']:.5f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import json
+import glob
+import random
+import argparse
+import requests
+
+from S2 import cultural_fit_prompt, OLLAMA_KEEP_ALIVE
+
+# Measures how much prompt evaluation Ollama skips when consecutive cultural-fit
+# prompts for one job share a static prefix (instructions, feedback, job context)
+# versus the previous layout, where candidate data came before the shared parts.
+#
+#   python benchmark_prompts.py --candidates 20
+#
+# Ollama reports prompt_eval_count / prompt_eval_duration only for the tokens it
+# actually evaluated, so tokens served from the prefix KV cache show up as savings.
+
+SOFT_SKILLS = ["Communication", "Leadership", "Teamwork", "Creativity", "Strategic Thinking", "Problem Solving", "Adaptability"]
+OPTIONS = {"temperature": 0.1, "top_p": 0.9, "num_predict": 8}
+
+
+def legacy_cultural_fit_prompt(candidate, job, career_field, feedback_text):
+    """Layout used before prompts were split into a shared prefix and a per-candidate suffix"""
+    candidate_soft = candidate.get('skills', {}).get('soft_skills', {})
+    job_soft = job.get('required_skills', {}).get('soft_skills', {})
+    return f"""Assess the cultural fit between this candidate and job position in {career_field}.
+Job: {job.get('title', 'Unknown')}
+Job Level: {job.get('level', 'entry')}
+Required Soft Skills: {list(job_soft.keys())}
+Job Location: {job.get('location', 'Unknown')}
+Work Type: {job.get('location_type', 'Unknown')}
+Candidate: {candidate.get('name', 'Unknown')}
+Candidate Soft Skills: {list(candidate_soft.keys())}
+Experience Level: {candidate.get('years_of_experience', 0)} years
+{feedback_text}
+Rate cultural fit from 0.0 to 1.0 considering: Communication style match, Leadership potential vs requirements, Team collaboration abilities, Work environment fit, Career stage appropriateness
+Respond with only the numerical score (e.g., 0.82).
+Cultural fit score:"""
+
+
+def load_job():
+    for file_path in sorted(glob.glob("./jd/*.json")):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+            jobs = content if isinstance(content, list) else [content]
+            if jobs and isinstance(jobs[0], dict) and 'title' in jobs[0]:
+                return jobs[0]
+        except Exception:
+            continue
+    return {"title": "Backend Developer", "level": "junior", "location": "Remote", "location_type": "remote",
+            "required_skills": {"soft_skills": {"Communication": 5, "Leadership": 4, "Teamwork": 4}}}
+
+
+def load_feedback_text():
+    from S2 import FeedbackManager
+    return FeedbackManager("./feedback").format_feedback_for_prompt()
+
+
+def generate_candidates(count, seed=7):
+    rng = random.Random(seed)
+    return [{
+        "name": f"Candidate {i}",
+        "years_of_experience": rng.choice([0.5, 1, 2, 4, 7]),
+        "skills": {"soft_skills": {s: rng.randint(1, 100) for s in rng.sample(SOFT_SKILLS, rng.randint(2, 5))}}
+    } for i in range(count)]
+
+
+def generate(url, model, prompt):
+    response = requests.post(f"{url}/api/generate", json={
+        "model": model, "prompt": prompt, "stream": False, "options": OPTIONS, "keep_alive": OLLAMA_KEEP_ALIVE
+    }, timeout=600)
+    response.raise_for_status()
+    return response.json()
+
+
+def run_layout(url, model, build_prompt, candidates, job, career_field, feedback_text):
+    # An unrelated prompt first, so both layouts start without a reusable prefix
+    generate(url, model, "Reply with OK.")
+    calls = []
+    for candidate in candidates:
+        result = generate(url, model, build_prompt(candidate, job, career_field, feedback_text))
+        calls.append({
+            "prompt_eval_count": result.get("prompt_eval_count", 0),
+            "prompt_eval_ms": result.get("prompt_eval_duration", 0) / 1e6,
+            "total_ms": result.get("total_duration", 0) / 1e6
+        })
+    count = len(calls) or 1
+    return {
+        "calls": len(calls),
+        "mean_prompt_eval_tokens": sum(c["prompt_eval_count"] for c in calls) / count,
+        "mean_prompt_eval_ms": sum(c["prompt_eval_ms"] for c in calls) / count,
+        "mean_total_ms": sum(c["total_ms"] for c in calls) / count,
+        # The first call of a run always evaluates the full prompt; later calls show the reuse
+        "mean_prompt_eval_ms_after_first": sum(c["prompt_eval_ms"] for c in calls[1:]) / max(len(calls) - 1, 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt-prefix reuse for cultural-fit prompts")
+    parser.add_argument("--url", default="http://localhost:11434")
+    parser.add_argument("--model", default="mistral")
+    parser.add_argument("--candidates", type=int, default=10, help="consecutive calls per layout")
+    parser.add_argument("--career-field", default="software development")
+    parser.add_argument("--output", default=None, help="optional path for the JSON report")
+    args = parser.parse_args()
+
+    job = load_job()
+    feedback_text = load_feedback_text()
+    candidates = generate_candidates(args.candidates)
+
+    # Load the model once so neither layout pays for it
+    print(f"⏳ Loading {args.model}...")
+    generate(args.url, args.model, "Reply with OK.")
+
+    report = {"model": args.model, "job": job.get("title"), "layouts": {}}
+    for name, build_prompt in [("legacy", legacy_cultural_fit_prompt), ("shared_prefix", cultural_fit_prompt)]:
+        print(f"⏱️ Running {args.candidates} cultural-fit prompts with the {name} layout...")
+        report["layouts"][name] = run_layout(args.url, args.model, build_prompt, candidates, job,
+                                             args.career_field, feedback_text)
+
+    legacy, shared = report["layouts"]["legacy"], report["layouts"]["shared_prefix"]
+    report["prompt_eval_ms_saved_per_call"] = legacy["mean_prompt_eval_ms"] - shared["mean_prompt_eval_ms"]
+    report["prompt_eval_tokens_saved_per_call"] = legacy["mean_prompt_eval_tokens"] - shared["mean_prompt_eval_tokens"]
+    print(f"✅ Prompt eval per call: {legacy['mean_prompt_eval_ms']:.1f} ms -> {shared['mean_prompt_eval_ms']:.1f} ms "
+          f"({report['prompt_eval_tokens_saved_per_call']:.0f} fewer tokens evaluated)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
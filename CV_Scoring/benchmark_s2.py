@@ -0,0 +1,373 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+import numpy as np
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# End-to-end benchmark of SmartRecruitMatcher on synthetic candidate/job pools,
+# against a local fake Ollama and a throw-away ChromaDB, so matcher changes can
+# be compared without a GPU, a model download or a live Ollama.
+#
+#   python benchmark_s2.py --sizes 10,100,1000 --latency-ms 20 --output bench.json
+#   python benchmark_s2.py --sizes 10,100 --compare bench.json
+#
+# Every pool size is scored twice with the same matcher: a "cold" pass with empty
+# caches and a "warm" pass that shows what repeated ranking of the same pool costs.
+# --compare exits with status 1 when pairs/s drops or LLM calls per pair grow by
+# more than --tolerance against an earlier report.
+
+TECHNICAL_SKILLS = ["Python", "Django", "Flask", "Git", "JavaScript", "React", "Node.js", "Docker", "Kubernetes",
+                    "AWS", "SQL", "Java", "Go", "Tableau", "Power BI", "Excel", "Photoshop", "AutoCAD",
+                    "Machine Learning", "Pandas"]
+SOFT_SKILLS = ["Communication", "Leadership", "Teamwork", "Creativity", "Strategic Thinking", "Problem Solving", "Adaptability"]
+DEGREES = [("Bachelor of Computer Science", "computer science"), ("Master in Data Science", "data science"),
+           ("BS Software Engineering", "software engineering"), ("MBA", "business administration"),
+           ("Diploma in Design", "design"), ("PhD Civil Engineering", "civil engineering")]
+JOB_TEMPLATES = [
+    ("Backend Developer", "junior", "1+ year", "Bachelor's in Computer Science", ["Python", "Django", "Git", "SQL"]),
+    ("Data Analyst", "intermediate", "3", "Master", ["SQL", "Tableau", "Power BI", "Excel"]),
+    ("Devops Engineer", "senior", "5", "", ["Docker", "Kubernetes", "AWS", "Git"]),
+    ("Frontend Developer", "entry", "0", "Bachelor", ["JavaScript", "React", "Node.js"]),
+    ("Graphic Designer", "junior", "2", "Diploma", ["Photoshop", "AutoCAD"])
+]
+COMPONENTS = ["compile_job", "compile_candidates", "prefetch_for_job", "job_scores", "calculate_technical_score",
+              "calculate_experience_score", "calculate_cultural_score", "calculate_education_score",
+              "calculate_ai_enhanced_score", "rank_results"]
+
+
+def generate_jobs(count, seed=11):
+    """Jobs in the ./jd/{jobId}.json schema; job IDs are 1..count"""
+    rng = random.Random(seed)
+    jobs = {}
+    for job_id in range(1, count + 1):
+        title, level, experience, education, technical = JOB_TEMPLATES[(job_id - 1) % len(JOB_TEMPLATES)]
+        jobs[str(job_id)] = [{
+            "title": title if job_id <= len(JOB_TEMPLATES) else f"{title} {job_id}",
+            "level": level,
+            "experience": experience,
+            "education_level": education,
+            "location": "Remote",
+            "location_type": "Remote",
+            "required_skills": {
+                "technical_skills": {skill: rng.randint(1, 5) for skill in technical},
+                "soft_skills": {skill: rng.randint(1, 5) for skill in rng.sample(SOFT_SKILLS, rng.randint(0, 3))}
+            },
+            "important_skills": technical[:rng.randint(0, 2)]
+        }]
+    return jobs
+
+
+def generate_candidates(count, job_ids, seed=7):
+    """Candidates in the S1 parsed_resumes.json schema, spread over the given job IDs"""
+    rng = random.Random(seed)
+    candidates = []
+    for i in range(count):
+        degree, field = rng.choice(DEGREES)
+        technical = {skill: rng.randint(1, 100) for skill in rng.sample(TECHNICAL_SKILLS, rng.randint(1, 8))}
+        if rng.random() < 0.2:
+            technical["Frameworks"] = {"FastAPI": rng.randint(1, 100), "Spring": str(rng.randint(1, 100))}
+        candidates.append({
+            "file": f"{rng.choice(job_ids)}_resume_{i}.pdf",
+            "name": f"Candidate {i}",
+            "phone": f"+1555{i:07d}",
+            "email": f"candidate{i}@example.com",
+            "github": "Not found",
+            "linkedin": "Not found",
+            "education": {"degree": degree, "field": field, "certifications": rng.choice([[], ["AWS Certified"], "Scrum Master"])},
+            "skills": {
+                "technical_skills": technical,
+                "soft_skills": {skill: rng.randint(1, 100) for skill in rng.sample(SOFT_SKILLS, rng.randint(0, 4))}
+            },
+            "years_of_experience": rng.choice([0.0, 0.5, 1.0, 2.5, 4.0, 7.0, 12.0]),
+            "media_id": f"media-{i}"
+        })
+    return candidates
+
+
+def write_pool(work_dir, candidates, jobs):
+    os.makedirs(os.path.join(work_dir, "candidates"), exist_ok=True)
+    os.makedirs(os.path.join(work_dir, "jd"), exist_ok=True)
+    with open(os.path.join(work_dir, "candidates", "parsed_resumes.json"), "w", encoding="utf-8") as f:
+        json.dump(candidates, f)
+    for job_id, job_data in jobs.items():
+        with open(os.path.join(work_dir, "jd", f"{job_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(job_data, f)
+
+
+def fake_variations(skill):
+    base = skill.lower()
+    return [base, base.replace(" ", ""), base.replace(".", ""), f"{base} development"]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Answers the S2 prompt shapes deterministically after a configurable delay"""
+    protocol_version = "HTTP/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            self._send_json({"models": [{"name": "mistral:latest"}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if not self.path.startswith("/api/generate"):
+            self.send_error(404)
+            return
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = payload.get("prompt", "")
+        kind, text = self.server.answer(prompt)
+        self.server.record(kind)
+        time.sleep(self.server.latency_seconds)
+
+        if not payload.get("stream", True):
+            self._send_json({"model": payload.get("model"), "response": text, "done": True})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for chunk in re.findall(r".{1,4}", text, re.S):
+                self.wfile.write((json.dumps({"response": chunk, "done": False}) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write((json.dumps({"response": "", "done": True}) + "\n").encode("utf-8"))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped early once its answer was complete
+
+    def _send_json(self, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeOllama(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency_ms=0.0, host="127.0.0.1", port=0):
+        super().__init__((host, port), FakeOllamaHandler)
+        self.latency_seconds = latency_ms / 1000.0
+        self.calls = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def record(self, kind):
+        with self._lock:
+            self.calls[kind] += 1
+
+    def reset(self):
+        with self._lock:
+            self.calls = defaultdict(int)
+
+    def answer(self, prompt):
+        if "Cultural fit score:" in prompt:
+            digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+            return "cultural_fit", f"{0.3 + (digest[0] % 60) / 100:.2f}"
+        match = re.search(r"Skills: (\[.*\])\s*JSON:", prompt, re.S)
+        if match:
+            skills = json.loads(match.group(1))
+            return "skill_variations_batch", json.dumps({skill: fake_variations(skill) for skill in skills})
+        match = re.search(r"Skill: (.*)\nVariations", prompt)
+        if match:
+            return "skill_variations", ", ".join(fake_variations(match.group(1)))
+        return "other", "OK"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="fake-ollama", daemon=True).start()
+        return self
+
+
+class HashEmbeddingBackend:
+    """Deterministic stand-in for the sentence-transformers model; exercises the cache paths without a download"""
+    name = 'hash'
+    device = 'cpu'
+
+    def load(self):
+        pass
+
+    def encode(self, texts):
+        return np.array([np.frombuffer(hashlib.sha256(t.encode("utf-8")).digest() * 12, dtype=np.uint8)[:384]
+                         .astype(np.float32) / 255.0 - 0.5 for t in texts])
+
+
+def instrument(matcher):
+    """Wrap the per-component methods of one matcher instance with wall-clock timers"""
+    timings = defaultdict(float)
+
+    def timed(name, method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings[name] += time.perf_counter() - start
+        return wrapper
+
+    for name in COMPONENTS:
+        setattr(matcher, name, timed(name, getattr(matcher, name)))
+    return timings
+
+
+def cache_counters(matcher):
+    stats = {
+        "llm_prompt_cache": matcher.skill_mapper.llm_client.cache.get_stats(),
+        **matcher.skill_mapper.cache_stats(),
+        "embedding_cache": matcher.embedding_cache.get_stats()
+    }
+    return {name: (values.get("hits", 0), values.get("misses", 0)) for name, values in stats.items()}
+
+
+def hit_rates_since(before, after):
+    """Hits, misses and hit rate of every cache between two cache_counters() snapshots"""
+    rates = {}
+    for name, (hits, misses) in after.items():
+        hits -= before.get(name, (0, 0))[0]
+        misses -= before.get(name, (0, 0))[1]
+        rates[name] = {"hits": hits, "misses": misses,
+                       "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None}
+    return rates
+
+
+def run_pass(S2, matcher, fake, timings, jobs, candidates, top_n):
+    fake.reset()
+    timings.clear()
+    client = matcher.skill_mapper.llm_client
+    requests_before = client.stats["requests"]
+    counters_before = cache_counters(matcher)
+    compiled = matcher.compile_candidates(candidates)
+
+    start = time.perf_counter()
+    degraded = 0
+    for job in jobs:
+        results = list(matcher.score_candidates(job, compiled))
+        degraded += sum(1 for result in results if result.degraded)
+        matcher.rank_results(results, top_n)
+    elapsed = time.perf_counter() - start
+
+    pairs = len(jobs) * len(candidates)
+    llm_calls = sum(fake.calls.values())
+    return {
+        "pairs": pairs,
+        "seconds": round(elapsed, 3),
+        "pairs_per_second": round(pairs / elapsed, 2) if elapsed else None,
+        "llm_calls": llm_calls,
+        "llm_calls_per_pair": round(llm_calls / pairs, 4) if pairs else 0.0,
+        "llm_calls_by_prompt": dict(fake.calls),
+        "llm_client_requests": client.stats["requests"] - requests_before,
+        "degraded_pairs": degraded,
+        "time_split_seconds": {name: round(timings.get(name, 0.0), 4) for name in COMPONENTS},
+        "hit_rates": hit_rates_since(counters_before, cache_counters(matcher))
+    }
+
+
+def run_size(S2, fake, size, job_count, top_n, embedding_backend):
+    from llm_client import OllamaClient, PromptResponseCache
+
+    work_dir = tempfile.mkdtemp(prefix=f"s2_bench_{size}_")
+    jobs_by_id = generate_jobs(job_count)
+    write_pool(work_dir, generate_candidates(size, list(jobs_by_id)), jobs_by_id)
+
+    # Read the pool back through the same loaders the scoring service uses
+    candidates = list(S2.load_candidate_index(os.path.join(work_dir, "candidates")).values())
+    jobs = [job for job_id in jobs_by_id for job in S2.load_jobs_from_file(os.path.join(work_dir, "jd", f"{job_id}.json"))]
+
+    start = time.perf_counter()
+    matcher = S2.SmartRecruitMatcher(ollama_url=fake.url, feedback_dir=os.path.join(work_dir, "feedback"),
+                                     chromadb_dir=os.path.join(work_dir, "chromadb"), embedding_backend=embedding_backend)
+    matcher.initialize()
+    matcher.skill_mapper.llm_client = OllamaClient(fake.url, cache=PromptResponseCache(
+        path=os.path.join(work_dir, "llm_cache", "responses.sqlite3")))
+    cold_start = time.perf_counter() - start
+    timings = instrument(matcher)
+
+    report = {"candidates": len(candidates), "jobs": len(jobs), "matcher_cold_start_seconds": round(cold_start, 3)}
+    for pass_name in ("cold", "warm"):
+        report[pass_name] = run_pass(S2, matcher, fake, timings, jobs, candidates, top_n)
+        stats = report[pass_name]
+        print(f"✅ {size} candidates, {pass_name}: {stats['pairs_per_second']} pairs/s, "
+              f"{stats['llm_calls_per_pair']} LLM calls/pair")
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Regressions of this report against an earlier one, as human-readable lines"""
+    regressions = []
+    for size, current in report["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if not previous:
+            continue
+        for pass_name in ("cold", "warm"):
+            now, before = current[pass_name], previous.get(pass_name, {})
+            if before.get("pairs_per_second") and now["pairs_per_second"] < before["pairs_per_second"] * (1 - tolerance):
+                regressions.append(f"{size}/{pass_name}: pairs/s {before['pairs_per_second']} -> {now['pairs_per_second']}")
+            if now["llm_calls_per_pair"] > before.get("llm_calls_per_pair", float("inf")) * (1 + tolerance):
+                regressions.append(f"{size}/{pass_name}: LLM calls/pair {before['llm_calls_per_pair']} -> {now['llm_calls_per_pair']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SmartRecruitMatcher on synthetic pools with a fake Ollama")
+    parser.add_argument("--sizes", default="10,100,1000", help="comma-separated candidate pool sizes (10 to 10000)")
+    parser.add_argument("--jobs", type=int, default=3, help="jobs scored against every pool")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="fake Ollama delay per generate call")
+    parser.add_argument("--embedding-backend", default="hash",
+                        help="S2 embedding backend (torch, onnx-int8) or 'hash' for deterministic fake vectors")
+    parser.add_argument("--output", default=None, help="optional path for the JSON report")
+    parser.add_argument("--compare", default=None, help="earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression for --compare")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import S2
+    S2.EMBEDDING_BACKENDS.setdefault(HashEmbeddingBackend.name, HashEmbeddingBackend)
+
+    fake = FakeOllama(args.latency_ms).start()
+    print(f"🤖 Fake Ollama on {fake.url} with {args.latency_ms} ms latency")
+
+    report = {
+        "config": {"jobs": args.jobs, "top_n": args.top_n, "latency_ms": args.latency_ms,
+                   "embedding_backend": args.embedding_backend},
+        "sizes": {}
+    }
+    try:
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            print(f"⏱️ Scoring {size} candidates against {args.jobs} jobs...")
+            report["sizes"][str(size)] = run_size(S2, fake, size, args.jobs, args.top_n, args.embedding_backend)
+    finally:
+        fake.shutdown()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
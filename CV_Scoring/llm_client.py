@@ -0,0 +1,493 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Shared by S1 and S2: every /api/generate call goes through OllamaClient, which
+# answers repeated (model, options, prompt) requests from an on-disk cache.
+#
+#   LLM_CACHE_PATH         SQLite file (default ./llm_cache/responses.sqlite3)
+#   LLM_CACHE_MAX_ENTRIES  entries kept before least-recently-used eviction (default 50000)
+#   LLM_CACHE_TTL_SECONDS  age after which an entry is ignored and dropped (default 30 days)
+#   LLM_CACHE_BYPASS       set to 1 to neither read nor write the cache
+#   LLM_STREAMING          set to 0 to disable streaming with early termination
+#   LLM_BREAKER_FAILURES   consecutive failures that open the circuit breaker (default 3)
+#   LLM_SLO_SECONDS        a call slower than this counts as an SLO violation (default 60)
+#   LLM_BREAKER_SLOW_CALLS consecutive SLO violations that open the breaker (default 3)
+#   LLM_BREAKER_RESET_SECONDS  how long the breaker stays open before a probe (default 30)
+
+DEFAULT_CACHE_PATH = "./llm_cache/responses.sqlite3"
+DEFAULT_MAX_ENTRIES = 50000
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+# Writes between LRU trims (capped at a tenth of max_entries) and hits between last_access flushes
+TRIM_EVERY_WRITES = 100
+ACCESS_FLUSH_EVERY = 100
+# How often a process waiting on another process's identical call re-checks the cache
+INFLIGHT_POLL_SECONDS = 0.1
+
+
+def _env_flag(name: str, default: str = "") -> bool:
+    return os.environ.get(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Callbacks told what each generate() call actually cost: "llm.requests" (HTTP requests to
+# Ollama), "llm.prompt_cache_hits", "llm.coalesced" (waits on an identical in-flight call, in
+# this or another process) and "llm.rejected" (circuit breaker open). S2 counts them per pair.
+_event_listeners = []
+
+
+def add_event_listener(listener: Callable[[str], None]):
+    if listener not in _event_listeners:
+        _event_listeners.append(listener)
+
+
+def _emit(event: str):
+    for listener in _event_listeners:
+        listener(event)
+
+
+# Stop conditions for streamed generations: each receives the text so far and returns
+# True once the answer the caller will extract is complete.
+
+_NUMBER_FOLLOWED_BY_TERMINATOR = re.compile(r'\d+(?:\.\d+)?(?:[^\d.]|\.[^\d])')
+
+
+def number_complete(text: str) -> bool:
+    """A number has been fully written, i.e. something that cannot extend it follows"""
+    return _NUMBER_FOLLOWED_BY_TERMINATOR.search(text) is not None
+
+
+def json_object_complete(text: str) -> bool:
+    """The first JSON object in the text has its closing brace (braces inside strings are ignored)"""
+    start = text.find("{")
+    if start == -1:
+        return False
+    depth, in_string, escaped = 0, False, False
+    for char in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return True
+    return False
+
+
+class PromptResponseCache:
+    """SQLite-backed prompt -> raw response cache with LRU eviction, TTL and hit/miss counters"""
+
+    def __init__(self, path: str = None, max_entries: int = None, ttl_seconds: float = None, bypass: bool = None):
+        self.path = path or os.environ.get("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries if max_entries is not None else int(os.environ.get("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.environ.get("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self.bypass = bypass if bypass is not None else _env_flag("LLM_CACHE_BYPASS")
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+        # The file may hold up to trim_every entries over max_entries between trims
+        self.trim_every = max(1, min(TRIM_EVERY_WRITES, self.max_entries // 10))
+        self._writes_since_trim = 0
+        # key -> last hit time, written in one batch instead of an UPDATE and commit per hit
+        self._pending_access = {}
+
+    @staticmethod
+    def make_key(model: str, options: Optional[Dict], prompt: str) -> str:
+        payload = json.dumps({"model": model, "options": options or {}, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # S1, S2 and the API server may share the file, so wait on locks instead of failing
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            self._conn.commit()
+        return self._conn
+
+    def inflight_dir(self) -> str:
+        """Directory for the cross-process single-flight lock files, next to the cache file"""
+        directory = os.path.join(os.path.dirname(self.path) or ".", "inflight")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def get(self, key: str, record_stats: bool = True) -> Optional[str]:
+        if self.bypass:
+            return None
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                if row is None:
+                    if record_stats:
+                        self.stats["misses"] += 1
+                    return None
+                if self.ttl_seconds and row[1] < now - self.ttl_seconds:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    conn.commit()
+                    self.stats["expired"] += 1
+                    if record_stats:
+                        self.stats["misses"] += 1
+                    return None
+                self._pending_access[key] = now
+                if len(self._pending_access) >= ACCESS_FLUSH_EVERY:
+                    self._flush_access(conn)
+                    conn.commit()
+                if record_stats:
+                    self.stats["hits"] += 1
+                return row[0]
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache read failed: {e}")
+            return None
+
+    def set(self, key: str, response: str, model: str = None):
+        if self.bypass:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, model, response, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, model, response, now, now)
+                )
+                self._pending_access.pop(key, None)
+                self.stats["writes"] += 1
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= self.trim_every:
+                    self._trim(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache write failed: {e}")
+
+    def _flush_access(self, conn: sqlite3.Connection):
+        if self._pending_access:
+            conn.executemany("UPDATE responses SET last_access = ? WHERE key = ?",
+                             [(last_access, key) for key, last_access in self._pending_access.items()])
+            self._pending_access.clear()
+
+    def _trim(self, conn: sqlite3.Connection):
+        """Evict least recently used entries beyond max_entries; the caller commits"""
+        # Pending hits first, so recently read entries are not mistaken for cold ones
+        self._flush_access(conn)
+        self._writes_since_trim = 0
+        overflow = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (overflow,)
+            )
+            self.stats["evictions"] += overflow
+
+    def purge_expired(self) -> int:
+        """Drop every entry older than the TTL; returns the number removed"""
+        if not self.ttl_seconds:
+            return 0
+        try:
+            with self._lock:
+                conn = self._connection()
+                deleted = conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,)).rowcount
+                conn.commit()
+                self.stats["expired"] += deleted
+                return deleted
+        except sqlite3.Error as e:
+            logger.error(f"LLM cache purge failed: {e}")
+            return 0
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "hit_rate": self.stats["hits"] / lookups if lookups else 0.0, "bypass": self.bypass}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling Ollama while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures or SLO violations; open -> half-open probe after a cool-down"""
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = None, slo_seconds: float = None, slow_call_threshold: int = None,
+                 reset_timeout: float = None):
+        self.failure_threshold = failure_threshold or int(os.environ.get("LLM_BREAKER_FAILURES", 3))
+        self.slo_seconds = slo_seconds or float(os.environ.get("LLM_SLO_SECONDS", 60))
+        self.slow_call_threshold = slow_call_threshold or int(os.environ.get("LLM_BREAKER_SLOW_CALLS", 3))
+        self.reset_timeout = reset_timeout or float(os.environ.get("LLM_BREAKER_RESET_SECONDS", 30))
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.consecutive_slow_calls = 0
+        self.opened_at = 0.0
+        self.stats = {"trips": 0, "rejected": 0, "probes": 0}
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let exactly one probe through; everyone else keeps getting the fallback
+                self.state = self.HALF_OPEN
+                self.stats["probes"] += 1
+                return True
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self, elapsed: float):
+        with self._lock:
+            self.consecutive_failures = 0
+            if elapsed > self.slo_seconds:
+                self.consecutive_slow_calls += 1
+                if self.state == self.HALF_OPEN or self.consecutive_slow_calls >= self.slow_call_threshold:
+                    self._trip(f"{self.consecutive_slow_calls} call(s) slower than {self.slo_seconds:.0f}s")
+                return
+            self.consecutive_slow_calls = 0
+            if self.state != self.CLOSED:
+                logger.warning("Ollama circuit breaker closed, LLM scoring resumed")
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._trip(f"{self.consecutive_failures} consecutive failure(s)")
+
+    def _trip(self, reason: str):
+        if self.state != self.OPEN:
+            self.stats["trips"] += 1
+            logger.warning(f"Ollama circuit breaker opened after {reason}; using fallbacks for {self.reset_timeout:.0f}s")
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != self.CLOSED
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "state": self.state, "consecutive_failures": self.consecutive_failures,
+                "consecutive_slow_calls": self.consecutive_slow_calls}
+
+
+class _Flight:
+    """One in-progress Ollama call that concurrent identical requests wait on"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def resolve(self, result: str):
+        self._result = result
+        self._done.set()
+
+    def fail(self, error: BaseException):
+        self._error = error
+        self._done.set()
+
+    def wait(self) -> str:
+        # The leader always resolves or fails, and its request is bounded by its own timeout
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class OllamaClient:
+    """Thin /api/generate client that serves repeated prompts from PromptResponseCache"""
+
+    def __init__(self, base_url: str = "http://localhost:11434", cache: PromptResponseCache = None,
+                 streaming: bool = None, breaker: CircuitBreaker = None):
+        self.base_url = base_url.rstrip("/")
+        self.cache = cache if cache is not None else get_prompt_cache()
+        self.breaker = breaker if breaker is not None else get_circuit_breaker(self.base_url)
+        self.streaming = streaming if streaming is not None else _env_flag("LLM_STREAMING", "1")
+        self.stats = {"requests": 0, "streamed": 0, "early_stops": 0, "coalesced": 0, "coalesced_cross_process": 0}
+
+    def generate(self, prompt: str, model: str = "mistral", options: Dict = None, timeout: float = 300,
+                 use_cache: bool = True, keep_alive: str = None, stop_when: Callable[[str], bool] = None) -> str:
+        """
+        Return the raw response text; raises requests exceptions on transport or HTTP errors.
+        With stop_when (e.g. number_complete) the response is streamed and the connection is closed
+        as soon as the predicate holds, which makes Ollama abort the rest of the generation.
+        Cached responses are served even while the circuit breaker is open; anything else raises
+        CircuitOpenError immediately so callers can use their fallback.
+        Identical concurrent requests are coalesced into one Ollama call (see _single_flight).
+        """
+        payload = {"model": model, "prompt": prompt, "stream": False, "options": options or {}}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        if not use_cache:
+            return self._request(payload, timeout, stop_when)
+
+        key = self.cache.make_key(model, options, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            _emit("llm.prompt_cache_hits")
+            return cached
+        return self._single_flight(key, payload, timeout, stop_when)
+
+    def _single_flight(self, key: str, payload: Dict, timeout: float, stop_when: Callable[[str], bool]) -> str:
+        """Let one thread per process, and one process per cache file, call Ollama for a given key"""
+        flight_key = (self.base_url, key)
+        with _inflight_lock:
+            flight = _inflight.get(flight_key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _inflight[flight_key] = _Flight()
+        if not is_leader:
+            self.stats["coalesced"] += 1
+            _emit("llm.coalesced")
+            return flight.wait()
+
+        try:
+            text = self._generate_across_processes(key, payload, timeout, stop_when)
+            flight.resolve(text)
+            return text
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        finally:
+            with _inflight_lock:
+                _inflight.pop(flight_key, None)
+
+    def _generate_across_processes(self, key: str, payload: Dict, timeout: float, stop_when: Callable[[str], bool]) -> str:
+        # Other processes can only share the answer through the cache file
+        if self.cache.bypass:
+            return self._request_and_store(key, payload, timeout, stop_when)
+
+        lock_path = os.path.join(self.cache.inflight_dir(), f"{key}.lock")
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Another process is asking the same question: wait for its answer in the cache
+                cached = self.cache.get(key, record_stats=False)
+                if cached is not None:
+                    self.stats["coalesced_cross_process"] += 1
+                    _emit("llm.coalesced")
+                    return cached
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > timeout:
+                        os.remove(lock_path)  # left behind by a process that died mid-call
+                except OSError:
+                    pass
+                time.sleep(INFLIGHT_POLL_SECONDS)
+                continue
+
+            try:
+                os.close(fd)
+                # The previous holder may have stored the answer just before releasing the lock
+                cached = self.cache.get(key, record_stats=False)
+                if cached is not None:
+                    _emit("llm.coalesced")
+                    return cached
+                return self._request_and_store(key, payload, timeout, stop_when)
+            finally:
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+
+        # The other process never produced an answer in time; ask ourselves
+        return self._request_and_store(key, payload, timeout, stop_when)
+
+    def _request_and_store(self, key: str, payload: Dict, timeout: float, stop_when: Callable[[str], bool]) -> str:
+        text = self._request(payload, timeout, stop_when)
+        # Empty answers are treated as failures by callers, so never pin them in the cache
+        if text.strip():
+            self.cache.set(key, text, payload["model"])
+        return text
+
+    def _request(self, payload: Dict, timeout: float, stop_when: Callable[[str], bool]) -> str:
+        if not self.breaker.allow_request():
+            _emit("llm.rejected")
+            raise CircuitOpenError(f"Ollama circuit breaker is open for {self.base_url}")
+
+        self.stats["requests"] += 1
+        _emit("llm.requests")
+        start = time.monotonic()
+        try:
+            if stop_when is not None and self.streaming:
+                text = self._generate_streaming(payload, timeout, stop_when)
+            else:
+                response = requests.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout)
+                response.raise_for_status()
+                text = response.json().get("response", "")
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success(time.monotonic() - start)
+        return text
+
+    def _generate_streaming(self, payload: Dict, timeout: float, stop_when: Callable[[str], bool]) -> str:
+        self.stats["streamed"] += 1
+        chunks = []
+        with requests.post(f"{self.base_url}/api/generate", json={**payload, "stream": True},
+                           timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise requests.exceptions.RequestException(f"Ollama stream error: {data['error']}")
+                chunks.append(data.get("response", ""))
+                if data.get("done"):
+                    break
+                if stop_when("".join(chunks)):
+                    # Leaving the with-block drops the unread connection instead of draining it
+                    self.stats["early_stops"] += 1
+                    break
+        return "".join(chunks)
+
+
+_prompt_cache = None
+_prompt_cache_lock = threading.Lock()
+_circuit_breakers = {}
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def get_prompt_cache() -> PromptResponseCache:
+    """Process-wide cache so S1 and S2 share one connection when run together"""
+    global _prompt_cache
+    with _prompt_cache_lock:
+        if _prompt_cache is None:
+            _prompt_cache = PromptResponseCache()
+        return _prompt_cache
+
+
+def get_circuit_breaker(base_url: str) -> CircuitBreaker:
+    """One breaker per Ollama server, shared by every client in the process"""
+    with _prompt_cache_lock:
+        if base_url not in _circuit_breakers:
+            _circuit_breakers[base_url] = CircuitBreaker()
+        return _circuit_breakers[base_url]
@@ -37,7 +37,8 @@ def run_sequential():
         print(f"[{datetime.now()}] S1.py main() completed")
 
         print(f"[{datetime.now()}] Starting S2.py main()")
-        s2_main()
+        # This loop outlives the run, so ChromaDB cleanup can go to S2's background schedule
+        s2_main(background_cleanup=True)
         print(f"[{datetime.now()}] S2.py main() completed")
 
         print(f"[{datetime.now()}] All processes complete. Resume watcher is still running in background...")
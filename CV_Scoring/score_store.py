@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Append-only history of S2 results. Every scored job becomes one row in job_runs and
+# one row per ranked candidate in scores; nothing is updated or deleted, and the
+# latest_scores view picks the most recent run of each job that produced scores
+# (a job that failed to score keeps showing its previous results).
+#
+#   SCORE_STORE_PATH  SQLite file (default ./score_store/scores.sqlite3)
+
+DEFAULT_STORE_PATH = "./score_store/scores.sqlite3"
+
+
+class ScoreStore:
+    """SQLite score history with a latest-run-per-job view"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.environ.get("SCORE_STORE_PATH", DEFAULT_STORE_PATH)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS job_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run TEXT NOT NULL,
+                job_title TEXT NOT NULL,
+                created REAL NOT NULL
+            )""")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS scores (
+                run_id INTEGER NOT NULL REFERENCES job_runs (run_id),
+                rank INTEGER NOT NULL,
+                candidate_id TEXT NOT NULL,
+                candidate_name TEXT,
+                job_id TEXT,
+                overall_score REAL NOT NULL,
+                degraded INTEGER NOT NULL,
+                result TEXT NOT NULL,
+                PRIMARY KEY (run_id, rank)
+            )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS job_runs_title ON job_runs (job_title, run_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS scores_candidate ON scores (candidate_id)")
+            # Recreated on open so stores written before empty runs were skipped get the current definition
+            self._conn.execute("DROP VIEW IF EXISTS latest_scores")
+            self._conn.execute("""CREATE VIEW latest_scores AS
+                SELECT r.run_id, r.run, r.job_title, s.rank, s.candidate_id, s.candidate_name, s.job_id,
+                       s.overall_score, s.degraded, s.result
+                FROM job_runs r JOIN scores s ON s.run_id = r.run_id
+                WHERE r.run_id = (SELECT MAX(j.run_id) FROM job_runs j WHERE j.job_title = r.job_title
+                                  AND EXISTS (SELECT 1 FROM scores WHERE scores.run_id = j.run_id))""")
+            self._conn.commit()
+        return self._conn
+
+    def append(self, run: str, job_title: str, results: List[Dict]) -> Optional[int]:
+        """Record one job's ranked results (dicts as exported to ./scores) under a new run; returns its run_id"""
+        if not results:
+            # A job that failed to score (or matched nobody) must not replace its last real run
+            logger.warning(f"No results to store for {job_title}, keeping its previous run")
+            return None
+        try:
+            with self._lock:
+                conn = self._connection()
+                # Commits the run and its scores together or rolls both back, so latest_scores never shows an empty run
+                with conn:
+                    cursor = conn.execute("INSERT INTO job_runs (run, job_title, created) VALUES (?, ?, ?)",
+                                          (run, job_title, time.time()))
+                    run_id = cursor.lastrowid
+                    conn.executemany("INSERT INTO scores (run_id, rank, candidate_id, candidate_name, job_id, overall_score, "
+                                     "degraded, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                     [(run_id, rank, result.get("candidate_id", ""), result.get("candidate_name"),
+                                       result.get("job_id"), result.get("overall_score", 0.0), int(bool(result.get("degraded"))),
+                                       json.dumps(result, ensure_ascii=False))
+                                      for rank, result in enumerate(results, start=1)])
+                return run_id
+        except sqlite3.Error as e:
+            logger.error(f"Score store append failed for {job_title}: {e}")
+            return None
+
+    def latest(self, job_title: str = None) -> Dict[str, List[Dict]]:
+        """Ranked results of the most recent run of each job (or of one job)"""
+        query = "SELECT job_title, result FROM latest_scores"
+        params = ()
+        if job_title is not None:
+            query += " WHERE job_title = ?"
+            params = (job_title,)
+        latest = {}
+        try:
+            with self._lock:
+                rows = self._connection().execute(query + " ORDER BY job_title, rank", params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Score store lookup failed: {e}")
+            return {}
+        for title, result in rows:
+            latest.setdefault(title, []).append(json.loads(result))
+        return latest
+
+    def get_stats(self) -> Dict:
+        try:
+            with self._lock:
+                conn = self._connection()
+                return {"runs": conn.execute("SELECT COUNT(*) FROM job_runs").fetchone()[0],
+                        "scores": conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0],
+                        "jobs": conn.execute("SELECT COUNT(DISTINCT job_title) FROM job_runs").fetchone()[0]}
+        except sqlite3.Error as e:
+            logger.error(f"Score store stats failed: {e}")
+            return {}
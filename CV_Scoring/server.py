@@ -1,8 +1,15 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException,Query,Body
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException,Query,Body,BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
 import os
+import sys
+import glob
+import asyncio
+import logging
 import shutil
-from typing import List
+import threading
+from typing import List, Dict, Optional
 from datetime import datetime
 import json
 
@@ -11,6 +18,77 @@ app = FastAPI(title="Resume Upload API")
 RESUME_DIR = "./resumes"
 FEEDBACK_DIR = "./feedback"
 JD_DIR = "./jd"
+CANDIDATE_DIR = "./candidates"
+# Prometheus textfile written by batch S2 runs with S2_PROFILE=1
+BATCH_METRICS_FILE = "./scores/profiles/metrics.prom"
+# Concurrent scoring threads shared by /score and /rank; the warm matcher is shared by all of them
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "4"))
+
+logger = logging.getLogger(__name__)
+
+_scoring_executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+_candidate_index = {"signature": None, "candidates": {}}
+_candidate_index_lock = threading.Lock()
+
+
+def load_scoring():
+    """Import S2 for the scoring endpoints, or answer 503 when the image was built without its dependencies"""
+    try:
+        import S2
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Scoring is not available in this deployment: {e}")
+    return S2
+
+
+def get_candidate_index(S2) -> Dict[str, dict]:
+    """Candidates by stable ID, re-read only when a file in ./candidates changed"""
+    files = sorted(path for pattern in ("*.json", "*.jsonl") for path in glob.glob(os.path.join(CANDIDATE_DIR, pattern)))
+    signature = tuple((path, os.path.getmtime(path), os.path.getsize(path)) for path in files)
+    with _candidate_index_lock:
+        if signature != _candidate_index["signature"]:
+            _candidate_index["candidates"] = S2.load_candidate_index(CANDIDATE_DIR)
+            _candidate_index["signature"] = signature
+        return _candidate_index["candidates"]
+
+
+def resolve_job(S2, payload: dict) -> dict:
+    """The job sent inline as "job", or the one stored under ./jd/{job_id}.json (picked by "job_title" if it holds several)"""
+    if isinstance(payload.get("job"), dict):
+        if not S2.validate_job_data(payload["job"]):
+            raise HTTPException(status_code=422, detail="Invalid job data")
+        return payload["job"]
+    job_id = str(payload.get("job_id", ""))
+    file_path = os.path.join(JD_DIR, f"{os.path.basename(job_id)}.json")
+    if not job_id or not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail=f"Job {job_id or '(missing job_id)'} not found")
+    jobs = S2.load_jobs_from_file(file_path)
+    title = payload.get("job_title")
+    jobs = [job for job in jobs if job.get("title") == title] if title else jobs
+    if not jobs:
+        raise HTTPException(status_code=404, detail=f"No valid job{f' titled {title}' if title else ''} in {file_path}")
+    return jobs[0]
+
+
+def result_payload(result, candidate: dict, breakdown: bool = True) -> dict:
+    data = result.to_dict() if breakdown else {k: v for k, v in vars(result).items() if k != "detailed_breakdown"}
+    data["media_id"] = candidate.get("media_id")
+    data["job_id"] = candidate.get("job_id")
+    return data
+
+
+def prewarm_job_artifacts(file_path: str):
+    """
+    Store the job embedding and skill expansions in ChromaDB right after upload,
+    so that scoring the first candidate only pays for the candidate side.
+    Runs as a background task on the warm matcher that /score and /rank use;
+    S2 is imported here because the slim API image may not ship it.
+    """
+    try:
+        from S2 import prewarm_job_file
+    except ImportError as e:
+        logger.warning(f"Skipping job pre-warm, scoring dependencies not installed: {e}")
+        return
+    prewarm_job_file(file_path)
 
 @app.post("/feedback", summary="Upload feedback JSON")
 async def upload_feedback(feedback_text: str = Body(..., embed=False)):
@@ -46,15 +124,158 @@ async def upload_feedback(feedback_text: str = Body(..., embed=False)):
 
 @app.on_event("startup")
 async def startup_event():
-    """Create the resumes directory if it doesn't exist"""
+    """Create the resumes directory if it doesn't exist and start loading the matcher"""
     os.makedirs(RESUME_DIR, exist_ok=True)
+    asyncio.get_running_loop().run_in_executor(_scoring_executor, warm_matcher)
+
+
+def warm_matcher():
+    """Load the embedding model and ChromaDB once so the first /score or /rank does not pay for it"""
+    try:
+        from S2 import get_matcher
+    except ImportError as e:
+        logger.warning(f"Scoring endpoints disabled, scoring dependencies not installed: {e}")
+        return
+    try:
+        # The server is long-lived, so old ChromaDB entries are cleaned on the background schedule
+        get_matcher().chromadb_manager.start_cleanup_schedule(days_old=30)
+    except Exception as e:
+        logger.error(f"Failed to warm up the matcher: {e}")
+
+
+@app.get("/metrics", summary="Prometheus metrics of the scoring profiler")
+async def metrics():
+    """
+    Scoring cost counters (component time, LLM calls, cache lookups, ChromaDB round trips)
+    of this process's matcher as s2_service_*, plus the latest batch totals as s2_batch_*.
+    Both are only collected when S2_PROFILE=1.
+    """
+    parts = []
+    S2 = sys.modules.get("S2")
+    matcher = getattr(S2, "_matcher", None) if S2 else None
+    if matcher is not None and matcher.profiling:
+        parts.append(matcher.profile_totals.to_prometheus("s2_service"))
+    if os.path.exists(BATCH_METRICS_FILE):
+        with open(BATCH_METRICS_FILE, "r", encoding="utf-8") as f:
+            parts.append(f.read())
+    return PlainTextResponse("".join(parts), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/candidates/search", summary="Search candidates by skills")
+async def search_candidates(
+    skills: str = Query(..., description="Comma-separated skills, e.g. Python,Django"),
+    min_coverage: float = Query(0.0, ge=0.0, le=1.0, description="Fraction of the skills a candidate must cover"),
+    job_id: Optional[str] = Query(None, description="Only candidates who applied to this job"),
+    expand: bool = Query(False, description="Also match LLM synonyms of each skill (needs the scoring dependencies)"),
+    career_field: str = Query("general"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """
+    Query the persistent skill index kept up to date by S1 and S2.
+    Candidates are ranked by the fraction of the requested skills they cover.
+    """
+    try:
+        from skill_index import SkillIndex
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Skill search is not available in this deployment: {e}")
+    requested = [skill.strip() for skill in skills.split(",") if skill.strip()]
+    if not requested:
+        raise HTTPException(status_code=422, detail="No skills given")
+
+    clusters = {skill: [] for skill in requested}
+    if expand:
+        S2 = load_scoring()
+        variations = await run_in_threadpool(
+            lambda: S2.get_matcher().skill_mapper.get_skill_variations_batch(requested, career_field))
+        clusters = {skill: variations.get(skill, []) for skill in requested}
+    results = await run_in_threadpool(SkillIndex().search, clusters, min_coverage, job_id, limit)
+    return {"skills": requested, "min_coverage": min_coverage, "count": len(results), "candidates": results}
+
+
+@app.post("/score", summary="Score one candidate against one job")
+async def score_candidate(payload: dict = Body(..., example={"candidate_id": "12_resume.pdf", "job_id": "12"})):
+    """
+    Score a single (candidate, job) pair with the warm matcher.
+    The candidate is sent inline as "candidate" or referenced by "candidate_id";
+    the job is sent inline as "job" or referenced by "job_id" (plus an optional "job_title").
+    """
+    S2 = load_scoring()
+    if isinstance(payload.get("candidate"), dict):
+        candidate = payload["candidate"]
+        if not S2.validate_candidate_data(candidate):
+            raise HTTPException(status_code=422, detail="Invalid candidate data")
+    else:
+        index = await run_in_threadpool(get_candidate_index, S2)
+        candidate = index.get(str(payload.get("candidate_id", "")))
+        if candidate is None:
+            raise HTTPException(status_code=404, detail=f"Candidate {payload.get('candidate_id')} not found")
+    # Both read and parse files, so they stay off the event loop
+    job = await run_in_threadpool(resolve_job, S2, payload)
+
+    def score():
+        matcher = S2.get_matcher()
+        matcher.feedback_manager.refresh()
+        return matcher.calculate_matching_score(candidate, job)
+
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(_scoring_executor, score)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return result_payload(result, candidate)
+
+
+@app.post("/rank", summary="Rank candidates for a job")
+async def rank_candidates(payload: dict = Body(..., example={"job_id": "12", "candidate_ids": [], "top_n": 5, "stream": True})):
+    """
+    Rank candidates for one job with the warm matcher.
+    "candidate_ids" selects candidates from ./candidates (default: every candidate whose resume belongs to "job_id").
+    With "stream" (the default) the response is NDJSON: one "score" line per candidate as it is scored,
+    then a "ranking" line with the top_n results and their detailed breakdown.
+    """
+    S2 = load_scoring()
+    job = await run_in_threadpool(resolve_job, S2, payload)
+    index = await run_in_threadpool(get_candidate_index, S2)
+    candidate_ids = payload.get("candidate_ids")
+    if candidate_ids:
+        candidate_ids = [str(cid) for cid in candidate_ids]
+        missing_ids = [cid for cid in candidate_ids if cid not in index]
+        candidates = [index[cid] for cid in candidate_ids if cid in index]
+    else:
+        missing_ids = []
+        candidates = [c for c in index.values() if not payload.get("job_id") or c.get("job_id") == str(payload["job_id"])]
+    if not candidates:
+        raise HTTPException(status_code=404, detail={"message": "No candidates to rank", "missing_candidate_ids": missing_ids})
+    top_n = payload.get("top_n", 5)
+
+    def rank():
+        matcher = S2.get_matcher()
+        matcher.feedback_manager.refresh()
+        by_id = {S2.candidate_id(candidate): candidate for candidate in candidates}
+        results = []
+        for result in matcher.score_candidates(job, candidates, executor=_scoring_executor):
+            results.append(result)
+            yield {"event": "score", **result_payload(result, by_id[result.candidate_id], breakdown=False)}
+        ranked = [result_payload(result, by_id[result.candidate_id]) for result in matcher.rank_results(results, top_n)]
+        yield {"event": "ranking", "job_title": job.get("title"), "scored": len(results),
+               "missing_candidate_ids": missing_ids, "ranked": ranked}
+
+    if payload.get("stream", True):
+        return StreamingResponse((json.dumps(line, ensure_ascii=False) + "\n" for line in rank()),
+                                 media_type="application/x-ndjson")
+    try:
+        lines = await run_in_threadpool(lambda: list(rank()))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return lines[-1]
 @app.post("/job", summary="Upload job description JSON")
 async def upload_job_description(
+    background_tasks: BackgroundTasks,
     job_data: List[dict] = Body(..., example=[]),
     jobId: str = Query(..., description="Unique job ID to name the JD file")
 ):
     """
     Upload a structured job description and save it under ./jd/{jobId}.json.
+    Job-side scoring artifacts are pre-warmed in the background after the response is sent.
     """
     try:
         file_path = os.path.join(JD_DIR, f"{jobId}.json")
@@ -62,7 +283,8 @@ async def upload_job_description(
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(job_data, f, indent=4, ensure_ascii=False)
 
-        return {"status": "success", "message": f"Job description saved to {file_path}"}
+        background_tasks.add_task(prewarm_job_artifacts, file_path)
+        return {"status": "success", "message": f"Job description saved to {file_path}", "prewarm": "scheduled"}
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
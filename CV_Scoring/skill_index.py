@@ -0,0 +1,278 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Persistent inverted index from normalized skill terms to candidate IDs, shared by
+# S1 (which indexes candidates as they are parsed), S2 (which uses it to skip
+# candidates that miss a job's important skills) and the API (ad-hoc searches).
+#
+#   SKILL_INDEX_PATH  SQLite file (default ./skill_index/skills.sqlite3)
+#
+# Each candidate skill is stored under its normalized spelling variants and, when
+# the indexer expands skills, those of its LLM variations too. Queries pass a
+# synonym cluster per skill (the skill plus its LLM variations), and a candidate
+# covers the skill when the two clusters share a term, as S2's similarity does.
+
+DEFAULT_INDEX_PATH = "./skill_index/skills.sqlite3"
+# Part of every candidate fingerprint; bump when skill_terms() changes so candidates get re-indexed
+TERM_SCHEME_VERSION = 3
+# SQLite's default limit on bound parameters per statement is 999
+_SQL_CHUNK = 500
+
+
+def normalize_skill(skill: str) -> str:
+    return re.sub(r"\s+", " ", str(skill)).strip().lower()
+
+
+def compact_skill(skill: str) -> str:
+    """Punctuation- and space-free form, so "Node.js", "Node JS" and "nodejs" coincide ("C++" and "C#" keep + and #)"""
+    return re.sub(r"[^0-9a-z+#]", "", normalize_skill(skill))
+
+
+def skill_terms(skill: str) -> Set[str]:
+    """Spelling variants a skill is indexed and looked up under (S2's basic variations plus the compact form)"""
+    base = normalize_skill(skill)
+    if not base:
+        return set()
+    terms = {base, base.replace(" ", ""), base.replace(" ", "-"), base.replace(" ", "_")}
+    if compact_skill(base):
+        terms.add(compact_skill(base))
+    return terms
+
+
+def candidate_id(candidate: Dict) -> str:
+    """Stable ID for a candidate: an explicit id, else the source resume file, else a hash of name and email"""
+    for key in ('id', 'candidate_id', 'file'):
+        value = candidate.get(key)
+        if value and value != 'Not found':
+            return str(value)
+    identity = f"{candidate.get('name', '')}|{candidate.get('email', '')}".lower()
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+
+
+def candidate_skill_names(candidate: Dict) -> List[str]:
+    """Technical and soft skill names, nested groups flattened the way S2 compiles them ("Frameworks Flask")"""
+    skills = candidate.get('skills')
+    if not isinstance(skills, dict):
+        return []
+    names = []
+
+    def collect(skill_dict, prefix=""):
+        for key, value in skill_dict.items():
+            if isinstance(value, dict):
+                collect(value, f"{prefix}{key} " if prefix else f"{key} ")
+            else:
+                names.append(f"{prefix}{key}".strip())
+
+    for group in ('technical_skills', 'soft_skills'):
+        if isinstance(skills.get(group), dict):
+            collect(skills[group])
+    return list(dict.fromkeys(names))
+
+
+def _chunks(items: List, size: int = _SQL_CHUNK) -> List[List]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class SkillIndex:
+    """SQLite inverted index: skill term -> candidate IDs, updated incrementally per candidate"""
+
+    def __init__(self, path: str = None):
+        self.path = path or os.environ.get("SKILL_INDEX_PATH", DEFAULT_INDEX_PATH)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # S1, S2 and the API server may share the file, so wait on locks instead of failing
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS candidates (
+                candidate_id TEXT PRIMARY KEY,
+                name TEXT,
+                job_id TEXT,
+                skills TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                updated REAL NOT NULL,
+                expanded INTEGER NOT NULL DEFAULT 0
+            )""")
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(candidates)")}
+            if "expanded" not in columns:
+                self._conn.execute("ALTER TABLE candidates ADD COLUMN expanded INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS skill_terms (
+                term TEXT NOT NULL,
+                candidate_id TEXT NOT NULL,
+                skill TEXT NOT NULL,
+                PRIMARY KEY (term, candidate_id, skill)
+            )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS skill_terms_candidate ON skill_terms (candidate_id)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _fingerprint(name: str, job_id: Optional[str], skills: List[str]) -> str:
+        payload = json.dumps({"name": name, "job_id": job_id, "skills": sorted(skills), "terms": TERM_SCHEME_VERSION})
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def index_candidates(self, candidates: Iterable[Dict],
+                         expand: Callable[[List[str]], Dict[str, List[str]]] = None) -> int:
+        """
+        Add or refresh candidates; unchanged ones are skipped. Returns how many were (re)indexed.
+        expand maps skill names to their LLM variations (one call for all changed candidates); skills it
+        leaves out are indexed by spelling only and the candidate is expanded again on the next call.
+        """
+        entries = {}
+        for candidate in candidates:
+            if not isinstance(candidate, dict) or 'name' not in candidate:
+                continue
+            skills = candidate_skill_names(candidate)
+            job_id = candidate.get('job_id') or (str(candidate.get('file', '')).split('_')[0] or None)
+            job_id = job_id if job_id and str(job_id).isdigit() else None
+            entries[candidate_id(candidate)] = (candidate.get('name'), job_id, skills,
+                                                self._fingerprint(candidate.get('name'), job_id, skills))
+        if not entries:
+            return 0
+
+        try:
+            with self._lock:
+                conn = self._connection()
+                known = {}
+                for ids in _chunks(list(entries)):
+                    rows = conn.execute(f"SELECT candidate_id, fingerprint, expanded FROM candidates WHERE candidate_id IN "
+                                        f"({','.join('?' * len(ids))})", ids).fetchall()
+                    known.update((row[0], (row[1], row[2])) for row in rows)
+            changed = {cid: entry for cid, entry in entries.items()
+                       if cid not in known or known[cid][0] != entry[3] or (expand is not None and not known[cid][1])}
+            if not changed:
+                return 0
+
+            # Outside the lock: expanding may prompt the LLM
+            variations = {}
+            if expand is not None:
+                variations = expand(list(dict.fromkeys(skill for entry in changed.values() for skill in entry[2])))
+            with self._lock:
+                conn = self._connection()
+                now = time.time()
+                for cid, (name, job_id, skills, fingerprint) in changed.items():
+                    rows = set()
+                    for skill in skills:
+                        for term in skill_terms(skill):
+                            rows.add((term, cid, skill))
+                        for variation in variations.get(skill) or []:
+                            for term in skill_terms(variation):
+                                rows.add((term, cid, skill))
+                    expanded = int(expand is not None and all(variations.get(skill) for skill in skills))
+                    conn.execute("DELETE FROM skill_terms WHERE candidate_id = ?", (cid,))
+                    conn.executemany("INSERT OR IGNORE INTO skill_terms (term, candidate_id, skill) VALUES (?, ?, ?)",
+                                     sorted(rows))
+                    conn.execute("INSERT OR REPLACE INTO candidates (candidate_id, name, job_id, skills, fingerprint, updated, "
+                                 "expanded) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 (cid, name, job_id, json.dumps(skills), fingerprint, now, expanded))
+                conn.commit()
+                return len(changed)
+        except sqlite3.Error as e:
+            logger.error(f"Skill index update failed: {e}")
+            return 0
+
+    def remove_candidate(self, cid: str):
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM skill_terms WHERE candidate_id = ?", (cid,))
+                conn.execute("DELETE FROM candidates WHERE candidate_id = ?", (cid,))
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Skill index delete failed: {e}")
+
+    def covered_skills(self, clusters: Dict[str, Iterable[str]], candidate_ids: Iterable[str] = None) -> Dict[str, List[str]]:
+        """
+        For each candidate, the query skills it covers. clusters maps a query skill to its synonyms;
+        the skill itself is always part of its cluster. Candidates covering nothing are left out.
+        """
+        skills_by_term = {}
+        for skill, synonyms in clusters.items():
+            terms = set(skill_terms(skill))
+            for synonym in synonyms or []:
+                terms |= skill_terms(synonym)
+            for term in terms:
+                skills_by_term.setdefault(term, set()).add(skill)
+        allowed = set(candidate_ids) if candidate_ids is not None else None
+        matched = {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                # All clusters in one query (chunked only past SQLite's parameter limit)
+                for chunk in _chunks(sorted(skills_by_term)):
+                    rows = conn.execute(f"SELECT DISTINCT term, candidate_id FROM skill_terms WHERE term IN "
+                                        f"({','.join('?' * len(chunk))})", chunk).fetchall()
+                    for term, cid in rows:
+                        if allowed is None or cid in allowed:
+                            matched.setdefault(cid, set()).update(skills_by_term[term])
+        except sqlite3.Error as e:
+            logger.error(f"Skill index lookup failed: {e}")
+        # Query order, as before
+        return {cid: [skill for skill in clusters if skill in skills] for cid, skills in matched.items()}
+
+    def indexed_candidates(self, candidate_ids: Iterable[str]) -> Set[str]:
+        """The given candidate IDs the index holds"""
+        found = set()
+        try:
+            with self._lock:
+                conn = self._connection()
+                for ids in _chunks(list(dict.fromkeys(candidate_ids))):
+                    rows = conn.execute(f"SELECT candidate_id FROM candidates WHERE candidate_id IN "
+                                        f"({','.join('?' * len(ids))})", ids).fetchall()
+                    found.update(row[0] for row in rows)
+        except sqlite3.Error as e:
+            logger.error(f"Skill index lookup failed: {e}")
+        return found
+
+    def search(self, clusters: Dict[str, Iterable[str]], min_coverage: float = 0.0, job_id: str = None,
+               limit: int = 50) -> List[Dict]:
+        """Candidates ranked by how many of the query skills they cover"""
+        covered = self.covered_skills(clusters)
+        needed = len(clusters) * min_coverage
+        matches = [(cid, skills) for cid, skills in covered.items() if len(skills) >= needed]
+        if not matches:
+            return []
+        details = {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                for ids in _chunks([cid for cid, _ in matches]):
+                    rows = conn.execute(f"SELECT candidate_id, name, job_id FROM candidates WHERE candidate_id IN "
+                                        f"({','.join('?' * len(ids))})", ids).fetchall()
+                    details.update({row[0]: row for row in rows})
+        except sqlite3.Error as e:
+            logger.error(f"Skill index lookup failed: {e}")
+            return []
+
+        results = []
+        for cid, skills in matches:
+            if cid not in details or (job_id and details[cid][2] != str(job_id)):
+                continue
+            results.append({"candidate_id": cid, "name": details[cid][1], "job_id": details[cid][2],
+                            "matched_skills": skills, "coverage": round(len(skills) / len(clusters), 3)})
+        results.sort(key=lambda r: (-r["coverage"], r["name"] or ""))
+        return results[:limit]
+
+    def get_stats(self) -> Dict:
+        try:
+            with self._lock:
+                conn = self._connection()
+                return {"candidates": conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0],
+                        "terms": conn.execute("SELECT COUNT(DISTINCT term) FROM skill_terms").fetchone()[0]}
+        except sqlite3.Error as e:
+            logger.error(f"Skill index stats failed: {e}")
+            return {}
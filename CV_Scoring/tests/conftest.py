@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The CV_Scoring modules are flat scripts, imported by name as S2.py and server.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,43 @@
+import S2
+
+
+def test_lookups_do_not_grow_the_vocabulary():
+    index = S2.MinHashLSHIndex()
+    index.update(["python", "javascript"])
+    assert index.best_similarity(["python3"], ["python"]) == 0.8
+    assert index.neighbours("python3") == {"python": 0.8}
+    assert index.best_similarity(["kubernetes"], ["kubernetes-cluster"]) > 0
+    assert len(index) == 2
+
+
+def test_vocabulary_is_bounded():
+    index = S2.MinHashLSHIndex(capacity=3)
+    index.update(["python", "pandas", "numpy", "django"])
+    assert len(index) == 3
+    assert index.neighbours("python3") == {}
+    assert index.neighbours("djangorest") == {"django": 0.5}
+    assert sum(len(bucket) for buckets in index._buckets for bucket in buckets.values()) == 3 * index.bands
+
+
+def degraded_mapper(monkeypatch):
+    # No LLM variations, so only the skill names themselves can match
+    mapper = S2.DynamicSkillSynonymMapper(ollama_url="http://127.0.0.1:9")
+    monkeypatch.setattr(mapper, "_call_ollama_api", lambda *args, **kwargs: "")
+    return mapper
+
+
+def test_substring_pairs_keep_their_score(monkeypatch):
+    mapper = degraded_mapper(monkeypatch)
+    for skill, variant in [("Python", "Python Programming"), ("SQL", "PostgreSQL"), ("AWS", "AWS Lambda"),
+                           ("React", "React.js"), ("Python", "Python3")]:
+        assert mapper.calculate_skill_similarity(skill, variant) >= 0.6, (skill, variant)
+    assert mapper.calculate_skill_similarity("Python", "Java") == 0.0
+    assert len(mapper.fuzzy_index) == 0
+
+
+def test_close_misspellings_count_toward_coverage(monkeypatch):
+    mapper = degraded_mapper(monkeypatch)
+    # 3-gram Jaccard 0.85: graded above the 0.6 coverage threshold
+    assert mapper.calculate_skill_similarity("Object Oriented Programming", "Object Orientated Programming") > 0.6
+    # Jaccard 0.5: partial credit at most, never coverage
+    assert mapper.calculate_skill_similarity("JavaScript", "Javscript") <= 0.5
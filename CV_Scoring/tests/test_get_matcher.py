@@ -0,0 +1,42 @@
+import pytest
+
+import S2
+
+
+@pytest.fixture(autouse=True)
+def fresh_matcher(monkeypatch):
+    monkeypatch.setattr(S2, "_matcher", None)
+    monkeypatch.setattr(S2, "_matcher_args", None)
+    monkeypatch.setattr(S2.SmartRecruitMatcher, "initialize", lambda self: None)
+
+
+def test_conflicting_arguments_raise(tmp_path):
+    chromadb_dir = str(tmp_path / "chromadb")
+    matcher = S2.get_matcher(chromadb_dir=chromadb_dir)
+    assert S2.get_matcher(chromadb_dir=chromadb_dir) is matcher
+
+    with pytest.raises(ValueError, match="chromadb_dir"):
+        S2.get_matcher(chromadb_dir=str(tmp_path / "other"))
+    assert S2.get_matcher(chromadb_dir=chromadb_dir) is matcher
+
+
+def test_matcher_without_chromadb_is_not_kept(tmp_path, monkeypatch):
+    initialize_chromadb = S2.ChromaDBManager.initialize_chromadb
+    broken = [True]
+
+    def flaky(manager):
+        if broken[0]:
+            manager.client = None
+        else:
+            initialize_chromadb(manager)
+
+    monkeypatch.setattr(S2.ChromaDBManager, "initialize_chromadb", flaky)
+    chromadb_dir = str(tmp_path / "chromadb")
+    first = S2.get_matcher(chromadb_dir=chromadb_dir)
+    assert S2._matcher is None
+
+    broken[0] = False
+    second = S2.get_matcher(chromadb_dir=chromadb_dir)
+    assert second is not first
+    assert second.chromadb_manager.client is not None
+    assert S2.get_matcher(chromadb_dir=chromadb_dir) is second
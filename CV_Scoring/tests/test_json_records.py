@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+import S2
+
+RECORDS = [{"name": f"Candidate {i}", "file": f"{i % 3 + 1}_cv{i}.pdf", "note": "quote \" comma , bracket ] }",
+            "skills": {"technical_skills": {"Python": i % 5}}, "scores": [1.5, [2, {"x": "]"}]]} for i in range(40)]
+
+
+@pytest.fixture(params=[1, 7, 64, 65536], ids=lambda size: f"chunk{size}")
+def chunk_size(request, monkeypatch):
+    monkeypatch.setattr(S2, "STREAM_CHUNK_SIZE", request.param)
+    return request.param
+
+
+def records(tmp_path, text, wrapper_key="candidates"):
+    path = tmp_path / "records.json"
+    path.write_text(text, encoding="utf-8")
+    return list(S2.iter_json_records(str(path), wrapper_key))
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(RECORDS),
+    json.dumps(RECORDS, indent=2),
+    "\n".join(json.dumps(record) for record in RECORDS) + "\n",
+    json.dumps({"source": "S1", "candidates": RECORDS, "count": len(RECORDS)}),
+    json.dumps({"candidates": RECORDS}, indent=2),
+], ids=["array", "indented", "jsonl", "wrapper", "indented-wrapper"])
+def test_formats_match_json_load(tmp_path, chunk_size, text):
+    assert records(tmp_path, text) == RECORDS
+
+
+def test_single_object_and_non_list_wrapper_key(tmp_path, chunk_size):
+    assert records(tmp_path, json.dumps(RECORDS[0])) == [RECORDS[0]]
+    not_a_wrapper = dict(RECORDS[0], candidates="none")
+    assert records(tmp_path, json.dumps(not_a_wrapper)) == [not_a_wrapper]
+    assert records(tmp_path, json.dumps({"candidates": RECORDS}), wrapper_key=None) == [{"candidates": RECORDS}]
+
+
+def test_numbers_split_across_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(S2, "STREAM_CHUNK_SIZE", 2)
+    assert records(tmp_path, "[12345, 6789.25, -1e3]") == [12345, 6789.25, -1e3]
+    assert records(tmp_path, "12345\n6789") == [12345, 6789]
+
+
+def test_empty_inputs(tmp_path, chunk_size):
+    assert records(tmp_path, "") == []
+    assert records(tmp_path, " [ ] \n") == []
+    assert records(tmp_path, '{"candidates": []}') == []
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(RECORDS[:2]) + " trailing",
+    json.dumps(RECORDS[:2])[:-1] + " " + json.dumps(RECORDS[2]) + "]",
+    json.dumps(RECORDS[:2])[:-30],
+    json.dumps({"candidates": RECORDS[:2]})[:-1] + " x}",
+], ids=["trailing-garbage", "missing-comma", "truncated", "wrapper-garbage"])
+def test_malformed_input_raises_after_valid_records(tmp_path, chunk_size, text):
+    path = tmp_path / "records.json"
+    path.write_text(text, encoding="utf-8")
+    seen = []
+    with pytest.raises(json.JSONDecodeError):
+        for record in S2.iter_json_records(str(path), "candidates"):
+            seen.append(record)
+    assert seen == RECORDS[:len(seen)]
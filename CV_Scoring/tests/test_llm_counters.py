@@ -0,0 +1,54 @@
+import pytest
+
+import S2
+import llm_client
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"response": "72"}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    posts = []
+
+    def post(url, json=None, timeout=None):
+        posts.append(json["prompt"])
+        return FakeResponse()
+
+    monkeypatch.setattr(llm_client.requests, "post", post)
+    cache = llm_client.PromptResponseCache(path=str(tmp_path / "cache.sqlite3"), bypass=False)
+    breaker = llm_client.CircuitBreaker(failure_threshold=1, reset_timeout=3600)
+    ollama = llm_client.OllamaClient(cache=cache, streaming=False, breaker=breaker)
+    ollama.posts = posts
+    return ollama
+
+
+def test_only_http_requests_count_as_requests(client):
+    profile = S2.ScoringProfile()
+    with S2.ScoringProfile.activate(profile):
+        assert client.generate("score this", options={"temperature": 0.1}) == "72"
+        assert client.generate("score this", options={"temperature": 0.1}) == "72"
+
+    assert len(client.posts) == 1
+    summary = profile.to_dict()
+    assert summary["llm_requests"] == 1
+    assert summary["llm_prompt_cache_hits"] == 1
+    assert summary["llm_coalesced"] == 0
+
+
+def test_breaker_rejections_are_not_requests(client):
+    client.breaker._trip("test")
+    profile = S2.ScoringProfile()
+    with S2.ScoringProfile.activate(profile):
+        with pytest.raises(llm_client.CircuitOpenError):
+            client.generate("score that")
+
+    assert client.posts == []
+    summary = profile.to_dict()
+    assert summary["llm_requests"] == 0
+    assert summary["llm_rejected"] == 1
@@ -0,0 +1,79 @@
+import S2
+
+JOB = {
+    "title": "Frontend Developer",
+    "required_skills": {"technical_skills": {"React": 4}},
+    "important_skills": ["React"],
+}
+VARIATIONS = {
+    "react": ["react", "reactjs"],
+    "react native": ["react native", "react", "mobile development"],
+    "excel": ["excel", "spreadsheets"],
+}
+
+
+def candidate(name, skill):
+    return {"name": name, "file": f"7_{name}.pdf", "skills": {"technical_skills": {skill: 4}}}
+
+
+def make_matcher(tmp_path):
+    matcher = S2.SmartRecruitMatcher(ollama_url="http://127.0.0.1:9", chromadb_dir=str(tmp_path / "chroma"),
+                                     feedback_dir=str(tmp_path / "feedback"), min_important_coverage=1.0,
+                                     skill_index_path=str(tmp_path / "skills.sqlite3"))
+    matcher.skill_mapper = S2.DynamicSkillSynonymMapper(ollama_url="http://127.0.0.1:9")
+    career_field = matcher.compile_job(JOB).career_field
+    for skill, variations in VARIATIONS.items():
+        matcher.skill_mapper.synonym_cache[matcher.skill_mapper._skill_key(skill, career_field)] = variations
+    return matcher, career_field
+
+
+def expand(skills):
+    return {skill: VARIATIONS[skill.lower()] for skill in skills if skill.lower() in VARIATIONS}
+
+
+def test_index_covers_skills_through_the_candidates_synonym_cluster(tmp_path):
+    matcher, career_field = make_matcher(tmp_path)
+    native = candidate("native", "React Native")
+
+    # Spelling alone misses the shared "react" variation that full scoring counts (0.95)
+    matcher.skill_index.index_candidates([native])
+    assert matcher.skill_index.covered_skills({"React": VARIATIONS["react"]}) == {}
+    assert matcher.skill_mapper.calculate_skill_similarity("React", "React Native", career_field) == 0.95
+
+    # Expanding skills once the LLM is reachable re-indexes the candidate with its cluster
+    assert matcher.skill_index.index_candidates([native], expand=expand) == 1
+    assert matcher.skill_index.covered_skills({"React": VARIATIONS["react"]}) == {"7_native.pdf": ["React"]}
+    assert matcher.skill_index.index_candidates([native], expand=expand) == 0
+
+
+def test_coverage_is_one_index_query(tmp_path):
+    matcher, _ = make_matcher(tmp_path)
+    matcher.skill_index.index_candidates([candidate("native", "React Native"), candidate("excel", "Excel")],
+                                         expand=expand)
+    statements = []
+    matcher.skill_index._connection().set_trace_callback(statements.append)
+    covered = matcher.skill_index.covered_skills({"React": VARIATIONS["react"], "Excel": VARIATIONS["excel"]})
+    assert covered == {"7_native.pdf": ["React"], "7_excel.pdf": ["Excel"]}
+    assert len([s for s in statements if s.startswith("SELECT")]) == 1
+
+
+def test_prefilter_drops_on_the_index_alone(tmp_path, monkeypatch):
+    matcher, _ = make_matcher(tmp_path)
+    job = matcher.compile_job(JOB)
+    raw = [candidate("native", "React Native"), candidate("excel", "Excel"), candidate("new", "Excel")]
+    matcher.skill_index.index_candidates(raw[:2], expand=expand)
+    native, excel, new = matcher.compile_candidates(raw)
+
+    expanded = []
+    expand_batch = matcher.skill_mapper.get_skill_variations_batch
+    monkeypatch.setattr(matcher.skill_mapper, "get_skill_variations_batch",
+                        lambda skills, career_field="general": expanded.append(skills) or expand_batch(skills, career_field))
+    monkeypatch.setattr(matcher.skill_index, "index_candidates", None)
+
+    profile = S2.ScoringProfile()
+    with S2.ScoringProfile.activate(profile):
+        kept = matcher.prefilter_candidates(job, [native, excel, new])
+    # Only the job's important skills get expanded; a candidate the index does not hold yet is scored
+    assert kept == [native, new]
+    assert expanded == [["React"]]
+    assert profile.counters["prefilter.dropped"] == 1
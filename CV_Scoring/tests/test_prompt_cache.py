@@ -0,0 +1,36 @@
+from llm_client import PromptResponseCache
+
+
+def make_cache(tmp_path, max_entries):
+    return PromptResponseCache(path=str(tmp_path / "cache.sqlite3"), max_entries=max_entries, bypass=False)
+
+
+def entry_count(cache):
+    return cache._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def test_trims_every_few_writes_within_bounds(tmp_path):
+    cache = make_cache(tmp_path, max_entries=20)
+    statements = []
+    cache._connection().set_trace_callback(statements.append)
+    for i in range(25):
+        cache.set(f"k{i}", f"response {i}")
+
+    assert len([s for s in statements if s.startswith("SELECT COUNT(*)")]) == 25 // cache.trim_every
+    assert entry_count(cache) <= cache.max_entries + cache.trim_every
+    assert cache.stats["evictions"] > 0
+
+
+def test_hits_are_batched_but_still_protect_entries(tmp_path):
+    cache = make_cache(tmp_path, max_entries=10)
+    for i in range(10):
+        cache.set(f"k{i}", f"response {i}")
+
+    statements = []
+    cache._connection().set_trace_callback(statements.append)
+    assert cache.get("k0") == "response 0"
+    assert not [s for s in statements if s.startswith("UPDATE")]
+
+    cache.set("k10", "response 10")
+    assert cache.get("k0") == "response 0"
+    assert cache.get("k1") is None
@@ -0,0 +1,34 @@
+from score_store import ScoreStore
+
+
+def test_failed_append_leaves_no_empty_run(tmp_path):
+    store = ScoreStore(path=str(tmp_path / "scores.sqlite3"))
+    assert store.append("run-1", "Backend Engineer", [{"candidate_id": "a", "overall_score": 81.0}]) is not None
+
+    # overall_score is NOT NULL, so the scores insert fails after the job_runs row was written
+    assert store.append("run-2", "Backend Engineer", [{"candidate_id": "b", "overall_score": None}]) is None
+    assert store.append("run-3", "Data Analyst", [{"candidate_id": "c", "overall_score": 64.0}]) is not None
+
+    assert store.get_stats() == {"runs": 2, "scores": 2, "jobs": 2}
+    latest = store.latest()
+    assert [r["candidate_id"] for r in latest["Backend Engineer"]] == ["a"]
+    assert [r["candidate_id"] for r in latest["Data Analyst"]] == ["c"]
+
+
+def test_empty_run_keeps_the_previous_results(tmp_path):
+    store = ScoreStore(path=str(tmp_path / "scores.sqlite3"))
+    store.append("r1", "Backend", [{"candidate_id": "a", "overall_score": 81.0}])
+    assert store.append("r2", "Backend", []) is None
+
+    assert [r["candidate_id"] for r in store.latest()["Backend"]] == ["a"]
+    assert store.get_stats()["runs"] == 1
+
+
+def test_view_skips_empty_runs_already_stored(tmp_path):
+    store = ScoreStore(path=str(tmp_path / "scores.sqlite3"))
+    store.append("r1", "Backend", [{"candidate_id": "a", "overall_score": 81.0}])
+    # As left behind by earlier versions that stored failed jobs as empty runs
+    with store._connection() as conn:
+        conn.execute("INSERT INTO job_runs (run, job_title, created) VALUES ('r2', 'Backend', 0)")
+
+    assert [r["candidate_id"] for r in store.latest("Backend")["Backend"]] == ["a"]
@@ -0,0 +1,53 @@
+import threading
+
+import S2
+
+
+class RecordingCollection:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert(self, ids, **kwargs):
+        self.upserts.append(list(ids))
+
+
+def make_manager():
+    manager = S2.ChromaDBManager.__new__(S2.ChromaDBManager)
+    manager.client = object()
+    manager.collections = {"skills": RecordingCollection()}
+    manager._chunks = lambda items: [items]
+    return manager
+
+
+def test_each_call_flushes_only_its_own_batch():
+    manager = make_manager()
+    collection = manager.collections["skills"]
+    first, second = S2.WriteBatch(), S2.WriteBatch()
+    second_done = threading.Event()
+
+    def other_request():
+        with manager.buffering(second):
+            manager._upsert("skills", {"b": {"documents": "b"}})
+        manager.flush(second)
+        second_done.set()
+
+    with manager.buffering(first):
+        manager._upsert("skills", {"a1": {"documents": "a"}})
+        worker = threading.Thread(target=other_request)
+        worker.start()
+        assert second_done.wait(5)
+        # The other request finishing neither wrote nor stopped this call's buffering
+        manager._upsert("skills", {"a2": {"documents": "a"}})
+        assert collection.upserts == [["b"]]
+    worker.join()
+
+    manager.flush(first)
+    assert collection.upserts == [["b"], ["a1", "a2"]]
+
+
+def test_writes_outside_a_batch_go_straight_through():
+    manager = make_manager()
+    manager._upsert("skills", {"x": {"documents": "x"}})
+    with manager.buffering(None):
+        manager._upsert("skills", {"y": {"documents": "y"}})
+    assert manager.collections["skills"].upserts == [["x"], ["y"]]